@@ -0,0 +1,195 @@
+"""
+Response compression: gzip, plus br / zstd when brotli / zstandard are installed
+
+Pure ASGI middleware (no BaseHTTPMiddleware buffering):
+- the first encoding in COMPRESSION_ENCODINGS that the client accepts wins
+- bodies smaller than COMPRESSION_MIN_SIZE are sent as-is; small JSON
+  compresses poorly and the CPU is better spent elsewhere
+- streaming bodies (NDJSON export) are compressed chunk by chunk and
+  flushed after every chunk, so clients receive rows as they are produced
+  and memory stays bounded
+- responses that already have a Content-Encoding, non-text media types
+  (Parquet / Arrow exports are compressed internally), HEAD requests and
+  204 / 304 responses are passed through
+"""
+import os
+import zlib
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional
+    zstandard = None
+
+COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true'
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_ENCODINGS = [
+    e.strip() for e in os.getenv('COMPRESSION_ENCODINGS', 'zstd,br,gzip').split(',') if e.strip()
+]
+# Per encoding, chosen for per-request latency rather than ratio
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4))
+COMPRESSION_ZSTD_LEVEL = int(os.getenv('COMPRESSION_ZSTD_LEVEL', 3))
+
+COMPRESSIBLE_TYPES = (
+    'application/json', 'application/x-ndjson', 'application/problem+json',
+    'application/javascript', 'application/xml', 'text/',
+)
+
+class _Gzip:
+    def __init__(self):
+        self.compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush(zlib.Z_FINISH)
+
+class _Brotli:
+    def __init__(self):
+        self.compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.process(data) + self.compressor.flush()
+
+    def finish(self) -> bytes:
+        return self.compressor.finish()
+
+class _Zstd:
+    def __init__(self):
+        self.compressor = zstandard.ZstdCompressor(level=COMPRESSION_ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data) + self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush()
+
+ENCODERS = {'gzip': _Gzip}
+if brotli is not None:
+    ENCODERS['br'] = _Brotli
+if zstandard is not None:
+    ENCODERS['zstd'] = _Zstd
+
+def negotiate_encoding(accept_encoding: str, preferred=None) -> Optional[str]:
+    """First available encoding in preference order that Accept-Encoding allows (q > 0)"""
+    accepted = {}
+    for part in accept_encoding.split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+    for encoding in preferred or COMPRESSION_ENCODINGS:
+        if encoding in ENCODERS and accepted.get(encoding, accepted.get('*', 0.0)) > 0:
+            return encoding
+    return None
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.lower().startswith(COMPRESSIBLE_TYPES)
+
+class CompressionMiddleware:
+    """Compress response bodies above minimum_size with the negotiated encoding"""
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['method'] == 'HEAD':
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get('accept-encoding', ''))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(send, encoding, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+class _CompressionResponder:
+    """Per-response state: hold the start message until the body decides"""
+
+    def __init__(self, send, encoding: str, minimum_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start = None
+        self.passthrough = False
+        self.buffer = []
+        self.buffered = 0
+        self.encoder = None
+
+    async def send(self, message):
+        kind = message['type']
+        if kind == 'http.response.start':
+            self.start = message
+            headers = Headers(raw=message['headers'])
+            self.passthrough = (
+                message['status'] in (204, 304)
+                or 'content-encoding' in headers
+                or not is_compressible(headers.get('content-type', ''))
+            )
+            if self.passthrough:
+                await self._send(message)
+            return
+        if kind != 'http.response.body' or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+
+        if self.encoder is not None:
+            # Streaming, already compressing
+            data = self.encoder.compress(body) if body else b''
+            if not more_body:
+                data += self.encoder.finish()
+            if data or not more_body:
+                await self._send({'type': 'http.response.body', 'body': data, 'more_body': more_body})
+            return
+
+        self.buffer.append(body)
+        self.buffered += len(body)
+        if more_body and self.buffered < self.minimum_size:
+            return  # wait: the stream may still end below the threshold
+
+        data = b''.join(self.buffer)
+        self.buffer = []
+        headers = MutableHeaders(scope=self.start)
+        headers.add_vary_header('Accept-Encoding')
+
+        if self.buffered < self.minimum_size:
+            # Complete and small: send unchanged
+            await self._send(self.start)
+            await self._send({'type': 'http.response.body', 'body': data, 'more_body': False})
+            return
+
+        self.encoder = ENCODERS[self.encoding]()
+        compressed = self.encoder.compress(data)
+        if not more_body:
+            compressed += self.encoder.finish()
+        headers['Content-Encoding'] = self.encoding
+        if more_body:
+            if 'content-length' in headers:
+                del headers['Content-Length']
+        else:
+            headers['Content-Length'] = str(len(compressed))
+        await self._send(self.start)
+        await self._send({'type': 'http.response.body', 'body': compressed, 'more_body': more_body})
@@ -2,11 +2,18 @@
 Database connection and utilities
 """
 import os
+import math
+import time
+import random
+import threading
+import urllib.parse
 from contextlib import contextmanager
-from typing import Generator
+from enum import Enum
+from typing import Generator, Optional
 import psycopg2
 from psycopg2.extras import RealDictCursor
-from psycopg2.pool import SimpleConnectionPool
+from psycopg2.pool import ThreadedConnectionPool, PoolError
+from fastapi import HTTPException, status
 from dotenv import load_dotenv
 import logging
 
@@ -15,53 +22,301 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+class PoolMode(str, Enum):
+    """How connections reach Postgres (direct, or through a pooler)"""
+    DIRECT = "direct"
+    SESSION = "session"
+    TRANSACTION = "transaction"
+
+# Default (minconn, maxconn) per worker for each mode.
+# A transaction pooler (PgBouncer / Supavisor :6543) multiplexes client
+# connections onto a small set of server connections, so each worker can
+# hold more of them without eating the Postgres connection budget.
+# Session mode pins one server connection per client, so keep it small.
+POOL_SIZES = {
+    PoolMode.DIRECT: (1, 10),
+    PoolMode.SESSION: (1, 5),
+    PoolMode.TRANSACTION: (1, 20),
+}
+
+# Connection URLs in fallback order, with the mode each one implies
+DATABASE_URLS = [
+    ('DATABASE_URL_DIRECT', PoolMode.DIRECT),
+    ('DATABASE_URL_SESSION', PoolMode.SESSION),
+    ('DATABASE_URL_TRANSACTION', PoolMode.TRANSACTION),
+]
+
+# Port used by Supabase / PgBouncer transaction poolers
+TRANSACTION_POOLER_PORT = 6543
+
 # Database connection pool
+# ThreadedConnectionPool: connections are taken from sync endpoints in the
+# threadpool, streaming exports, the breaker's reconnect thread and the
+# percentile refresh thread; SimpleConnectionPool is not thread-safe
 db_pool = None
+pool_mode: Optional[PoolMode] = None
+
+# Optional read-only replica pool (DATABASE_URL_REPLICA)
+replica_pool = None
+REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', 5))
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv('REPLICA_LAG_CHECK_INTERVAL', 10))
+
+# Last measured replica lag, shared between request threads
+_replica_state = {'lag': None, 'checked_at': 0.0}
+_replica_lock = threading.Lock()
+
+# Lag in seconds; 0 when the replica has replayed everything it received
+# (an idle primary would otherwise look like a lagging replica)
+REPLICA_LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM (NOW() - pg_last_xact_replay_timestamp())), 0)
+    END AS lag
+"""
+
+# Circuit breaker: after DB_BREAKER_FAILURES consecutive connection failures
+# requests fail fast with 503 while a background thread reconnects with
+# exponential backoff (DB_RECONNECT_MIN_DELAY .. DB_RECONNECT_MAX_DELAY)
+DB_CONNECT_TIMEOUT = int(os.getenv('DB_CONNECT_TIMEOUT', 10))
+DB_BREAKER_FAILURES = int(os.getenv('DB_BREAKER_FAILURES', 3))
+DB_RECONNECT_MIN_DELAY = float(os.getenv('DB_RECONNECT_MIN_DELAY', 1))
+DB_RECONNECT_MAX_DELAY = float(os.getenv('DB_RECONNECT_MAX_DELAY', 60))
+
+class DatabaseUnavailable(HTTPException):
+    """503 raised instead of waiting on a database that is known to be down"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database temporarily unavailable",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+
+class CircuitBreaker:
+    """
+    Tracks primary database health
+    closed: requests use the pool normally
+    open: requests fail fast; one background thread retries init_db_pool()
+    with exponential backoff and closes the breaker when it succeeds
+    """
+
+    def __init__(self, failure_threshold: int, min_delay: float, max_delay: float):
+        self.failure_threshold = failure_threshold
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.lock = threading.Lock()
+        self.is_open = False
+        self.failures = 0
+        self.opened_at = None
+        self.next_attempt_at = 0.0
+        self.last_error = None
+        self._recover_callbacks = []
+        self._success_callbacks = []
+
+    def on_recover(self, callback):
+        """Run callback (in the reconnect thread) after the database is back"""
+        self._recover_callbacks.append(callback)
+
+    def on_success(self, callback):
+        """Run callback after every successful primary connection (must be cheap)"""
+        self._success_callbacks.append(callback)
+
+    def retry_after(self) -> float:
+        return max(0.0, self.next_attempt_at - time.monotonic())
+
+    def record_success(self):
+        if self.failures:
+            with self.lock:
+                self.failures = 0
+        for callback in self._success_callbacks:
+            callback()
+
+    def record_failure(self, error: Exception):
+        with self.lock:
+            self.failures += 1
+            self.last_error = str(error)
+            if self.failures >= self.failure_threshold:
+                self._open()
+
+    def trip(self, error: Exception):
+        """Open immediately (e.g. the pool could not be created at all)"""
+        with self.lock:
+            self.last_error = str(error)
+            self._open()
+
+    def _open(self):
+        if self.is_open:
+            return
+        self.is_open = True
+        self.opened_at = time.time()
+        self.next_attempt_at = time.monotonic() + self.min_delay
+        logger.error(f"Database circuit breaker opened: {self.last_error}")
+        threading.Thread(target=self._reconnect_loop, name='db-reconnect', daemon=True).start()
+
+    def _reconnect_loop(self):
+        delay = self.min_delay
+        while True:
+            # Jitter keeps API workers from reconnecting in lockstep
+            wait = delay * random.uniform(1.0, 1.5)
+            self.next_attempt_at = time.monotonic() + wait
+            time.sleep(wait)
+            try:
+                _reconnect()
+            except Exception as e:
+                self.last_error = str(e)
+                delay = min(delay * 2, self.max_delay)
+                logger.warning(f"Database reconnect failed, next attempt in ~{delay:.0f}s: {e}")
+                continue
+            
+            with self.lock:
+                self.is_open = False
+                self.failures = 0
+                self.opened_at = None
+            logger.info("Database circuit breaker closed")
+            for callback in self._recover_callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    logger.error(f"Database recovery callback failed: {e}")
+            return
+
+    def status(self) -> dict:
+        return {
+            "state": "open" if self.is_open else "closed",
+            "consecutive_failures": self.failures,
+            "opened_at": self.opened_at,
+            "retry_after": round(self.retry_after(), 1) if self.is_open else None,
+            "last_error": self.last_error,
+        }
+
+breaker = CircuitBreaker(DB_BREAKER_FAILURES, DB_RECONNECT_MIN_DELAY, DB_RECONNECT_MAX_DELAY)
+
+# Errors that mean the server or the connection is gone (not a bad query)
+CONNECTION_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+class DatabaseBackend:
+    """
+    Alternative source of connections for get_db_connection / get_db_cursor
+    (see app/db_backends.py: in-memory database, rollback-only Postgres).
+    connection() is a context manager yielding an object with
+    cursor(cursor_factory=..., name=...); it commits on success and rolls
+    back on error itself.
+    """
+
+    def connection(self, readonly: bool = False):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+# Installed backend; None = the Postgres pools below
+_backend: Optional[DatabaseBackend] = None
+
+# DB_BACKEND=memory runs the API on a seeded in-memory database (no Postgres)
+DB_BACKEND = os.getenv('DB_BACKEND', 'postgres').lower()
+
+def set_backend(backend: Optional[DatabaseBackend]):
+    """Route all database access through backend (None restores the pools)"""
+    global _backend
+    if _backend is not None and _backend is not backend:
+        _backend.close()
+    _backend = backend
+
+def get_backend() -> Optional[DatabaseBackend]:
+    return _backend
+
+def detect_pool_mode(url_name: str, database_url: str) -> PoolMode:
+    """
+    Resolve pooling mode for a connection URL
+    DB_POOL_MODE overrides everything, then the pooler port, then the URL name
+    """
+    override = os.getenv('DB_POOL_MODE')
+    if override:
+        return PoolMode(override.strip().lower())
+    
+    result = urllib.parse.urlparse(database_url)
+    if result.port == TRANSACTION_POOLER_PORT:
+        return PoolMode.TRANSACTION
+    
+    return dict(DATABASE_URLS).get(url_name, PoolMode.DIRECT)
+
+def get_pool_size(mode: PoolMode) -> tuple:
+    """Pool size for mode, overridable with DB_POOL_MIN / DB_POOL_MAX"""
+    default_min, default_max = POOL_SIZES[mode]
+    minconn = int(os.getenv('DB_POOL_MIN', default_min))
+    maxconn = int(os.getenv('DB_POOL_MAX', default_max))
+    return minconn, max(minconn, maxconn)
+
+def build_conn_params(database_url: str, mode: PoolMode) -> dict:
+    """Build psycopg2 connection parameters for a URL and pooling mode"""
+    result = urllib.parse.urlparse(database_url)
+    
+    conn_params = {
+        'host': result.hostname,
+        'port': result.port or 5432,
+        'database': result.path.lstrip('/'),
+        'user': result.username,
+        'password': result.password,
+        'connect_timeout': DB_CONNECT_TIMEOUT,
+        'keepalives': 1,
+        'keepalives_idle': 30,
+        'keepalives_interval': 10,
+        'keepalives_count': 5,
+        'application_name': 'strokeguard-api',
+    }
+    
+    # Session-level startup options are only honoured when we own the
+    # server connection; PgBouncer in transaction mode rejects them.
+    if mode != PoolMode.TRANSACTION:
+        statement_timeout = os.getenv('DB_STATEMENT_TIMEOUT_MS')
+        if statement_timeout:
+            conn_params['options'] = f"-c statement_timeout={int(statement_timeout)}"
+    
+    return conn_params
+
+def supports_session_state() -> bool:
+    """
+    Whether session state survives between transactions
+    False behind a transaction pooler: no prepared statements, SET,
+    advisory locks, LISTEN or WITH HOLD cursors across transactions.
+    """
+    return pool_mode != PoolMode.TRANSACTION
 
 def init_db_pool():
     """Initialize database connection pool with fallback"""
-    global db_pool
+    global db_pool, pool_mode
     
-    # Try DATABASE_URL_DIRECT first, fallback to DATABASE_URL_SESSION
-    database_urls = [
-        ('DATABASE_URL_DIRECT', os.getenv('DATABASE_URL_DIRECT')),
-        ('DATABASE_URL_SESSION', os.getenv('DATABASE_URL_SESSION')),
-        ('DATABASE_URL_TRANSACTION', os.getenv('DATABASE_URL_TRANSACTION')),
-    ]
+    if _backend is not None:
+        return
+    if DB_BACKEND == 'memory':
+        from app.db_backends import MemoryBackend, MemoryDatabase
+        set_backend(MemoryBackend(MemoryDatabase.seeded()))
+        logger.info("Using in-memory database backend (DB_BACKEND=memory)")
+        return
     
     last_error = None
     
-    for url_name, database_url in database_urls:
+    for url_name, _ in DATABASE_URLS:
+        database_url = os.getenv(url_name)
         if not database_url:
             continue
             
         try:
-            logger.info(f"Trying to connect using {url_name}...")
-            
-            # Parse connection string
-            import urllib.parse
-            result = urllib.parse.urlparse(database_url)
+            mode = detect_pool_mode(url_name, database_url)
+            minconn, maxconn = get_pool_size(mode)
+            logger.info(f"Trying to connect using {url_name} ({mode.value} mode, pool {minconn}-{maxconn})...")
             
             # Build connection parameters
-            conn_params = {
-                'host': result.hostname,
-                'port': result.port or 5432,
-                'database': result.path.lstrip('/'),
-                'user': result.username,
-                'password': result.password,
-                'connect_timeout': 10,
-                'keepalives': 1,
-                'keepalives_idle': 30,
-                'keepalives_interval': 10,
-                'keepalives_count': 5,
-            }
+            conn_params = build_conn_params(database_url, mode)
             
             # Create pool
-            db_pool = SimpleConnectionPool(
-                minconn=1,
-                maxconn=10,
+            db_pool = ThreadedConnectionPool(
+                minconn=minconn,
+                maxconn=maxconn,
                 **conn_params
             )
+            pool_mode = mode
             
             # Test connection
             test_conn = db_pool.getconn()
@@ -72,6 +327,9 @@ def init_db_pool():
             db_pool.putconn(test_conn)
             
             logger.info(f"✓ Database connection pool initialized successfully using {url_name}")
+            
+            if replica_pool is None:
+                init_replica_pool()
             return  # Success!
             
         except Exception as e:
@@ -83,6 +341,7 @@ def init_db_pool():
                 except:
                     pass
                 db_pool = None
+            pool_mode = None
             continue
     
     # If we get here, all connection attempts failed
@@ -100,40 +359,162 @@ def init_db_pool():
     logger.error("=" * 60)
     raise Exception(f"Could not connect to database. Last error: {last_error}")
 
+def _reconnect():
+    """Replace the primary pool (called from the breaker's reconnect thread)"""
+    global db_pool
+    old_pool = db_pool
+    db_pool = None
+    if old_pool is not None:
+        try:
+            old_pool.closeall()
+        except Exception:
+            pass
+    init_db_pool()
+
+def init_replica_pool():
+    """
+    Initialize read-only replica pool from DATABASE_URL_REPLICA
+    Optional: on failure reads keep going to the primary
+    """
+    global replica_pool
+    
+    database_url = os.getenv('DATABASE_URL_REPLICA')
+    if not database_url:
+        return
+    
+    try:
+        mode = detect_pool_mode('DATABASE_URL_REPLICA', database_url)
+        minconn, maxconn = get_pool_size(mode)
+        replica_pool = ThreadedConnectionPool(
+            minconn=minconn,
+            maxconn=maxconn,
+            **build_conn_params(database_url, mode)
+        )
+        logger.info(f"✓ Replica connection pool initialized ({mode.value} mode)")
+    except Exception as e:
+        logger.warning(f"✗ Failed to connect to replica, reads will use primary: {e}")
+        replica_pool = None
+
+def check_replica_lag(force: bool = False) -> Optional[float]:
+    """
+    Return replica lag in seconds (cached for REPLICA_LAG_CHECK_INTERVAL)
+    None if there is no replica or it cannot be reached
+    """
+    if replica_pool is None:
+        return None
+    
+    now = time.monotonic()
+    with _replica_lock:
+        if not force and now - _replica_state['checked_at'] < REPLICA_LAG_CHECK_INTERVAL:
+            return _replica_state['lag']
+        # Claim the check so concurrent requests reuse the previous value
+        _replica_state['checked_at'] = now
+    
+    lag = None
+    conn = None
+    try:
+        conn = replica_pool.getconn()
+        cursor = conn.cursor()
+        cursor.execute(REPLICA_LAG_QUERY)
+        lag = float(cursor.fetchone()[0])
+        cursor.close()
+        conn.rollback()
+    except Exception as e:
+        logger.warning(f"Replica lag check failed: {e}")
+    finally:
+        if conn is not None:
+            replica_pool.putconn(conn, close=lag is None)
+    
+    with _replica_lock:
+        _replica_state['lag'] = lag
+    return lag
+
+def use_replica() -> bool:
+    """Whether read-only queries should currently go to the replica"""
+    lag = check_replica_lag()
+    return lag is not None and lag <= REPLICA_MAX_LAG_SECONDS
+
 @contextmanager
-def get_db_connection() -> Generator:
+def get_db_connection(readonly: bool = False) -> Generator:
     """
     Context manager for database connections
+    readonly=True routes to the replica when it is healthy and not lagging
     Usage:
         with get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM users")
     """
-    if db_pool is None:
+    if _backend is None and DB_BACKEND == 'memory':
         init_db_pool()
+    if _backend is not None:
+        with _backend.connection(readonly=readonly) as conn:
+            yield conn
+        breaker.record_success()
+        return
+    
+    pool = None
+    if readonly and use_replica():
+        pool = replica_pool
+    
+    if pool is None:
+        # Fail fast while the primary is known to be down
+        if breaker.is_open:
+            raise DatabaseUnavailable(breaker.retry_after())
+        if db_pool is None:
+            try:
+                init_db_pool()
+            except Exception as e:
+                breaker.trip(e)
+                raise DatabaseUnavailable(breaker.retry_after())
+        pool = db_pool
     
-    conn = db_pool.getconn()
+    try:
+        conn = pool.getconn()
+    except CONNECTION_ERRORS as e:
+        if pool is db_pool:
+            breaker.record_failure(e)
+        raise DatabaseUnavailable(breaker.retry_after()) from e
+    
+    broken = False
     try:
         yield conn
         conn.commit()
     except Exception as e:
-        conn.rollback()
-        logger.error(f"Database error: {e}")
+        broken = conn.closed != 0 or isinstance(e, CONNECTION_ERRORS)
+        if not broken:
+            try:
+                conn.rollback()
+            except CONNECTION_ERRORS:
+                broken = True
+        if not isinstance(e, HTTPException):
+            logger.error(f"Database error: {e}")
+        if broken:
+            if pool is db_pool:
+                breaker.record_failure(e)
+            raise DatabaseUnavailable(breaker.retry_after()) from e
         raise
+    else:
+        if pool is db_pool:
+            breaker.record_success()
     finally:
-        db_pool.putconn(conn)
+        try:
+            pool.putconn(conn, close=broken)
+        except PoolError:
+            # Pool was replaced by a reconnect while this request held it
+            conn.close()
 
 @contextmanager
-def get_db_cursor(cursor_factory=RealDictCursor) -> Generator:
+def get_db_cursor(cursor_factory=RealDictCursor, readonly: bool = False) -> Generator:
     """
     Context manager for database cursor
     Returns dict-like results by default
+    readonly=True may be served by the replica (see get_db_connection)
     Usage:
         with get_db_cursor() as cursor:
             cursor.execute("SELECT * FROM users")
             users = cursor.fetchall()
     """
-    with get_db_connection() as conn:
+    with get_db_connection(readonly=readonly) as conn:
         cursor = conn.cursor(cursor_factory=cursor_factory)
         try:
             yield cursor
@@ -142,7 +523,14 @@ def get_db_cursor(cursor_factory=RealDictCursor) -> Generator:
 
 def close_db_pool():
     """Close all database connections"""
-    global db_pool
+    global db_pool, pool_mode, replica_pool
+    set_backend(None)
+    if replica_pool:
+        replica_pool.closeall()
+        replica_pool = None
+        logger.info("Replica connection pool closed")
     if db_pool:
         db_pool.closeall()
+        db_pool = None
+        pool_mode = None
         logger.info("Database connection pool closed")
@@ -0,0 +1,527 @@
+"""
+Database backends for running the API without the Postgres pools
+
+- MemoryBackend: in-process users / stroke_screenings store that answers
+  the queries issued by the routers, dependencies and percentile index.
+  Writes inside one get_db_cursor() block are undone when the block raises,
+  like a rolled back transaction. Unsupported SQL raises
+  NotImplementedError so a new query cannot silently return nothing.
+- PostgresRollbackBackend: one real connection, every get_db_cursor()
+  block runs in a SAVEPOINT and the outer transaction is rolled back on
+  close, so a run against local Postgres leaves no rows behind.
+
+Install with app.database.set_backend(...) (or DB_BACKEND=memory); test
+fixtures can use memory_database() / rollback_database().
+"""
+import os
+import hashlib
+import random
+import re
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+import psycopg2
+
+from app.database import DatabaseBackend, set_backend, get_backend
+from ml.utils.calibration import RiskBands
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Password of every seeded user (MemoryDatabase.seeded)
+SEED_PASSWORD = os.getenv('SEED_PASSWORD', 'BenchPass123!')
+
+RISK_BANDS = RiskBands()
+
+SCREENING_COLUMNS = [
+    "user_id", "age_at_screening", "height_cm", "weight_kg", "bmi",
+    "hypertension", "heart_disease", "ever_married", "work_type",
+    "residence_type", "avg_glucose_level", "smoking_status",
+    "stroke_probability", "risk_level",
+    "risk_factors", "confidence", "prediction", "threshold",
+]
+
+USER_COLUMNS = [
+    "email", "password", "full_name", "date_of_birth",
+    "gender", "phone_number",
+]
+
+def _normalize(query: str) -> str:
+    return " ".join(query.split())
+
+def _returning(query: str) -> Optional[list]:
+    """Column names of a RETURNING clause"""
+    match = re.search(r"RETURNING (.+)$", query)
+    if match is None:
+        return None
+    return [column.strip() for column in match.group(1).split(",")]
+
+def _select_columns(query: str) -> list:
+    """Column names of a plain SELECT list (no expressions)"""
+    match = re.match(r"SELECT (.+?) FROM ", query)
+    return [column.strip() for column in match.group(1).split(",")]
+
+def _project(row: dict, columns: list) -> dict:
+    return {column: row[column] for column in columns}
+
+def _project_select(query: str, rows: list) -> list:
+    """Rows reduced to the SELECT list (unchanged for SELECT *)"""
+    columns = _select_columns(query)
+    return rows if columns == ["*"] else [_project(row, columns) for row in rows]
+
+class MemoryDatabase:
+    """users / stroke_screenings tables kept in dicts"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.users = {}          # id -> row
+        self.emails = {}         # email -> id (unique constraint)
+        self.screenings = {}     # id -> row
+        self.admin = None
+        self.patients = []
+        self.patient = None
+
+    @classmethod
+    def seeded(cls, patients: int = 200, screenings_per_patient: int = 10, seed: int = 42):
+        """Admin + patients with random screenings, all with SEED_PASSWORD"""
+        from app.auth import get_password_hash
+
+        db = cls()
+        rng = random.Random(seed)
+        password_hash = get_password_hash(SEED_PASSWORD)
+        db.admin = db.add_user("admin@bench.local", password_hash, role="ADMIN", gender="Male",
+                               date_of_birth=date(1980, 1, 1))
+        for i in range(patients):
+            user = db.add_user(
+                f"patient{i}@bench.local", password_hash,
+                gender=rng.choice(["Male", "Female"]),
+                date_of_birth=date(1940 + rng.randint(0, 60), rng.randint(1, 12), 1)
+            )
+            db.patients.append(user)
+            for _ in range(screenings_per_patient):
+                probability = rng.random()
+                db.add_screening(
+                    user["id"], stroke_probability=probability,
+                    risk_level=RISK_BANDS.level(probability),
+                    created_at=datetime.now(timezone.utc) - timedelta(minutes=rng.randint(0, 60 * 24 * 60))
+                )
+        db.patient = db.patients[0] if db.patients else None
+        return db
+
+    def add_user(self, email: str, password_hash: str, role: str = "PATIENT", **fields) -> dict:
+        now = datetime.now(timezone.utc)
+        user = {
+            "id": str(uuid.uuid4()), "email": email, "password": password_hash,
+            "full_name": email.split("@")[0].title(), "date_of_birth": date(1970, 1, 1),
+            "gender": "Male", "phone_number": None, "role": role,
+            "created_at": now, "updated_at": now, "screening_version": 0,
+        }
+        user.update(fields)
+        self.users[user["id"]] = user
+        self.emails[email] = user["id"]
+        return user
+
+    def add_screening(self, user_id: str, **fields) -> dict:
+        row = {
+            "id": str(uuid.uuid4()), "user_id": user_id,
+            "age_at_screening": 50, "height_cm": 170.0, "weight_kg": 70.0, "bmi": 24.2,
+            "hypertension": False, "heart_disease": False, "ever_married": True,
+            "work_type": "Private", "residence_type": "Urban", "avg_glucose_level": 100.0,
+            "smoking_status": "never smoked", "stroke_probability": 0.1, "risk_level": "Low",
+            "risk_factors": [], "confidence": "Medium", "prediction": 0, "threshold": 0.5,
+            "created_at": datetime.now(timezone.utc),
+        }
+        row.update(fields)
+        user = self.users.get(user_id)
+        if user is not None:
+            # trigger: bump users.screening_version and stamp the row with it
+            user["screening_version"] += 1
+            row["screening_version"] = user["screening_version"]
+        self.screenings[row["id"]] = row
+        return row
+
+    def user_by_email(self, email: str) -> Optional[dict]:
+        user_id = self.emails.get(email)
+        return self.users.get(user_id) if user_id else None
+
+    def screenings_of(self, user_id: str) -> list:
+        """A user's screenings, newest first (ORDER BY created_at DESC, id DESC)"""
+        rows = [s for s in self.screenings.values() if s["user_id"] == user_id]
+        rows.sort(key=lambda s: (s["created_at"], s["id"]), reverse=True)
+        return rows
+
+class MemoryCursor:
+    """Cursor answering router SQL from a MemoryDatabase"""
+
+    def __init__(self, connection, tuples: bool = False):
+        self.connection = connection
+        self.db = connection.db
+        self.tuples = tuples
+        self.result = []
+        self.position = 0
+        self.rowcount = -1
+        self.itersize = 2000
+
+    # (pattern on the normalized query, handler); first match wins
+    HANDLERS = []
+
+    def execute(self, query, params=()):
+        q = _normalize(query)
+        # Named (%(name)s) parameters stay a dict, positional ones a tuple
+        params = params if isinstance(params, dict) else tuple(params or ())
+        for pattern, handler in self.HANDLERS:
+            if pattern.search(q):
+                with self.db.lock:
+                    rows = handler(self, q, params)
+                break
+        else:
+            raise NotImplementedError(f"MemoryCursor does not support: {q[:120]}")
+        self.result = [dict(row) for row in rows]
+        self.position = 0
+        self.rowcount = len(self.result)
+
+    def _next(self, n):
+        rows = self.result[self.position:self.position + n]
+        self.position += len(rows)
+        if self.tuples:
+            return [tuple(row.values()) for row in rows]
+        return rows
+
+    def fetchone(self):
+        rows = self._next(1)
+        return rows[0] if rows else None
+
+    def fetchmany(self, size=None):
+        return self._next(size or self.itersize)
+
+    def fetchall(self):
+        return self._next(len(self.result))
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- users ---
+
+    def _user_by_email(self, q, params):
+        user = self.db.user_by_email(params[0])
+        return [_project(user, _select_columns(q))] if user else []
+
+    def _register(self, q, params):
+        if params[0] in self.db.emails:
+            return []  # ON CONFLICT (email) DO NOTHING
+        user = self.db.add_user(params[0], params[1], **dict(zip(USER_COLUMNS[2:], params[2:])))
+        self.connection.undo(self._drop_user, user)
+        return [_project(user, _returning(q))]
+
+    def _drop_user(self, user):
+        self.db.users.pop(user["id"], None)
+        self.db.emails.pop(user["email"], None)
+
+    def _screening_version(self, q, params):
+        user = self.db.users.get(params[0])
+        return [{"screening_version": user["screening_version"]}] if user else []
+
+    def _patient_id(self, q, params):
+        user = self.db.users.get(params[0])
+        return [{"id": user["id"]}] if user and user["role"] == "PATIENT" else []
+
+    # --- stroke_screenings ---
+
+    def _insert_screening(self, q, params):
+        if q.startswith("INSERT INTO stroke_screenings ( id, created_at,"):
+            screening_id, created_at, values = params[0], params[1], params[2:]
+            if screening_id in self.db.screenings:
+                return []  # ON CONFLICT (id) DO NOTHING
+            fields = {"id": screening_id, "created_at": created_at}
+        else:
+            values, fields = params, {}
+        user = self.db.users.get(values[0])
+        if user is None:
+            raise psycopg2.IntegrityError("stroke_screenings.user_id violates foreign key constraint")
+        fields.update(zip(SCREENING_COLUMNS[1:], values[1:]))
+        row = self.db.add_screening(values[0], **fields)
+        self.connection.undo(self._drop_screening, row)
+        columns = _returning(q)
+        return [_project(row, columns)] if columns else []
+
+    def _drop_screening(self, row):
+        self.db.screenings.pop(row["id"], None)
+        user = self.db.users.get(row["user_id"])
+        if user is not None:
+            user["screening_version"] -= 1
+
+    def _history(self, q, params):
+        rows = self.db.screenings_of(params[0])
+        if len(params) == 2:
+            # screening_version > %s (NULL never matches)
+            rows = [s for s in rows if s.get("screening_version") is not None and s["screening_version"] > params[1]]
+        return [_project(s, _select_columns(q)) for s in rows]
+
+    def _screening_detail(self, q, params):
+        row = self.db.screenings.get(params[0])
+        if row is None or row["user_id"] != params[1]:
+            return []
+        return [_project(row, _select_columns(q))]
+
+    def _population(self, q, params):
+        return [
+            {
+                "age_at_screening": s["age_at_screening"],
+                "gender": self.db.users[s["user_id"]]["gender"],
+                "stroke_probability": float(s["stroke_probability"]),
+            }
+            for s in self.db.screenings.values()
+        ]
+
+    # --- admin views ---
+
+    def _patient_summary(self, q, params):
+        own = {}
+        for s in self.db.screenings.values():
+            own.setdefault(s["user_id"], []).append(s)
+        rows = []
+        for user in self.db.users.values():
+            if user["role"] != "PATIENT":
+                continue
+            screenings = own.get(user["id"], [])
+            row = _project(user, ["id", "full_name", "email", "date_of_birth", "gender", "role"])
+            row.update(
+                total_screenings=len(screenings),
+                last_screening_date=max((s["created_at"] for s in screenings), default=None),
+                # MAX() over text, as in the view
+                highest_risk_level=max((s["risk_level"] for s in screenings), default=None),
+            )
+            rows.append(row)
+        # ORDER BY last_screening_date DESC NULLS LAST
+        rows.sort(key=lambda r: (r["last_screening_date"] is not None, r["last_screening_date"] or 0), reverse=True)
+        return _project_select(q, rows)
+
+    def _statistics(self, q, params):
+        rows = []
+        for level in ("High", "Medium", "Low"):
+            group = [s for s in self.db.screenings.values() if s["risk_level"] == level]
+            if not group:
+                continue
+            n = len(group)
+            rows.append({
+                "risk_level": level, "total_count": n,
+                "avg_age": round(sum(s["age_at_screening"] for s in group) / n, 1),
+                "avg_bmi": round(sum(s["bmi"] for s in group) / n, 1),
+                "avg_glucose": round(sum(s["avg_glucose_level"] for s in group) / n, 1),
+                "avg_probability": round(sum(s["stroke_probability"] for s in group) / n, 4),
+                "hypertension_count": sum(bool(s["hypertension"]) for s in group),
+                "heart_disease_count": sum(bool(s["heart_disease"]) for s in group),
+            })
+        return rows
+
+    def _recent_high_risk(self, q, params):
+        cutoff = datetime.combine(date.today() - timedelta(days=30), datetime.min.time(), timezone.utc)
+        rows = []
+        for s in self.db.screenings.values():
+            if s["risk_level"] != "High" or s["created_at"] < cutoff:
+                continue
+            user = self.db.users[s["user_id"]]
+            row = _project(s, ["id", "user_id"])
+            row.update(_project(user, ["full_name", "email", "phone_number"]))
+            row.update(_project(s, ["age_at_screening", "bmi", "stroke_probability", "risk_level", "created_at"]))
+            rows.append(row)
+        rows.sort(key=lambda r: r["created_at"], reverse=True)
+        return _project_select(q, rows)
+
+    def _count_patients(self, q, params):
+        return [{"total": sum(u["role"] == "PATIENT" for u in self.db.users.values())}]
+
+    def _count_screenings(self, q, params):
+        rows = self.db.screenings.values()
+        if "risk_level = 'High'" in q:
+            rows = [s for s in rows if s["risk_level"] == "High"]
+        elif "INTERVAL '7 days'" in q:
+            cutoff = datetime.combine(date.today() - timedelta(days=7), datetime.min.time(), timezone.utc)
+            rows = [s for s in rows if s["created_at"] >= cutoff]
+        return [{"total": len(rows)}]
+
+    # --- export (app/export.py, server-side cursor) ---
+
+    def _export(self, q, params):
+        def day_start(day):
+            return datetime.combine(day, datetime.min.time(), timezone.utc)
+
+        rows = []
+        for s in sorted(self.db.screenings.values(), key=lambda s: s["created_at"]):
+            if "start_date" in params and s["created_at"] < day_start(params["start_date"]):
+                continue
+            if "end_date" in params and s["created_at"] >= day_start(params["end_date"] + timedelta(days=1)):
+                continue
+            if "risk_level" in params and s["risk_level"] != params["risk_level"]:
+                continue
+            user = self.db.users[s["user_id"]]
+            rows.append({
+                "screening_id": s["id"],
+                "patient_key": hashlib.md5((params["salt"] + s["user_id"]).encode()).hexdigest(),
+                "gender": user["gender"],
+                "birth_year": user["date_of_birth"].year,
+                **_project(s, [
+                    "age_at_screening", "height_cm", "weight_kg", "bmi",
+                    "hypertension", "heart_disease", "ever_married", "work_type",
+                    "residence_type", "avg_glucose_level", "smoking_status",
+                    "stroke_probability", "risk_level", "prediction", "created_at",
+                ]),
+            })
+        return rows
+
+    def _select_one(self, q, params):
+        return [{"?column?": 1}]
+
+MemoryCursor.HANDLERS = [(re.compile(pattern), handler) for pattern, handler in [
+    (r"^SELECT 1$", MemoryCursor._select_one),
+    (r"^SELECT [\w, ]+ FROM users WHERE email = %s$", MemoryCursor._user_by_email),
+    (r"^INSERT INTO users .* ON CONFLICT \(email\) DO NOTHING RETURNING", MemoryCursor._register),
+    (r"^SELECT screening_version FROM users WHERE id = %s$", MemoryCursor._screening_version),
+    (r"^SELECT id FROM users WHERE id = %s AND role = 'PATIENT'$", MemoryCursor._patient_id),
+    (r"^SELECT COUNT\(\*\) as total FROM users WHERE role = 'PATIENT'$", MemoryCursor._count_patients),
+    (r"^SELECT COUNT\(\*\) as total FROM stroke_screenings", MemoryCursor._count_screenings),
+    (r"^INSERT INTO stroke_screenings ", MemoryCursor._insert_screening),
+    (r"^SELECT [\w, ]+ FROM stroke_screenings WHERE user_id = %s( AND screening_version > %s)? ORDER BY created_at DESC", MemoryCursor._history),
+    (r"^SELECT [\w, ]+ FROM stroke_screenings WHERE id = %s AND user_id = %s$", MemoryCursor._screening_detail),
+    (r"^SELECT s\.age_at_screening, u\.gender::text, s\.stroke_probability::float8 FROM stroke_screenings s JOIN users u", MemoryCursor._population),
+    (r"^SELECT [\w, *]+ FROM user_screening_summary", MemoryCursor._patient_summary),
+    (r"^SELECT \* FROM screening_statistics$", MemoryCursor._statistics),
+    (r"^SELECT [\w, *]+ FROM recent_high_risk_screenings$", MemoryCursor._recent_high_risk),
+    (r"^SELECT s\.id::text AS screening_id, .* FROM stroke_screenings s JOIN users u ON u\.id = s\.user_id .*ORDER BY s\.created_at$", MemoryCursor._export),
+]]
+
+class MemoryConnection:
+    """One transaction against a MemoryDatabase (undo journal for rollback)"""
+
+    def __init__(self, db: MemoryDatabase):
+        self.db = db
+        self.journal = []
+        self.closed = 0
+
+    def cursor(self, cursor_factory=None, name=None):
+        return MemoryCursor(self, tuples=cursor_factory is None)
+
+    def undo(self, fn, *args):
+        self.journal.append((fn, args))
+
+    def commit(self):
+        self.journal = []
+
+    def rollback(self):
+        with self.db.lock:
+            while self.journal:
+                fn, args = self.journal.pop()
+                fn(*args)
+
+class MemoryBackend(DatabaseBackend):
+    """Serve get_db_connection / get_db_cursor from a MemoryDatabase"""
+
+    def __init__(self, db: Optional[MemoryDatabase] = None):
+        self.db = db if db is not None else MemoryDatabase()
+
+    @contextmanager
+    def connection(self, readonly: bool = False):
+        conn = MemoryConnection(self.db)
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+class PostgresRollbackBackend(DatabaseBackend):
+    """
+    All access on one Postgres connection inside a transaction that is
+    never committed; each get_db_cursor() block is a SAVEPOINT, so a
+    handler error rolls back only that block, as it would in production.
+    Blocks are serialized (one connection).
+    """
+
+    def __init__(self, dsn: str):
+        self.conn = psycopg2.connect(dsn)
+        self.conn.autocommit = False
+        self.lock = threading.RLock()
+
+    @contextmanager
+    def connection(self, readonly: bool = False):
+        with self.lock:
+            with self.conn.cursor() as cursor:
+                cursor.execute("SAVEPOINT db_backend_block")
+            try:
+                yield _SavepointConnection(self.conn)
+            except Exception:
+                with self.conn.cursor() as cursor:
+                    cursor.execute("ROLLBACK TO SAVEPOINT db_backend_block")
+                raise
+            with self.conn.cursor() as cursor:
+                cursor.execute("RELEASE SAVEPOINT db_backend_block")
+
+    def close(self):
+        if not self.conn.closed:
+            self.conn.rollback()
+            self.conn.close()
+
+class _SavepointConnection:
+    """Connection proxy whose commit / rollback stay inside the outer transaction"""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self, *args, **kwargs):
+        return self._conn.cursor(*args, **kwargs)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        with self._conn.cursor() as cursor:
+            cursor.execute("ROLLBACK TO SAVEPOINT db_backend_block")
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+@contextmanager
+def _installed(backend: DatabaseBackend):
+    previous = get_backend()
+    set_backend(backend)
+    try:
+        yield backend
+    finally:
+        # set_backend closes the replaced backend
+        set_backend(previous)
+
+@contextmanager
+def memory_database(db: Optional[MemoryDatabase] = None):
+    """
+    Route the app to an in-memory database for the duration of the block
+    Usage (pytest):
+        @pytest.fixture
+        def db():
+            with memory_database(MemoryDatabase.seeded(patients=5)) as backend:
+                yield backend.db
+    """
+    with _installed(MemoryBackend(db)) as backend:
+        yield backend
+
+@contextmanager
+def rollback_database(dsn: Optional[str] = None):
+    """
+    Route the app to local Postgres (DATABASE_URL_TEST) and discard
+    everything it wrote at the end. Never falls back to DATABASE_URL /
+    DATABASE_URL_DIRECT: those point at the real database in .env
+    Migrations must already be applied to that database
+    """
+    dsn = dsn or os.getenv('DATABASE_URL_TEST')
+    if not dsn:
+        raise RuntimeError("DATABASE_URL_TEST is required")
+    with _installed(PostgresRollbackBackend(dsn)) as backend:
+        yield backend
@@ -0,0 +1,118 @@
+"""
+Degraded mode while the primary database is unavailable
+
+- user_cache: users loaded by get_current_user in the last
+  DEGRADED_USER_TTL seconds, so authenticated patients can still be
+  identified when the users lookup fails fast.
+- pending_writes: bounded queue of INSERTs (screenings) deferred during
+  the outage and replayed by the reconnect thread once the circuit breaker
+  closes, or in a background thread after the next successful primary
+  connection (a single connection error queues a write without opening
+  the breaker). Statements must be idempotent (ON CONFLICT DO NOTHING);
+  the queue lives in process memory, so a restart during an outage loses it.
+"""
+import os
+import time
+import threading
+from collections import OrderedDict, deque
+from typing import Optional
+from app.database import breaker, get_db_cursor, DatabaseUnavailable
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEGRADED_USER_TTL = float(os.getenv('DEGRADED_USER_TTL', 900))
+DEGRADED_USER_CACHE_SIZE = int(os.getenv('DEGRADED_USER_CACHE_SIZE', 10000))
+DEGRADED_PENDING_WRITES = int(os.getenv('DEGRADED_PENDING_WRITES', 1000))
+
+class UserCache:
+    """Recently authenticated users (LRU, TTL)"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.users = OrderedDict()
+        self.lock = threading.Lock()
+
+    def put(self, email: str, user: dict):
+        with self.lock:
+            self.users[email] = (time.monotonic(), user)
+            self.users.move_to_end(email)
+            while len(self.users) > self.maxsize:
+                self.users.popitem(last=False)
+
+    def get(self, email: str) -> Optional[dict]:
+        with self.lock:
+            entry = self.users.get(email)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            return None
+        return entry[1]
+
+class PendingWrites:
+    """Bounded queue of statements to run once the database is back"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.items = deque()
+        self.lock = threading.Lock()
+        self.flushing = threading.Lock()
+        self.flusher = None
+        self.dropped = 0
+
+    def add(self, query: str, params: tuple) -> bool:
+        """Queue a statement; False when the queue is full"""
+        with self.lock:
+            if len(self.items) >= self.maxsize:
+                self.dropped += 1
+                return False
+            self.items.append((query, params))
+            return True
+
+    def flush(self):
+        """Replay queued statements, one transaction each (no-op while another flush runs)"""
+        if not self.flushing.acquire(blocking=False):
+            return
+        try:
+            self._flush()
+        finally:
+            self.flushing.release()
+
+    def flush_soon(self):
+        """Start a background flush if statements are queued (cheap when empty)"""
+        if not self.items or self.flushing.locked():
+            return
+        with self.lock:
+            if self.flusher is not None and self.flusher.is_alive():
+                return
+            self.flusher = threading.Thread(target=self.flush, name='pending-writes-flush', daemon=True)
+            self.flusher.start()
+
+    def _flush(self):
+        replayed = failed = 0
+        while True:
+            with self.lock:
+                if not self.items:
+                    break
+                query, params = self.items.popleft()
+            try:
+                with get_db_cursor() as cursor:
+                    cursor.execute(query, params)
+                replayed += 1
+            except DatabaseUnavailable:
+                # Down again: keep it for the next recovery
+                with self.lock:
+                    self.items.appendleft((query, params))
+                break
+            except Exception as e:
+                failed += 1
+                logger.error(f"Dropping deferred write: {e}")
+        if replayed or failed:
+            logger.info("Replayed %d deferred writes (%d failed)", replayed, failed)
+
+    def __len__(self):
+        return len(self.items)
+
+user_cache = UserCache(DEGRADED_USER_CACHE_SIZE, DEGRADED_USER_TTL)
+pending_writes = PendingWrites(DEGRADED_PENDING_WRITES)
+breaker.on_recover(pending_writes.flush)
+breaker.on_success(pending_writes.flush_soon)
@@ -5,7 +5,8 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
 from app.auth import decode_access_token
-from app.database import get_db_cursor
+from app.database import get_db_cursor, DatabaseUnavailable
+from app.degraded import user_cache
 from app.models import UserRole
 
 # HTTP Bearer token scheme
@@ -37,18 +38,29 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Get user from database
-    with get_db_cursor() as cursor:
-        cursor.execute(
-            """
-            SELECT id, email, full_name, date_of_birth, gender, 
-                   phone_number, role, created_at, updated_at
-            FROM users 
-            WHERE email = %s
-            """,
-            (email,)
-        )
-        user = cursor.fetchone()
+    # Get user from database (recently seen users are served from
+    # user_cache while the database is unavailable)
+    try:
+        with get_db_cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT id, email, full_name, date_of_birth, gender, 
+                       phone_number, role, created_at, updated_at,
+                       screening_version
+                FROM users 
+                WHERE email = %s
+                """,
+                (email,)
+            )
+            user = cursor.fetchone()
+    except DatabaseUnavailable:
+        user = user_cache.get(email)
+        if user is None:
+            raise
+        return dict(user, degraded=True)
+    
+    if user is not None:
+        user_cache.put(email, user)
     
     if user is None:
         raise HTTPException(
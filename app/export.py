@@ -0,0 +1,256 @@
+"""
+Export of screenings for analytics: columnar (Arrow IPC stream / Parquet)
+or NDJSON (no pyarrow needed). Rows are read through a server-side cursor
+in fixed-size batches, so memory stays bounded regardless of table size.
+"""
+import os
+import hashlib
+from datetime import date
+from typing import Generator, Iterable, Optional
+from app.database import get_db_connection
+from app.models import RiskLevel
+from app.serialization import dumps
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional at import time
+    pa = None
+    pq = None
+
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 10000))
+
+# Salt for pseudonymous patient ids; keep it stable so exports can be joined.
+# Required: without it md5(user_id) can be reversed by anyone holding the ids
+EXPORT_ID_SALT = os.getenv('EXPORT_ID_SALT', '')
+
+EXPORT_FORMATS = {
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+# (column, SQL expression, arrow type factory) in output order.
+# Users are reduced to a salted hash, gender and birth year.
+EXPORT_COLUMNS = [
+    ('screening_id', 's.id::text', lambda: pa.string()),
+    ('patient_key', "md5(%(salt)s || s.user_id::text)", lambda: pa.string()),
+    ('gender', 'u.gender::text', lambda: pa.dictionary(pa.int8(), pa.string())),
+    ('birth_year', 'EXTRACT(YEAR FROM u.date_of_birth)::int', lambda: pa.int16()),
+    ('age_at_screening', 's.age_at_screening', lambda: pa.int16()),
+    ('height_cm', 's.height_cm::float8', lambda: pa.float32()),
+    ('weight_kg', 's.weight_kg::float8', lambda: pa.float32()),
+    ('bmi', 's.bmi::float8', lambda: pa.float32()),
+    ('hypertension', 's.hypertension', lambda: pa.bool_()),
+    ('heart_disease', 's.heart_disease', lambda: pa.bool_()),
+    ('ever_married', 's.ever_married', lambda: pa.bool_()),
+    ('work_type', 's.work_type::text', lambda: pa.dictionary(pa.int8(), pa.string())),
+    ('residence_type', 's.residence_type::text', lambda: pa.dictionary(pa.int8(), pa.string())),
+    ('avg_glucose_level', 's.avg_glucose_level::float8', lambda: pa.float32()),
+    ('smoking_status', 's.smoking_status::text', lambda: pa.dictionary(pa.int8(), pa.string())),
+    ('stroke_probability', 's.stroke_probability::float8', lambda: pa.float64()),
+    ('risk_level', 's.risk_level::text', lambda: pa.dictionary(pa.int8(), pa.string())),
+    ('prediction', 's.prediction::int2', lambda: pa.int8()),
+    ('created_at', 's.created_at', lambda: pa.timestamp('us', tz='UTC')),
+]
+
+def require_pyarrow():
+    """Raise a clear error when pyarrow is not installed"""
+    if pa is None:
+        raise RuntimeError("pyarrow is required for columnar export (pip install pyarrow)")
+
+def require_export_salt():
+    """Refuse to export pseudonymous ids without a secret salt"""
+    if not EXPORT_ID_SALT:
+        raise RuntimeError("EXPORT_ID_SALT must be set to export screenings (patient keys would be reversible)")
+
+def export_schema() -> "pa.Schema":
+    """Arrow schema of exported screenings"""
+    require_pyarrow()
+    return pa.schema([(name, type_factory()) for name, _, type_factory in EXPORT_COLUMNS])
+
+def build_export_query(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    risk_level: Optional[RiskLevel] = None
+) -> tuple:
+    """
+    Build export SELECT with filters pushed down to SQL
+    end_date is inclusive
+    """
+    require_export_salt()
+    select_list = ",\n       ".join(f"{expr} AS {name}" for name, expr, _ in EXPORT_COLUMNS)
+    conditions = []
+    params = {'salt': EXPORT_ID_SALT}
+
+    if start_date is not None:
+        conditions.append("s.created_at >= %(start_date)s")
+        params['start_date'] = start_date
+    if end_date is not None:
+        conditions.append("s.created_at < %(end_date)s::date + 1")
+        params['end_date'] = end_date
+    if risk_level is not None:
+        conditions.append("s.risk_level = %(risk_level)s")
+        params['risk_level'] = RiskLevel(risk_level).value
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = f"""
+        SELECT {select_list}
+        FROM stroke_screenings s
+        JOIN users u ON u.id = s.user_id
+        {where}
+        ORDER BY s.created_at
+    """
+    return query, params
+
+def iter_screening_rows(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    risk_level: Optional[RiskLevel] = None,
+    batch_size: int = EXPORT_BATCH_SIZE
+) -> Generator:
+    """
+    Yield lists of row tuples (EXPORT_COLUMNS order) of at most batch_size
+    Uses a named (server-side) cursor inside one read-only transaction
+    """
+    query, params = build_export_query(start_date, end_date, risk_level)
+
+    with get_db_connection(readonly=True) as conn:
+        cursor = conn.cursor(name='screening_export')
+        cursor.itersize = batch_size
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cursor.close()
+
+def iter_screening_batches(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    risk_level: Optional[RiskLevel] = None,
+    batch_size: int = EXPORT_BATCH_SIZE
+) -> Generator:
+    """Yield pyarrow RecordBatches of screenings"""
+    schema = export_schema()
+    for rows in iter_screening_rows(start_date, end_date, risk_level, batch_size):
+        columns = list(zip(*rows))
+        arrays = [
+            pa.array(columns[i], type=field.type)
+            if not pa.types.is_dictionary(field.type)
+            else pa.array(columns[i], type=pa.string()).dictionary_encode().cast(field.type)
+            for i, field in enumerate(schema)
+        ]
+        yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+def stream_ndjson(row_batches: Iterable) -> Generator:
+    """
+    Encode row batches as newline-delimited JSON, one chunk per batch
+    (no pyarrow needed; HTTP compression is applied per chunk by
+    app/compression.py)
+    """
+    names = [name for name, _, _ in EXPORT_COLUMNS]
+    for rows in row_batches:
+        yield b"".join(dumps(dict(zip(names, row))) + b"\n" for row in rows)
+
+class _ChunkSink:
+    """Minimal writable file that hands written bytes back to a generator"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+def _open_writer(fmt: str, sink, compression: str):
+    schema = export_schema()
+    if fmt == 'parquet':
+        return pq.ParquetWriter(sink, schema, compression=compression)
+    if fmt == 'arrow':
+        options = pa.ipc.IpcWriteOptions(compression=compression if compression in ('zstd', 'lz4') else None)
+        return pa.ipc.new_stream(sink, schema, options=options)
+    raise ValueError(f"Unsupported export format: {fmt}")
+
+def stream_export(
+    batches: Iterable,
+    fmt: str = 'parquet',
+    compression: str = 'zstd'
+) -> Generator:
+    """
+    Encode record batches and yield the encoded bytes as they are produced
+    Suitable for a StreamingResponse body
+    """
+    sink = _ChunkSink()
+    writer = _open_writer(fmt, sink, compression)
+    try:
+        for batch in batches:
+            if fmt == 'parquet':
+                # One row group per batch keeps writer memory bounded
+                writer.write_table(pa.Table.from_batches([batch]))
+            else:
+                writer.write_batch(batch)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
+
+def export_to_file(
+    path: str,
+    fmt: str = 'parquet',
+    compression: str = 'zstd',
+    **filters
+) -> int:
+    """Write an export to path, return number of rows written"""
+    rows = 0
+
+    def counted(batches):
+        nonlocal rows
+        for batch in batches:
+            rows += len(batch)
+            yield batch
+
+    if fmt == 'ndjson':
+        chunks = stream_ndjson(counted(iter_screening_rows(**filters)))
+    else:
+        chunks = stream_export(counted(iter_screening_batches(**filters)), fmt, compression)
+    with open(path, 'wb') as f:
+        for chunk in chunks:
+            f.write(chunk)
+
+    logger.info(f"Exported {rows} screenings to {path}")
+    return rows
+
+def export_filename(fmt: str, **filters) -> str:
+    """Deterministic download filename for an export request"""
+    _, extension = EXPORT_FORMATS[fmt]
+    key = hashlib.md5(repr(sorted((k, str(v)) for k, v in filters.items())).encode()).hexdigest()[:8]
+    return f"stroke_screenings_{date.today().isoformat()}_{key}.{extension}"
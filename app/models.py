@@ -1,7 +1,11 @@
 """
 Pydantic models for request/response validation
+
+Models are immutable and never revalidated: request models are validated
+once when the body is parsed, response models once when built from a row.
+(Pydantic v2 models keep fields in __dict__, so __slots__ is not available.)
 """
-from pydantic import BaseModel, EmailStr, Field, validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
 from typing import Optional, Literal
 from datetime import datetime, date
 from enum import Enum
@@ -40,11 +44,16 @@ class SmokingStatus(str, Enum):
     SMOKES = "smokes"
     UNKNOWN = "Unknown"
 
+# Shared by every model below
+MODEL_CONFIG = ConfigDict(frozen=True, revalidate_instances='never')
+
 # ============================================
 # AUTH MODELS
 # ============================================
 
 class UserRegister(BaseModel):
+    model_config = MODEL_CONFIG
+
     email: EmailStr
     password: str = Field(..., min_length=8)
     full_name: str = Field(..., min_length=2, max_length=255)
@@ -52,25 +61,34 @@ class UserRegister(BaseModel):
     gender: Gender
     phone_number: Optional[str] = None
     
-    @validator('phone_number')
-    def validate_phone(cls, v):
+    @field_validator('phone_number')
+    @classmethod
+    def validate_phone(cls, v: Optional[str]) -> Optional[str]:
         if v and not v.startswith('+'):
             raise ValueError('Phone number must start with +')
         return v
 
 class UserLogin(BaseModel):
+    model_config = MODEL_CONFIG
+
     email: EmailStr
     password: str
 
 class Token(BaseModel):
+    model_config = MODEL_CONFIG
+
     access_token: str
     token_type: str = "bearer"
 
 class TokenData(BaseModel):
+    model_config = MODEL_CONFIG
+
     email: Optional[str] = None
     role: Optional[UserRole] = None
 
 class UserResponse(BaseModel):
+    model_config = MODEL_CONFIG
+
     id: str
     email: str
     full_name: str
@@ -86,6 +104,8 @@ class UserResponse(BaseModel):
 
 class ScreeningInput(BaseModel):
     """Input untuk screening (dari frontend)"""
+    model_config = MODEL_CONFIG
+
     height_cm: float = Field(..., ge=50, le=250)
     weight_kg: float = Field(..., ge=20, le=300)
     hypertension: bool
@@ -98,6 +118,8 @@ class ScreeningInput(BaseModel):
 
 class ScreeningResponse(BaseModel):
     """Response setelah screening"""
+    model_config = MODEL_CONFIG
+
     id: str
     user_id: str
     age_at_screening: int
@@ -115,8 +137,23 @@ class ScreeningResponse(BaseModel):
     risk_level: RiskLevel
     created_at: datetime
 
+class PopulationPercentile(BaseModel):
+    """Posisi probabilitas pasien dibanding screening lain"""
+    model_config = MODEL_CONFIG
+
+    percentile: float
+    age_band: str
+    gender: str
+    population: int
+
+class ScreeningResult(ScreeningResponse):
+    """Response screening baru + konteks populasi"""
+    population_percentile: Optional[PopulationPercentile] = None
+
 class ScreeningSummary(BaseModel):
     """Summary untuk list screenings"""
+    model_config = MODEL_CONFIG
+
     id: str
     age_at_screening: int
     bmi: float
@@ -130,6 +167,8 @@ class ScreeningSummary(BaseModel):
 
 class PatientSummary(BaseModel):
     """Summary pasien untuk admin dashboard"""
+    model_config = MODEL_CONFIG
+
     id: str
     full_name: str
     email: str
@@ -141,6 +180,8 @@ class PatientSummary(BaseModel):
 
 class ScreeningStatistics(BaseModel):
     """Statistik screening"""
+    model_config = MODEL_CONFIG
+
     risk_level: RiskLevel
     total_count: int
     avg_age: float
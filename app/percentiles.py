@@ -0,0 +1,120 @@
+"""
+Population percentile index for stroke probabilities
+Keeps a sorted array of stored probabilities per (age band, gender) segment
+so the percentile of a new screening is one binary search (O(log n)), with
+no aggregate scan over stroke_screenings on the request path.
+
+The index is rebuilt from the database every PERCENTILE_REFRESH_SECONDS in a
+background thread and updated incrementally after each saved screening.
+Segments smaller than PERCENTILE_MIN_SEGMENT fall back to the age band, then
+to the whole population.
+"""
+import os
+import time
+import bisect
+import threading
+from array import array
+from typing import Optional
+from app.database import get_db_cursor
+import logging
+
+logger = logging.getLogger(__name__)
+
+PERCENTILE_REFRESH_SECONDS = float(os.getenv('PERCENTILE_REFRESH_SECONDS', 3600))
+PERCENTILE_MIN_SEGMENT = int(os.getenv('PERCENTILE_MIN_SEGMENT', 30))
+
+# Upper bounds (exclusive) of age bands
+AGE_BAND_LIMITS = [40, 55, 65, 75]
+AGE_BAND_LABELS = ['<40', '40-54', '55-64', '65-74', '75+']
+
+ALL = '*'
+
+def age_band(age: int) -> str:
+    return AGE_BAND_LABELS[bisect.bisect_right(AGE_BAND_LIMITS, age)]
+
+class PercentileIndex:
+    """Sorted probability arrays per segment"""
+
+    def __init__(self):
+        self.segments = {}
+        self.lock = threading.Lock()
+        self.loaded_at = 0.0
+        self._refreshing = False
+
+    @staticmethod
+    def _keys(age: int, gender: str):
+        band = age_band(age)
+        # Most specific first
+        return [(band, gender), (band, ALL), (ALL, ALL)]
+
+    def build(self, rows):
+        """Replace the index from (age, gender, probability) rows"""
+        buckets = {}
+        for age, gender, probability in rows:
+            for key in self._keys(age, gender):
+                buckets.setdefault(key, []).append(float(probability))
+        segments = {key: array('d', sorted(values)) for key, values in buckets.items()}
+        with self.lock:
+            self.segments = segments
+            self.loaded_at = time.monotonic()
+
+    def add(self, age: int, gender: str, probability: float):
+        """Insert one new screening"""
+        with self.lock:
+            for key in self._keys(age, gender):
+                bisect.insort(self.segments.setdefault(key, array('d')), float(probability))
+
+    def percentile(self, age: int, gender: str, probability: float) -> Optional[dict]:
+        """
+        Share of stored screenings with a lower probability (0-100)
+        Returns the segment used, or None if the index is still empty
+        """
+        with self.lock:
+            for band, segment_gender in self._keys(age, gender):
+                values = self.segments.get((band, segment_gender))
+                if values is not None and (len(values) >= PERCENTILE_MIN_SEGMENT or band == ALL):
+                    if not values:
+                        return None
+                    rank = bisect.bisect_left(values, probability)
+                    return {
+                        "percentile": round(100.0 * rank / len(values), 1),
+                        "age_band": band,
+                        "gender": segment_gender,
+                        "population": len(values),
+                    }
+        return None
+
+    def refresh(self):
+        """Rebuild from the database (read replica when available)"""
+        try:
+            with get_db_cursor(readonly=True, cursor_factory=None) as cursor:
+                cursor.execute(
+                    """
+                    SELECT s.age_at_screening, u.gender::text, s.stroke_probability::float8
+                    FROM stroke_screenings s
+                    JOIN users u ON u.id = s.user_id
+                    """
+                )
+                rows = cursor.fetchall()
+            self.build(rows)
+            logger.info("Percentile index rebuilt from %d screenings", len(rows))
+        except Exception as e:
+            logger.warning(f"Percentile index refresh failed: {e}")
+            # Retry in a minute instead of on every request
+            self.loaded_at = time.monotonic() - PERCENTILE_REFRESH_SECONDS + 60
+        finally:
+            self._refreshing = False
+
+    def refresh_if_stale(self):
+        """Start a background rebuild when the index is older than the refresh interval"""
+        fresh = self.loaded_at and time.monotonic() - self.loaded_at < PERCENTILE_REFRESH_SECONDS
+        if self._refreshing or fresh:
+            return
+        with self.lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self.refresh, name='percentile-refresh', daemon=True).start()
+
+# Shared per-process index
+population_index = PercentileIndex()
@@ -0,0 +1,185 @@
+"""
+Opt-in per-request sampling profiler
+A background thread samples the stacks of the threads serving the request
+every PROFILE_INTERVAL_MS and writes the result as collapsed stacks
+(flamegraph.pl / speedscope compatible) to a rotating directory: the event
+loop thread, plus any threadpool worker while it runs work for the request
+(sync endpoints / dependencies, run_in_threadpool: bcrypt, model inference).
+Workers are tracked by track_threadpool(), which wraps anyio's
+to_thread.run_sync; anyio copies the request's context into the worker, so
+the wrapper knows which request a call belongs to.
+
+A request is profiled when PROFILING_ENABLED is set and either it falls in the
+PROFILE_SAMPLE_RATE fraction, or an admin sends the "X-Profile: 1" header.
+Async handlers share the event loop thread, so concurrent requests can show up
+in each other's profiles; at low sample rates this is rare.
+"""
+import os
+import re
+import sys
+import time
+import random
+import functools
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from pathlib import Path
+from typing import List, Optional
+import anyio.to_thread
+from fastapi import Request
+from app.auth import decode_access_token
+from app.models import UserRole
+import logging
+
+logger = logging.getLogger(__name__)
+
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', '').lower() in ('1', 'true', 'yes')
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0))
+PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', 5))
+PROFILE_DIR = Path(os.getenv('PROFILE_DIR', '/tmp/strokeguard-profiles'))
+PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', 200))
+PROFILE_HEADER = 'x-profile'
+PROFILE_SUFFIX = '.collapsed'
+
+# Only names we generated ourselves can be downloaded
+PROFILE_NAME_PATTERN = re.compile(r'^[\w.-]+\.collapsed$')
+
+# Sampler of the request being served (None when it is not profiled)
+_active_sampler: ContextVar[Optional['StackSampler']] = ContextVar('profile_sampler', default=None)
+
+class StackSampler:
+    """Samples the Python stacks of a set of threads from a background thread"""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_ids = {thread_id}
+        self.interval = interval
+        self.samples = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def run_in_thread(self, func, *args):
+        """Run func, sampling the calling (worker) thread while it runs"""
+        thread_id = threading.get_ident()
+        with self._lock:
+            self.thread_ids.add(thread_id)
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self.thread_ids.discard(thread_id)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            with self._lock:
+                thread_ids = list(self.thread_ids)
+            for thread_id in thread_ids:
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_name}")
+                    frame = frame.f_back
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+_run_sync = None
+
+def track_threadpool():
+    """
+    Wrap anyio.to_thread.run_sync (behind run_in_threadpool, sync endpoints
+    and sync dependencies) so worker threads running a profiled request's
+    work are sampled too; calls outside a profiled request are unchanged
+    """
+    global _run_sync
+    if _run_sync is not None:
+        return
+    _run_sync = anyio.to_thread.run_sync
+
+    @functools.wraps(_run_sync)
+    async def run_sync(func, *args, **kwargs):
+        sampler = _active_sampler.get()
+        if sampler is not None:
+            func = functools.partial(sampler.run_in_thread, func)
+        return await _run_sync(func, *args, **kwargs)
+
+    anyio.to_thread.run_sync = run_sync
+
+def _is_admin_request(request: Request) -> bool:
+    """Check the bearer token's role claim (no DB lookup on the hot path)"""
+    authorization = request.headers.get('authorization', '')
+    if not authorization.lower().startswith('bearer '):
+        return False
+    payload = decode_access_token(authorization[7:])
+    return bool(payload) and payload.get('role') == UserRole.ADMIN.value
+
+def should_profile(request: Request) -> bool:
+    if request.headers.get(PROFILE_HEADER) == '1':
+        return _is_admin_request(request)
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+def _rotate():
+    files = sorted(PROFILE_DIR.glob(f'*{PROFILE_SUFFIX}'), key=lambda p: p.stat().st_mtime)
+    for old in files[:max(0, len(files) - PROFILE_MAX_FILES)]:
+        old.unlink(missing_ok=True)
+
+def write_profile(request: Request, samples: Counter, duration_ms: float, status_code: int) -> Path:
+    """Write collapsed stacks for one request, rotating old files"""
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    route = re.sub(r'[^\w]+', '_', request.url.path).strip('_') or 'root'
+    name = f"{time.strftime('%Y%m%dT%H%M%S')}_{int(time.time_ns() % 1_000_000):06d}_{request.method}_{route}_{status_code}_{int(duration_ms)}ms{PROFILE_SUFFIX}"
+    path = PROFILE_DIR / name
+    with open(path, 'w') as f:
+        for stack, count in samples.most_common():
+            f.write(f"{stack} {count}\n")
+    _rotate()
+    return path
+
+async def profile_requests(request: Request, call_next):
+    """HTTP middleware: profile sampled / requested requests"""
+    if not should_profile(request):
+        return await call_next(request)
+
+    sampler = StackSampler(threading.get_ident(), PROFILE_INTERVAL_MS / 1000.0)
+    token = _active_sampler.set(sampler)
+    start = time.perf_counter()
+    sampler.start()
+    try:
+        response = await call_next(request)
+    finally:
+        sampler.stop()
+        _active_sampler.reset(token)
+    duration_ms = (time.perf_counter() - start) * 1000
+
+    try:
+        path = write_profile(request, sampler.samples, duration_ms, response.status_code)
+        response.headers['X-Profile-Id'] = path.name
+    except Exception as e:
+        logger.warning(f"Failed to write profile: {e}")
+    return response
+
+def list_profiles() -> List[dict]:
+    """Stored profiles, newest first"""
+    if not PROFILE_DIR.exists():
+        return []
+    files = sorted(PROFILE_DIR.glob(f'*{PROFILE_SUFFIX}'), key=lambda p: p.stat().st_mtime, reverse=True)
+    return [
+        {"name": p.name, "size_bytes": p.stat().st_size, "created_at": p.stat().st_mtime}
+        for p in files
+    ]
+
+def get_profile_path(name: str) -> Optional[Path]:
+    """Resolve a stored profile by name, None if invalid or missing"""
+    if not PROFILE_NAME_PATTERN.match(name):
+        return None
+    path = PROFILE_DIR / name
+    return path if path.is_file() else None
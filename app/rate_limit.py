@@ -0,0 +1,229 @@
+"""
+Rate limiting and admission control
+- Token bucket per (route, user) - 429 when a client exceeds its rate
+- Concurrency cap per route - 503 when a worker is already saturated
+Both run as route dependencies, before authentication hits the database and
+before any model work. The caller is identified from the JWT "sub" claim
+(no DB lookup), or the client IP for unauthenticated routes.
+
+Behind a reverse proxy / load balancer (Railway, nginx, ...) the socket peer
+is the proxy, so every anonymous caller would share one bucket. Set
+RATE_LIMIT_PROXY_HOPS to the number of proxies in front of the app: the
+client IP is then the address the outermost trusted proxy appended to
+X-Forwarded-For (entry N from the right). Entries further left are written
+by the client and are never trusted.
+
+Buckets live in process memory by default. Set RATE_LIMIT_BACKEND=redis
+(REDIS_URL) to share them across workers / instances.
+"""
+import os
+import math
+import time
+import threading
+from collections import OrderedDict
+from typing import Iterable, Iterator, Optional, Tuple
+from fastapi import HTTPException, Request, status
+from app.auth import decode_access_token
+import logging
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory')
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+# Trusted reverse proxies in front of the app (0 = clients connect directly)
+RATE_LIMIT_PROXY_HOPS = int(os.getenv('RATE_LIMIT_PROXY_HOPS', 0))
+
+class InMemoryBackend:
+    """Token buckets in this process; least recently used keys are evicted"""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def acquire(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self.lock:
+            tokens, last = self.buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - last) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self.buckets[key] = (tokens, now)
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+# Atomic refill-and-take; returns {allowed, retry_after}
+REDIS_TOKEN_BUCKET = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1]) or burst
+local ts = tonumber(data[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(retry_after)}
+"""
+
+class RedisBackend:
+    """Token buckets shared through Redis (any Redis-protocol server works)"""
+
+    def __init__(self, url: str):
+        import redis
+        self.client = redis.Redis.from_url(url, socket_timeout=0.05)
+        self.script = self.client.register_script(REDIS_TOKEN_BUCKET)
+
+    def acquire(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        allowed, retry_after = self.script(keys=[f"ratelimit:{key}"], args=[rate, burst, time.time()])
+        return bool(int(allowed)), float(retry_after)
+
+_backend = None
+
+def get_backend():
+    """Configured bucket backend; falls back to memory if Redis is unavailable"""
+    global _backend
+    if _backend is None:
+        if RATE_LIMIT_BACKEND == 'redis':
+            try:
+                _backend = RedisBackend(REDIS_URL)
+                logger.info("Rate limiter using Redis backend")
+            except Exception as e:
+                logger.warning(f"Redis rate limit backend unavailable, using memory: {e}")
+                _backend = InMemoryBackend()
+        else:
+            _backend = InMemoryBackend()
+    return _backend
+
+def client_ip(request: Request, proxy_hops: Optional[int] = None) -> str:
+    """
+    Client address: the socket peer, or with proxy_hops trusted proxies the
+    X-Forwarded-For entry the outermost of them appended
+    """
+    hops = RATE_LIMIT_PROXY_HOPS if proxy_hops is None else proxy_hops
+    if hops > 0:
+        forwarded = [
+            part.strip()
+            for header in request.headers.getlist('x-forwarded-for')
+            for part in header.split(',') if part.strip()
+        ]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.client.host if request.client else 'unknown'
+
+def client_key(request: Request) -> str:
+    """Caller identity: JWT subject if present, else client IP"""
+    authorization = request.headers.get('authorization', '')
+    if authorization.lower().startswith('bearer '):
+        payload = decode_access_token(authorization[7:])
+        if payload and payload.get('sub'):
+            return f"user:{payload['sub']}"
+    return f"ip:{client_ip(request)}"
+
+class ConcurrencySlot:
+    """
+    One in-flight request counted against RateLimit.max_concurrent
+    Released when the dependency exits, unless hold() handed it to a
+    streaming body: then it is released when the body finishes
+    """
+
+    def __init__(self, limit: Optional["RateLimit"] = None):
+        self.limit = limit
+        self.held = False
+        self.released = limit is None
+        self.lock = threading.Lock()
+
+    def release(self):
+        with self.lock:
+            if self.released:
+                return
+            self.released = True
+        with self.limit.lock:
+            self.limit.in_flight -= 1
+
+    def hold(self, body: Iterable) -> Iterator:
+        """
+        Keep the slot until body is exhausted, fails or is closed
+        Also pass BackgroundTask(slot.release) to the StreamingResponse: a
+        body that is never iterated (client gone) never reaches finally
+        """
+        self.held = True
+
+        def stream():
+            try:
+                yield from body
+            finally:
+                self.release()
+        return stream()
+
+class RateLimit:
+    """
+    Route dependency: token bucket per caller plus optional concurrency cap
+    Usage:
+        @router.post("/predict", dependencies=[Depends(RateLimit("predict", rate=1, burst=10, max_concurrent=32))])
+
+    The slot is freed when the dependency exits, which for a
+    StreamingResponse is before the body is sent. Streaming routes take the
+    ConcurrencySlot the dependency yields and hand it to the body:
+        def export(slot: ConcurrencySlot = Depends(export_limit)):
+            return StreamingResponse(slot.hold(body), background=BackgroundTask(slot.release))
+    """
+
+    def __init__(self, route: str, rate: float, burst: int, max_concurrent: Optional[int] = None):
+        self.route = route
+        self.rate = float(os.getenv(f'RATE_LIMIT_{route.upper()}_RATE', rate))
+        self.burst = int(os.getenv(f'RATE_LIMIT_{route.upper()}_BURST', burst))
+        self.max_concurrent = max_concurrent
+        self.in_flight = 0
+        self.lock = threading.Lock()
+
+    def _check_rate(self, request: Request):
+        try:
+            allowed, retry_after = get_backend().acquire(f"{self.route}:{client_key(request)}", self.rate, self.burst)
+        except Exception as e:
+            # Never fail requests because the limiter store is down
+            logger.warning(f"Rate limiter error on {self.route}: {e}")
+            return
+        if not allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
+    async def __call__(self, request: Request):
+        if not RATE_LIMIT_ENABLED:
+            yield ConcurrencySlot()
+            return
+
+        self._check_rate(request)
+
+        if self.max_concurrent is None:
+            yield ConcurrencySlot()
+            return
+
+        with self.lock:
+            if self.in_flight >= self.max_concurrent:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Server busy, please retry",
+                    headers={"Retry-After": "1"},
+                )
+            self.in_flight += 1
+        slot = ConcurrencySlot(self)
+        try:
+            yield slot
+        finally:
+            if not slot.held:
+                slot.release()
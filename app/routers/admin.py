@@ -1,36 +1,74 @@
 """
 Admin router (view patients, statistics)
 """
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
-from app.models import PatientSummary, ScreeningStatistics, ScreeningResponse
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi.responses import StreamingResponse, FileResponse
+from starlette.background import BackgroundTask
+from typing import List, Literal, Optional
+from datetime import date
+from app.models import PatientSummary, ScreeningStatistics, ScreeningResponse, RiskLevel
 from app.dependencies import get_current_admin
 from app.database import get_db_cursor
+from app import export, profiling
+from app.serialization import rows_response, FastJSONResponse, model_fields, select_fields
+from app.rate_limit import RateLimit, ConcurrencySlot
+from ml.utils.drift import get_drift_monitor
 import logging
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 logger = logging.getLogger(__name__)
 
+# All admin endpoints are reporting reads: they go to the read replica
+# when one is configured and within REPLICA_MAX_LAG_SECONDS.
+
+# Columns of recent_high_risk_screenings (no response model)
+HIGH_RISK_COLUMNS = (
+    "id", "user_id", "full_name", "email", "phone_number",
+    "age_at_screening", "bmi", "stroke_probability", "risk_level", "created_at",
+)
+
+def field_selection(allowed: tuple):
+    """
+    ?fields=a,b dependency: the selected names (all when omitted), used for
+    both the SELECT list and the payload; names are checked against allowed,
+    so they are safe to put in SQL
+    """
+    def dependency(
+        fields: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(allowed)}")
+    ) -> tuple:
+        try:
+            return select_fields(fields, allowed)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    return dependency
+
 @router.get("/patients", response_model=List[PatientSummary])
 async def get_all_patients(
+    fields: tuple = Depends(field_selection(model_fields(PatientSummary))),
     current_user: dict = Depends(get_current_admin)
 ):
     """
     Get all patients with screening summary
+    ?fields= narrows the columns selected and returned
     Only accessible by admins
     """
     try:
-        with get_db_cursor() as cursor:
+        with get_db_cursor(readonly=True) as cursor:
             cursor.execute(
-                """
-                SELECT * FROM user_screening_summary
+                f"""
+                SELECT {', '.join(fields)} FROM user_screening_summary
                 ORDER BY last_screening_date DESC NULLS LAST
                 """
             )
             
             patients = cursor.fetchall()
-            return [PatientSummary(**dict(p)) for p in patients]
+            return rows_response(patients, PatientSummary, fields=fields)
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching patients: {e}")
         raise HTTPException(
@@ -47,12 +85,14 @@ async def get_screening_statistics(
     Only accessible by admins
     """
     try:
-        with get_db_cursor() as cursor:
+        with get_db_cursor(readonly=True) as cursor:
             cursor.execute("SELECT * FROM screening_statistics")
             
             stats = cursor.fetchall()
-            return [ScreeningStatistics(**dict(s)) for s in stats]
+            return rows_response(stats, ScreeningStatistics)
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching statistics: {e}")
         raise HTTPException(
@@ -62,19 +102,23 @@ async def get_screening_statistics(
 
 @router.get("/high-risk-screenings", response_model=List[dict])
 async def get_high_risk_screenings(
+    fields: tuple = Depends(field_selection(HIGH_RISK_COLUMNS)),
     current_user: dict = Depends(get_current_admin)
 ):
     """
     Get recent high-risk screenings (last 30 days)
+    ?fields= narrows the columns selected and returned
     Only accessible by admins
     """
     try:
-        with get_db_cursor() as cursor:
-            cursor.execute("SELECT * FROM recent_high_risk_screenings")
+        with get_db_cursor(readonly=True) as cursor:
+            cursor.execute(f"SELECT {', '.join(fields)} FROM recent_high_risk_screenings")
             
             screenings = cursor.fetchall()
-            return [dict(s) for s in screenings]
+            return FastJSONResponse(screenings)
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching high-risk screenings: {e}")
         raise HTTPException(
@@ -85,14 +129,16 @@ async def get_high_risk_screenings(
 @router.get("/patient/{patient_id}/screenings", response_model=List[ScreeningResponse])
 async def get_patient_screenings(
     patient_id: str,
+    fields: tuple = Depends(field_selection(model_fields(ScreeningResponse))),
     current_user: dict = Depends(get_current_admin)
 ):
     """
     Get all screenings for a specific patient
+    ?fields= narrows the columns selected and returned
     Only accessible by admins
     """
     try:
-        with get_db_cursor() as cursor:
+        with get_db_cursor(readonly=True) as cursor:
             # Verify patient exists
             cursor.execute(
                 "SELECT id FROM users WHERE id = %s AND role = 'PATIENT'",
@@ -106,13 +152,10 @@ async def get_patient_screenings(
                     detail="Patient not found"
                 )
             
-            # Get all screenings
+            # Get all screenings (ScreeningResponse fields are stroke_screenings columns)
             cursor.execute(
-                """
-                SELECT id, user_id, age_at_screening, height_cm, weight_kg, bmi,
-                       hypertension, heart_disease, ever_married, work_type,
-                       residence_type, avg_glucose_level, smoking_status,
-                       stroke_probability, risk_level, created_at
+                f"""
+                SELECT {', '.join(fields)}
                 FROM stroke_screenings
                 WHERE user_id = %s
                 ORDER BY created_at DESC
@@ -121,7 +164,7 @@ async def get_patient_screenings(
             )
             
             screenings = cursor.fetchall()
-            return [ScreeningResponse(**dict(s)) for s in screenings]
+            return rows_response(screenings, ScreeningResponse, fields=fields)
             
     except HTTPException:
         raise
@@ -140,7 +183,7 @@ async def get_dashboard_stats(
     Get overall dashboard statistics for admin
     """
     try:
-        with get_db_cursor() as cursor:
+        with get_db_cursor(readonly=True) as cursor:
             # Total patients
             cursor.execute("SELECT COUNT(*) as total FROM users WHERE role = 'PATIENT'")
             total_patients = cursor.fetchone()["total"]
@@ -172,9 +215,126 @@ async def get_dashboard_stats(
                 "recent_screenings_7days": recent_screenings
             }
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching dashboard stats: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to fetch dashboard statistics"
         )
+
+# Each running export holds one DB connection (its server-side cursor) while
+# the body streams; the slot is handed to the body so the cap covers that time.
+# current_user is declared before slot: dependencies resolve in order, so
+# callers that are not admins never take a token or a slot
+export_limit = RateLimit("export", rate=1 / 60, burst=3, max_concurrent=2)
+
+@router.get("/export/screenings")
+def export_screenings(
+    format: Literal["parquet", "arrow", "ndjson"] = "parquet",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    risk_level: Optional[RiskLevel] = None,
+    current_user: dict = Depends(get_current_admin),
+    slot: ConcurrencySlot = Depends(export_limit)
+):
+    """
+    Stream screenings (with anonymized patient attributes) as Parquet, Arrow
+    or NDJSON (compressed per chunk when the client accepts it)
+    Filters are applied in SQL; rows are streamed in bounded batches
+    Only accessible by admins
+    """
+    try:
+        export.require_export_salt()
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    
+    if format != "ndjson":
+        try:
+            export.require_pyarrow()
+        except RuntimeError as e:
+            raise HTTPException(
+                status_code=status.HTTP_501_NOT_IMPLEMENTED,
+                detail=str(e)
+            )
+    
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must not be after end_date"
+        )
+    
+    filters = {"start_date": start_date, "end_date": end_date, "risk_level": risk_level}
+    media_type, _ = export.EXPORT_FORMATS[format]
+    filename = export.export_filename(format, **filters)
+    
+    logger.info(f"Admin {current_user['id']} started {format} export ({filters})")
+    
+    if format == "ndjson":
+        body = export.stream_ndjson(export.iter_screening_rows(**filters))
+    else:
+        body = export.stream_export(export.iter_screening_batches(**filters), fmt=format)
+    
+    return StreamingResponse(
+        slot.hold(body),
+        media_type=media_type,
+        background=BackgroundTask(slot.release),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/profiles", response_model=List[dict])
+async def list_request_profiles(
+    current_user: dict = Depends(get_current_admin)
+):
+    """
+    List captured request profiles (newest first)
+    Only accessible by admins
+    """
+    return profiling.list_profiles()
+
+@router.get("/profiles/{name}")
+async def download_request_profile(
+    name: str,
+    current_user: dict = Depends(get_current_admin)
+):
+    """
+    Download a captured profile as collapsed stacks
+    Open with speedscope.app or flamegraph.pl
+    Only accessible by admins
+    """
+    path = profiling.get_profile_path(name)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return FileResponse(path, media_type="text/plain", filename=name)
+
+@router.get("/drift")
+async def get_input_drift(
+    reset: bool = Query(False, description="Clear the counters after reading"),
+    current_user: dict = Depends(get_current_admin)
+):
+    """
+    Input drift of live screenings vs the training data (PSI / KS per feature)
+    Counters are per API worker process (see "pid")
+    Only accessible by admins
+    """
+    try:
+        monitor = get_drift_monitor()
+    except Exception as e:
+        logger.error(f"Drift monitor unavailable: {e}")
+        monitor = None
+    if monitor is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Drift monitor not available"
+        )
+    report = monitor.report()
+    if reset:
+        monitor.reset()
+    return report
@@ -2,39 +2,40 @@
 Authentication router (register, login)
 """
 from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi.concurrency import run_in_threadpool
 from app.models import UserRegister, UserLogin, Token, UserResponse
 from app.auth import get_password_hash, verify_password, create_access_token
 from app.database import get_db_cursor
 from app.dependencies import get_current_user
+from app.rate_limit import RateLimit
+from app.logging_config import HOT_PATH
 import logging
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 logger = logging.getLogger(__name__)
 
-@router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+# bcrypt is CPU-bound: limit per client IP
+register_limit = RateLimit("register", rate=1, burst=20, max_concurrent=16)
+login_limit = RateLimit("login", rate=1, burst=20, max_concurrent=16)
+
+@router.post(
+    "/register",
+    response_model=UserResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(register_limit)]
+)
 async def register(user: UserRegister):
     """
     Register new patient user
+    Single round trip: the unique email constraint decides duplicates,
+    so concurrent sign-ups with the same email cannot race
     """
     try:
-        # Check if email already exists
+        # Hash password before taking a DB connection (bcrypt is slow and
+        # releases the GIL, so run it off the event loop)
+        hashed_password = await run_in_threadpool(get_password_hash, user.password)
+        
         with get_db_cursor() as cursor:
-            cursor.execute(
-                "SELECT id FROM users WHERE email = %s",
-                (user.email,)
-            )
-            existing_user = cursor.fetchone()
-            
-            if existing_user:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Email already registered"
-                )
-            
-            # Hash password
-            hashed_password = get_password_hash(user.password)
-            
-            # Insert new user
             cursor.execute(
                 """
                 INSERT INTO users (
@@ -42,6 +43,7 @@ async def register(user: UserRegister):
                     gender, phone_number, role
                 )
                 VALUES (%s, %s, %s, %s, %s, %s, 'PATIENT')
+                ON CONFLICT (email) DO NOTHING
                 RETURNING id, email, full_name, date_of_birth, 
                           gender, phone_number, role, created_at
                 """,
@@ -56,9 +58,16 @@ async def register(user: UserRegister):
             )
             
             new_user = cursor.fetchone()
-            logger.info(f"New user registered: {user.email}")
-            
-            return UserResponse(**dict(new_user))
+        
+        if new_user is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered"
+            )
+        
+        logger.info("New user registered: %s", new_user["id"])
+        
+        return UserResponse(**dict(new_user))
             
     except HTTPException:
         raise
@@ -69,7 +78,7 @@ async def register(user: UserRegister):
             detail="Registration failed"
         )
 
-@router.post("/login", response_model=Token)
+@router.post("/login", response_model=Token, dependencies=[Depends(login_limit)])
 async def login(credentials: UserLogin):
     """
     Login user and return JWT token
@@ -100,7 +109,7 @@ async def login(credentials: UserLogin):
                 data={"sub": user["email"], "role": user["role"]}
             )
             
-            logger.info(f"User logged in: {credentials.email}")
+            logger.info("User logged in: %s", user["id"], extra=HOT_PATH)
             
             return Token(access_token=access_token)
             
@@ -1,25 +1,57 @@
 """
 Screening router (predict & save to database)
 """
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
-from app.models import ScreeningInput, ScreeningResponse, ScreeningSummary
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Header, Response
+from typing import List, Optional
+from app.models import ScreeningInput, ScreeningResponse, ScreeningSummary, ScreeningResult
 from app.dependencies import get_current_patient
-from app.database import get_db_cursor
+from app.database import get_db_cursor, DatabaseUnavailable
+from app.degraded import pending_writes
+from app.serialization import rows_response, FastJSONResponse
+from app.rate_limit import RateLimit
+from app.logging_config import HOT_PATH
+from app.percentiles import population_index
+from fastapi.concurrency import run_in_threadpool
 from ml.utils.prediction import StrokePredictor
-from datetime import date
+from ml.utils.calibration import RiskBands
+from ml.utils.inference_server import get_inference_client
+from ml.utils.drift import get_drift_monitor
+from datetime import date, datetime, timezone
+import base64
+import uuid
 import logging
 
 router = APIRouter(prefix="/screening", tags=["Screening"])
 logger = logging.getLogger(__name__)
 
-# Initialize ML predictor
+# Use the shared inference server when main.py started one,
+# otherwise load the ML predictor in this worker
+predictor = None
+inference_client = None
 try:
-    predictor = StrokePredictor()
-    logger.info("ML Model loaded successfully in screening router")
+    inference_client = get_inference_client()
+    if inference_client is not None:
+        logger.info(f"Using inference server at {inference_client.address}")
 except Exception as e:
-    logger.error(f"Failed to load ML model: {e}")
-    predictor = None
+    logger.error(f"Failed to connect to inference server, loading model locally: {e}")
+
+if inference_client is None:
+    try:
+        predictor = StrokePredictor()
+        logger.info("ML Model loaded successfully in screening router")
+    except Exception as e:
+        logger.error(f"Failed to load ML model: {e}")
+        predictor = None
+
+# Bands for results without a risk_level (same source as the predictor)
+risk_bands = predictor.risk_bands if predictor is not None else RiskBands()
+
+# Input drift counters (in-process, no DB round trip)
+drift_monitor = None
+try:
+    drift_monitor = get_drift_monitor()
+except Exception as e:
+    logger.error(f"Drift monitor unavailable: {e}")
 
 def calculate_age(birth_date: date) -> int:
     """Calculate age from birth date"""
@@ -35,70 +67,33 @@ def calculate_bmi(height_cm: float, weight_kg: float) -> float:
     bmi = weight_kg / (height_m ** 2)
     return round(bmi, 1)
 
-def get_risk_level(probability: float) -> str:
-    """Determine risk level from probability"""
-    if probability >= 0.56:
-        return "High"
-    elif probability >= 0.40:
-        return "Medium"
-    else:
-        return "Low"
-
-def prepare_ml_input(screening_data: dict, age: int, bmi: float) -> dict:
+def screening_features(screening: ScreeningInput, gender: str, age: int, bmi: float) -> dict:
     """
-    Prepare input for ML model
-    Convert from user-friendly format to ML model format
+    Raw model inputs for one screening
+    Encoded into the training column layout by the predictor's FeatureEncoder
     """
-    # Gender mapping
-    gender_map = {"Male": 1, "Female": 0}
-    
-    # Work type one-hot encoding
-    work_type_encoding = {
-        "Govt_job": [1, 0, 0, 0, 0],
-        "Never_worked": [0, 1, 0, 0, 0],
-        "Private": [0, 0, 1, 0, 0],
-        "Self-employed": [0, 0, 0, 1, 0],
-        "children": [0, 0, 0, 0, 1]
-    }
-    
-    # Smoking status one-hot encoding
-    smoking_encoding = {
-        "Unknown": [1, 0, 0, 0],
-        "formerly smoked": [0, 1, 0, 0],
-        "never smoked": [0, 0, 1, 0],
-        "smokes": [0, 0, 0, 1]
-    }
-    
-    # Residence type mapping
-    residence_map = {"Urban": 1, "Rural": 0}
-    
-    work_type = screening_data["work_type"]
-    smoking_status = screening_data["smoking_status"]
-    
-    work_encoding = work_type_encoding.get(work_type, [0, 0, 1, 0, 0])  # Default to Private
-    smoking_enc = smoking_encoding.get(smoking_status, [0, 0, 1, 0])  # Default to never smoked
-    
     return {
         "age": age,
-        "gender": gender_map.get(screening_data.get("gender", "Male"), 1),
-        "hypertension": int(screening_data["hypertension"]),
-        "heart_disease": int(screening_data["heart_disease"]),
-        "ever_married": int(screening_data["ever_married"]),
-        "Residence_type": residence_map.get(screening_data["residence_type"], 1),
-        "avg_glucose_level": screening_data["avg_glucose_level"],
+        "gender": gender,
+        "hypertension": screening.hypertension,
+        "heart_disease": screening.heart_disease,
+        "ever_married": screening.ever_married,
+        "work_type": screening.work_type.value,
+        "residence_type": screening.residence_type.value,
+        "avg_glucose_level": screening.avg_glucose_level,
         "bmi": bmi,
-        "work_type_Govt_job": work_encoding[0],
-        "work_type_Never_worked": work_encoding[1],
-        "work_type_Private": work_encoding[2],
-        "work_type_Self_employed": work_encoding[3],
-        "work_type_children": work_encoding[4],
-        "smoking_status_Unknown": smoking_enc[0],
-        "smoking_status_formerly_smoked": smoking_enc[1],
-        "smoking_status_never_smoked": smoking_enc[2],
-        "smoking_status_smokes": smoking_enc[3]
+        "smoking_status": screening.smoking_status.value
     }
 
-@router.post("/predict", response_model=ScreeningResponse, status_code=status.HTTP_201_CREATED)
+# Inference + DB write: limit per patient and cap in-flight work per worker
+predict_limit = RateLimit("predict", rate=0.5, burst=10, max_concurrent=32)
+
+@router.post(
+    "/predict",
+    response_model=ScreeningResult,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(predict_limit)]
+)
 async def create_screening(
     screening: ScreeningInput,
     current_user: dict = Depends(get_current_patient)
@@ -107,7 +102,7 @@ async def create_screening(
     Perform stroke screening and save to database
     Only accessible by authenticated patients
     """
-    if predictor is None:
+    if predictor is None and inference_client is None:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="ML model not available"
@@ -121,23 +116,16 @@ async def create_screening(
         bmi = calculate_bmi(screening.height_cm, screening.weight_kg)
         
         # Prepare input for ML model
-        ml_input = prepare_ml_input(
-            {
-                "gender": current_user["gender"],
-                "hypertension": screening.hypertension,
-                "heart_disease": screening.heart_disease,
-                "ever_married": screening.ever_married,
-                "work_type": screening.work_type.value,
-                "residence_type": screening.residence_type.value,
-                "avg_glucose_level": screening.avg_glucose_level,
-                "smoking_status": screening.smoking_status.value
-            },
-            age,
-            bmi
-        )
+        ml_input = screening_features(screening, current_user["gender"], age, bmi)
+        
+        if drift_monitor is not None:
+            drift_monitor.record(ml_input)
         
         # Make prediction
-        prediction_result = predictor.make_prediction(ml_input)
+        if inference_client is not None:
+            prediction_result = await run_in_threadpool(inference_client.predict, ml_input)
+        else:
+            prediction_result = predictor.make_prediction(ml_input)
         
         # Extract all ML model outputs and convert to Python native types
         stroke_probability = float(prediction_result.get("probability", 0.0))
@@ -145,55 +133,79 @@ async def create_screening(
         confidence = str(prediction_result.get("confidence", "Medium"))
         prediction = int(prediction_result.get("prediction", 0))
         threshold = float(prediction_result.get("threshold", 0.5))
-        risk_level = get_risk_level(stroke_probability)
+        # Model risk bands (ml/utils/calibration.py); computed here when the
+        # result has no level (e.g. an inference server on an older version)
+        risk_level = str(prediction_result.get("risk_level") or risk_bands.level(stroke_probability))
+        
+        logger.info(
+            "Prediction made for user %s: %s (%.4f), confidence %s",
+            current_user["id"], risk_level, stroke_probability, confidence,
+            extra=HOT_PATH
+        )
         
-        logger.info(f"Prediction made for user {current_user['email']}: {risk_level} ({stroke_probability:.4f})")
-        logger.info(f"Risk factors: {risk_factors}, Confidence: {confidence}")
+        values = (
+            current_user["id"],
+            age,
+            screening.height_cm,
+            screening.weight_kg,
+            bmi,
+            screening.hypertension,
+            screening.heart_disease,
+            screening.ever_married,
+            screening.work_type.value,
+            screening.residence_type.value,
+            screening.avg_glucose_level,
+            screening.smoking_status.value,
+            stroke_probability,
+            risk_level,
+            risk_factors,  # Array of risk factors
+            confidence,    # Confidence level
+            prediction,    # Binary prediction
+            threshold      # Threshold used
+        )
         
         # Save to database
-        with get_db_cursor() as cursor:
-            cursor.execute(
-                """
-                INSERT INTO stroke_screenings (
-                    user_id, age_at_screening, height_cm, weight_kg, bmi,
-                    hypertension, heart_disease, ever_married, work_type,
-                    residence_type, avg_glucose_level, smoking_status,
-                    stroke_probability, risk_level,
-                    risk_factors, confidence, prediction, threshold
-                )
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                RETURNING id, user_id, age_at_screening, height_cm, weight_kg, bmi,
-                          hypertension, heart_disease, ever_married, work_type,
-                          residence_type, avg_glucose_level, smoking_status,
-                          stroke_probability, risk_level,
-                          risk_factors, confidence, prediction, threshold, created_at
-                """,
-                (
-                    current_user["id"],
-                    age,
-                    screening.height_cm,
-                    screening.weight_kg,
-                    bmi,
-                    screening.hypertension,
-                    screening.heart_disease,
-                    screening.ever_married,
-                    screening.work_type.value,
-                    screening.residence_type.value,
-                    screening.avg_glucose_level,
-                    screening.smoking_status.value,
-                    stroke_probability,
-                    risk_level,
-                    risk_factors,  # Array of risk factors
-                    confidence,    # Confidence level
-                    prediction,    # Binary prediction
-                    threshold      # Threshold used
+        try:
+            with get_db_cursor() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO stroke_screenings (
+                        user_id, age_at_screening, height_cm, weight_kg, bmi,
+                        hypertension, heart_disease, ever_married, work_type,
+                        residence_type, avg_glucose_level, smoking_status,
+                        stroke_probability, risk_level,
+                        risk_factors, confidence, prediction, threshold
+                    )
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    RETURNING id, user_id, age_at_screening, height_cm, weight_kg, bmi,
+                              hypertension, heart_disease, ever_married, work_type,
+                              residence_type, avg_glucose_level, smoking_status,
+                              stroke_probability, risk_level,
+                              risk_factors, confidence, prediction, threshold, created_at
+                    """,
+                    values
                 )
+                
+                result = cursor.fetchone()
+                logger.info("Screening saved to database with ID: %s", result["id"], extra=HOT_PATH)
+        except DatabaseUnavailable:
+            # Degraded mode: answer now, write when the database is back
+            result = defer_screening(values)
+            if result is None:
+                raise
+            logger.warning("Database unavailable, screening %s queued", result["id"])
+            return FastJSONResponse(
+                ScreeningResult(**result).model_dump(mode="json"),
+                status_code=status.HTTP_202_ACCEPTED,
+                headers={"X-Degraded": "write-queued"}
             )
-            
-            result = cursor.fetchone()
-            logger.info(f"Screening saved to database with ID: {result['id']}")
-            
-            return ScreeningResponse(**dict(result))
+        
+        # Compare against stored screenings, then add this one to the index
+        population_index.refresh_if_stale()
+        percentile = population_index.percentile(age, current_user["gender"], stroke_probability)
+        population_index.add(age, current_user["gender"], stroke_probability)
+        
+        return ScreeningResult(**dict(result), population_percentile=percentile)
             
     except HTTPException:
         raise
@@ -204,29 +216,133 @@ async def create_screening(
             detail=f"Screening failed: {str(e)}"
         )
 
+# Same columns as the INSERT in create_screening, plus client-side id /
+# created_at; idempotent so a replay after a partial flush is harmless
+DEFERRED_SCREENING_INSERT = """
+    INSERT INTO stroke_screenings (
+        id, created_at,
+        user_id, age_at_screening, height_cm, weight_kg, bmi,
+        hypertension, heart_disease, ever_married, work_type,
+        residence_type, avg_glucose_level, smoking_status,
+        stroke_probability, risk_level,
+        risk_factors, confidence, prediction, threshold
+    )
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (id) DO NOTHING
+"""
+
+SCREENING_VALUE_COLUMNS = [
+    "user_id", "age_at_screening", "height_cm", "weight_kg", "bmi",
+    "hypertension", "heart_disease", "ever_married", "work_type",
+    "residence_type", "avg_glucose_level", "smoking_status",
+    "stroke_probability", "risk_level",
+    "risk_factors", "confidence", "prediction", "threshold",
+]
+
+def defer_screening(values: tuple) -> Optional[dict]:
+    """Queue a screening INSERT; returns the row as it will be stored, or None if the queue is full"""
+    screening_id = str(uuid.uuid4())
+    created_at = datetime.now(timezone.utc)
+    if not pending_writes.add(DEFERRED_SCREENING_INSERT, (screening_id, created_at, *values)):
+        return None
+    return dict(zip(SCREENING_VALUE_COLUMNS, values), id=screening_id, created_at=created_at)
+
+def history_etag(user_id, version) -> str:
+    """Weak ETag for a user's screening history at a given version"""
+    return f'W/"{user_id}-{version}"'
+
+def encode_history_cursor(version: int) -> str:
+    """
+    Opaque cursor at a per-user screening version: rows are stamped with
+    users.screening_version by the bump trigger, which holds the users row
+    lock until commit, so stamps follow commit order (created_at does not:
+    it is set at transaction start, or by the client for deferred writes)
+    """
+    return base64.urlsafe_b64encode(f"v{version}".encode()).decode().rstrip("=")
+
+def decode_history_cursor(cursor: str) -> int:
+    """Inverse of encode_history_cursor; raises ValueError if malformed"""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    raw = base64.urlsafe_b64decode(padded.encode()).decode()
+    if not raw.startswith("v"):
+        raise ValueError("not a history cursor")
+    return int(raw[1:])
+
 @router.get("/history", response_model=List[ScreeningSummary])
 async def get_screening_history(
+    since: Optional[str] = Query(None, description="Cursor from X-Next-Cursor; only newer screenings are returned"),
+    if_none_match: Optional[str] = Header(None),
     current_user: dict = Depends(get_current_patient)
 ):
     """
     Get screening history for current patient
+    Supports delta sync: ETag / If-None-Match (304 when nothing changed)
+    and ?since=<cursor> for screenings newer than the cursor
     """
+    # users.screening_version was loaded with the user: no extra query for 304
+    current_etag = history_etag(current_user["id"], current_user.get("screening_version"))
+    if if_none_match and current_etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": current_etag})
+    
+    since_key = None
+    if since:
+        try:
+            since_key = decode_history_cursor(since)
+        except (ValueError, UnicodeDecodeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid since cursor"
+            )
+    
     try:
-        with get_db_cursor() as cursor:
+        with get_db_cursor(readonly=True) as cursor:
+            # Version read on the same connection as the rows, so a lagging
+            # replica yields an older ETag (client refetches) rather than a
+            # newer ETag over stale rows
             cursor.execute(
-                """
-                SELECT id, age_at_screening, bmi, risk_level, 
-                       stroke_probability, created_at
-                FROM stroke_screenings
-                WHERE user_id = %s
-                ORDER BY created_at DESC
-                """,
+                "SELECT screening_version FROM users WHERE id = %s",
                 (current_user["id"],)
             )
+            version_row = cursor.fetchone()
+            version = version_row["screening_version"] if version_row else None
+            
+            if since_key is None:
+                cursor.execute(
+                    """
+                    SELECT id, age_at_screening, bmi, risk_level, 
+                           stroke_probability, created_at, screening_version
+                    FROM stroke_screenings
+                    WHERE user_id = %s
+                    ORDER BY created_at DESC, id DESC
+                    """,
+                    (current_user["id"],)
+                )
+            else:
+                cursor.execute(
+                    """
+                    SELECT id, age_at_screening, bmi, risk_level, 
+                           stroke_probability, created_at, screening_version
+                    FROM stroke_screenings
+                    WHERE user_id = %s AND screening_version > %s
+                    ORDER BY created_at DESC, id DESC
+                    """,
+                    (current_user["id"], since_key)
+                )
             
             screenings = cursor.fetchall()
-            return [ScreeningSummary(**dict(s)) for s in screenings]
+        
+        response = rows_response(screenings, ScreeningSummary)
+        response.headers["ETag"] = history_etag(current_user["id"], version)
+        # The version was read before the rows: a row committed in between
+        # has a higher stamp, so take the max (never skips, never repeats)
+        stamps = [row["screening_version"] for row in screenings if row["screening_version"] is not None]
+        next_version = max([version or 0, since_key or 0, *stamps])
+        response.headers["X-Next-Cursor"] = encode_history_cursor(next_version)
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching screening history: {e}")
         raise HTTPException(
@@ -0,0 +1,77 @@
+"""
+Fast JSON responses
+Rows that come straight from trusted DB columns are projected to the
+response model's fields and encoded with orjson, skipping the Pydantic
+validation + jsonable_encoder pass that response_model would run again.
+"""
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Iterable, Optional, Sequence, Type
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# OPT_UTC_Z matches Pydantic's "Z" suffix for UTC timestamps
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z
+
+def _default(value: Any):
+    """Types orjson does not encode natively"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def dumps(content: Any) -> bytes:
+    """Encode content with orjson (UUID, datetime, Decimal, numpy supported)"""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+# Cached field names per response model
+_model_fields = {}
+
+def model_fields(model: Type[BaseModel]) -> tuple:
+    fields = _model_fields.get(model)
+    if fields is None:
+        fields = _model_fields[model] = tuple(model.model_fields)
+    return fields
+
+def select_fields(fields: Optional[str], allowed: Sequence[str]) -> tuple:
+    """
+    Names from a comma-separated ?fields= value, in allowed order
+    (all of allowed when empty or only separators, e.g. "?fields=,");
+    raises ValueError for unknown names
+    """
+    requested = {name.strip() for name in (fields or "").split(",") if name.strip()}
+    if not requested:
+        return tuple(allowed)
+    unknown = sorted(requested.difference(allowed))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)} (allowed: {', '.join(allowed)})")
+    return tuple(name for name in allowed if name in requested)
+
+def project_rows(rows: Iterable, model: Type[BaseModel], fields: Optional[Sequence[str]] = None) -> list:
+    """
+    Reduce trusted DB rows to the model's fields, or the given subset of
+    them (no validation); missing optional columns are emitted as null
+    """
+    fields = fields or model_fields(model)
+    return [{field: row.get(field) for field in fields} for row in rows]
+
+def rows_response(rows: Iterable, model: Type[BaseModel], status_code: int = 200,
+                  fields: Optional[Sequence[str]] = None) -> FastJSONResponse:
+    """
+    Response for a list of trusted DB rows shaped like model
+    Only use for rows selected from typed DB columns / views; user input
+    must still go through the Pydantic model.
+
+    fields limits the output to a subset of the model's fields (?fields=).
+    """
+    return FastJSONResponse(project_rows(rows, model, fields), status_code=status_code)
@@ -0,0 +1,221 @@
+"""
+API load benchmark
+Drives the main endpoints at a fixed concurrency and reports throughput and
+latency percentiles per endpoint as JSON, so runs can be diffed between commits.
+
+By default the app runs in-process (ASGI transport) against the in-memory
+database backend (app/db_backends.py); pass --real-db to use the database from .env, or --base-url
+to benchmark an already running server.
+
+Usage:
+    python benchmarks/api_load.py --requests 500 --concurrency 16 --output bench.json
+    python benchmarks/api_load.py --endpoints predict,history --real-db
+    python benchmarks/api_load.py --base-url http://localhost:8000 --email ... --password ...
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import httpx
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCREENING_PAYLOAD = {
+    "height_cm": 170.0,
+    "weight_kg": 70.0,
+    "hypertension": False,
+    "heart_disease": False,
+    "ever_married": True,
+    "work_type": "Private",
+    "residence_type": "Urban",
+    "avg_glucose_level": 105.5,
+    "smoking_status": "never smoked",
+}
+
+def build_endpoints(ctx):
+    """name -> (method, path, json body, token key)"""
+    return {
+        "login": ("POST", "/auth/login", {"email": ctx["patient_email"], "password": ctx["password"]}, None),
+        "predict": ("POST", "/screening/predict", SCREENING_PAYLOAD, "patient"),
+        "history": ("GET", "/screening/history", None, "patient"),
+        "admin_patients": ("GET", "/admin/patients", None, "admin"),
+        "admin_statistics": ("GET", "/admin/statistics", None, "admin"),
+        "admin_high_risk": ("GET", "/admin/high-risk-screenings", None, "admin"),
+        "admin_dashboard": ("GET", "/admin/dashboard-stats", None, "admin"),
+        "admin_patient_screenings": ("GET", f"/admin/patient/{ctx['patient_id']}/screenings", None, "admin"),
+    }
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def summarize(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    ms = lambda v: round(v * 1000, 3) if v is not None else None
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "rps": round((len(latencies) + errors) / elapsed, 2) if elapsed else None,
+        "mean_ms": ms(sum(latencies) / len(latencies)) if latencies else None,
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "max_ms": ms(latencies[-1]) if latencies else None,
+    }
+
+async def run_endpoint(client, endpoint, headers, total, concurrency, expected_status):
+    method, path, body, _ = endpoint
+    latencies = []
+    errors = 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body, headers=headers)
+                ok = response.status_code in expected_status
+            except Exception:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+def setup_in_process(real_db):
+    """Import the app, on the in-memory database backend unless real_db"""
+    from app import rate_limit
+    from app.auth import create_access_token
+    from main import app
+
+    # Measure the endpoints, not the limiter's 429s
+    rate_limit.RATE_LIMIT_ENABLED = False
+
+    if real_db:
+        from app.database import get_db_cursor
+        with get_db_cursor() as cursor:
+            cursor.execute("SELECT id, email FROM users WHERE role = 'PATIENT' ORDER BY created_at LIMIT 1")
+            patient = cursor.fetchone()
+            cursor.execute("SELECT email FROM users WHERE role = 'ADMIN' LIMIT 1")
+            admin = cursor.fetchone()
+        ctx = {
+            "patient_id": str(patient["id"]), "patient_email": patient["email"],
+            "admin_email": admin["email"], "password": os.getenv("BENCH_PASSWORD", "Admin123!"),
+        }
+    else:
+        from app.database import set_backend
+        from app.db_backends import MemoryBackend, MemoryDatabase, SEED_PASSWORD
+        db = MemoryDatabase.seeded()
+        set_backend(MemoryBackend(db))
+        ctx = {
+            "patient_id": db.patient["id"], "patient_email": db.patient["email"],
+            "admin_email": db.admin["email"], "password": SEED_PASSWORD,
+        }
+
+    ctx["tokens"] = {
+        "patient": create_access_token({"sub": ctx["patient_email"], "role": "PATIENT"}),
+        "admin": create_access_token({"sub": ctx["admin_email"], "role": "ADMIN"}),
+    }
+    transport = httpx.ASGITransport(app=app)
+    return transport, "http://bench", ctx
+
+async def login(client, email, password):
+    response = await client.post("/auth/login", json={"email": email, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return None
+
+async def main_async(args):
+    if args.base_url:
+        transport, base_url = None, args.base_url
+        ctx = {
+            "patient_email": args.email, "password": args.password,
+            "admin_email": args.admin_email, "patient_id": args.patient_id,
+        }
+    else:
+        transport, base_url, ctx = setup_in_process(args.real_db)
+
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60) as client:
+        if args.base_url:
+            ctx["tokens"] = {"patient": await login(client, args.email, args.password)}
+            if args.admin_email:
+                ctx["tokens"]["admin"] = await login(client, args.admin_email, args.admin_password)
+
+        endpoints = build_endpoints(ctx)
+        selected = args.endpoints.split(",") if args.endpoints else list(endpoints)
+        results = {}
+
+        for name in selected:
+            endpoint = endpoints[name]
+            token_key = endpoint[3]
+            if token_key and token_key not in ctx["tokens"]:
+                print(f"skip {name}: no {token_key} credentials", file=sys.stderr)
+                continue
+            headers = {"Authorization": f"Bearer {ctx['tokens'][token_key]}"} if token_key else {}
+            expected = {201} if endpoint[0] == "POST" and name != "login" else {200}
+
+            # Warm-up (model caches, connection pool, JIT paths)
+            await run_endpoint(client, endpoint, headers, min(args.warmup, args.requests), args.concurrency, expected)
+            results[name] = await run_endpoint(client, endpoint, headers, args.requests, args.concurrency, expected)
+            print(f"{name:28s} {results[name]['rps']:>9} rps  p50 {results[name]['p50_ms']} ms  "
+                  f"p99 {results[name]['p99_ms']} ms  errors {results[name]['errors']}", file=sys.stderr)
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "target": args.base_url or ("in-process/real-db" if args.real_db else "in-process/fake-db"),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "endpoints": results,
+    }
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="StrokeGuard API load benchmark")
+    parser.add_argument("--requests", type=int, default=300, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--endpoints", default=None, help="Comma separated subset")
+    parser.add_argument("--output", default=None, help="Write JSON report here (default: stdout)")
+    parser.add_argument("--real-db", action="store_true", help="Use the database from .env")
+    parser.add_argument("--base-url", default=None, help="Benchmark a running server")
+    parser.add_argument("--email", default=None)
+    parser.add_argument("--password", default=None)
+    parser.add_argument("--admin-email", default=None)
+    parser.add_argument("--admin-password", default=None)
+    parser.add_argument("--patient-id", default=None)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    report = asyncio.run(main_async(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
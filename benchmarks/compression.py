@@ -0,0 +1,94 @@
+"""
+Response compression benchmark
+Encodes admin list payloads (full rows and a ?fields= subset) with every
+available encoding (gzip always, br / zstd when installed) and reports size
+and compression time, plus the per-chunk cost of streaming NDJSON.
+Bodies below COMPRESSION_MIN_SIZE are shown as sent uncompressed.
+
+Usage:
+    python benchmarks/compression.py --rows 10000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.compression import ENCODERS, COMPRESSION_MIN_SIZE
+from app.models import PatientSummary, ScreeningResponse
+from app.serialization import dumps, project_rows
+from benchmarks.serialization import patient_rows, screening_rows
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+def compress_all(body, repeat):
+    results = {"identity": {"bytes": len(body), "ms": 0.0}}
+    if len(body) < COMPRESSION_MIN_SIZE:
+        return results
+    for name, encoder in ENCODERS.items():
+        def run():
+            e = encoder()
+            return e.compress(body) + e.finish()
+        compressed, seconds = best_of(run, repeat)
+        results[name] = {
+            "bytes": len(compressed),
+            "ratio": round(len(body) / len(compressed), 2),
+            "ms": round(seconds * 1000, 3),
+        }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Response compression")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--chunk-rows", type=int, default=1000, help="NDJSON rows per streamed chunk")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    patients = patient_rows(args.rows)
+    screenings = screening_rows(args.rows)
+    payloads = {
+        "patients": dumps(project_rows(patients, PatientSummary)),
+        "patients?fields=id,full_name,highest_risk_level": dumps(
+            project_rows(patients, PatientSummary, ("id", "full_name", "highest_risk_level"))
+        ),
+        "patient_screenings": dumps(project_rows(screenings, ScreeningResponse)),
+        "patient_screenings?fields=id,stroke_probability,risk_level,created_at": dumps(
+            project_rows(screenings, ScreeningResponse, ("id", "stroke_probability", "risk_level", "created_at"))
+        ),
+        "single_screening": dumps(project_rows(screenings[:1], ScreeningResponse)[0]),
+    }
+    report = {
+        "min_size": COMPRESSION_MIN_SIZE,
+        "encodings": list(ENCODERS),
+        "payloads": {name: compress_all(body, args.repeat) for name, body in payloads.items()},
+    }
+
+    # Streaming NDJSON: one flush per chunk, as the middleware does
+    lines = [dumps(row) + b"\n" for row in project_rows(screenings, ScreeningResponse)]
+    chunks = [b"".join(lines[i:i + args.chunk_rows]) for i in range(0, len(lines), args.chunk_rows)]
+    streaming = {}
+    for name, encoder in ENCODERS.items():
+        e = encoder()
+        start = time.perf_counter()
+        size = sum(len(e.compress(chunk)) for chunk in chunks) + len(e.finish())
+        seconds = time.perf_counter() - start
+        streaming[name] = {
+            "bytes": size,
+            "ratio": round(sum(map(len, chunks)) / size, 2),
+            "ms_per_chunk": round(seconds * 1000 / len(chunks), 3),
+        }
+    report["ndjson_stream"] = {"chunks": len(chunks), "rows_per_chunk": args.chunk_rows, **streaming}
+
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
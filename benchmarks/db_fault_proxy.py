@@ -0,0 +1,180 @@
+"""
+Database fault-injection check for the circuit breaker
+Runs a local TCP proxy in front of Postgres, points app.database at it and
+measures get_db_cursor() while the proxy is healthy, while it drops
+connections, and after it recovers:
+
+- reset: existing connections are closed and new ones are closed on accept
+- blackhole: existing connections are closed, new ones are accepted but
+  never answered (each connect attempt waits for DB_CONNECT_TIMEOUT)
+
+Expected: once the breaker opens, calls fail with DatabaseUnavailable in
+well under a millisecond instead of waiting on the network, and the
+background reconnect closes the breaker after the proxy recovers.
+Exits 1 if either expectation fails.
+
+Needs a reachable Postgres in DATABASE_URL_DIRECT / DATABASE_URL_SESSION.
+
+Usage:
+    python benchmarks/db_fault_proxy.py --mode reset --calls 50
+"""
+import argparse
+import json
+import os
+import select
+import socket
+import sys
+import threading
+import time
+import urllib.parse
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+class FaultProxy:
+    """Threaded TCP proxy with switchable failure modes"""
+
+    def __init__(self, upstream_host, upstream_port):
+        self.upstream = (upstream_host, upstream_port)
+        self.mode = "pass"
+        self.lock = threading.Lock()
+        self.connections = []
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(64)
+        self.port = self.server.getsockname()[1]
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def set_mode(self, mode):
+        self.mode = mode
+        if mode in ("reset", "blackhole"):
+            with self.lock:
+                for sock in self.connections:
+                    try:
+                        sock.close()
+                    except OSError:
+                        pass
+                self.connections = []
+
+    def _accept_loop(self):
+        while True:
+            client, _ = self.server.accept()
+            if self.mode == "reset":
+                client.close()
+            elif self.mode == "blackhole":
+                with self.lock:
+                    self.connections.append(client)
+            else:
+                threading.Thread(target=self._pipe, args=(client,), daemon=True).start()
+
+    def _pipe(self, client):
+        try:
+            upstream = socket.create_connection(self.upstream, timeout=10)
+        except OSError:
+            client.close()
+            return
+        with self.lock:
+            self.connections += [client, upstream]
+        sockets = [client, upstream]
+        try:
+            while True:
+                readable, _, _ = select.select(sockets, [], [], 1.0)
+                for sock in readable:
+                    data = sock.recv(65536)
+                    if not data:
+                        return
+                    (upstream if sock is client else client).sendall(data)
+        except (OSError, ValueError):
+            pass
+        finally:
+            for sock in sockets:
+                try:
+                    sock.close()
+                except OSError:
+                    pass
+
+def run_calls(database, calls):
+    """Time SELECT 1 through get_db_cursor; returns [(ms, outcome)]"""
+    results = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        try:
+            with database.get_db_cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            outcome = "ok"
+        except database.DatabaseUnavailable:
+            outcome = "unavailable"
+        except Exception as e:
+            outcome = type(e).__name__
+        results.append(((time.perf_counter() - start) * 1000, outcome))
+    return results
+
+def summarize(results):
+    outcomes = {}
+    for _, outcome in results:
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    timings = sorted(ms for ms, _ in results)
+    return {
+        "outcomes": outcomes,
+        "p50_ms": round(timings[len(timings) // 2], 3),
+        "max_ms": round(timings[-1], 3),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Circuit breaker fault injection")
+    parser.add_argument("--mode", choices=["reset", "blackhole"], default="reset")
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--recover-timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    load_dotenv()
+    url_name = next((n for n in ("DATABASE_URL_DIRECT", "DATABASE_URL_SESSION") if os.getenv(n)), None)
+    if url_name is None:
+        print(json.dumps({"error": "DATABASE_URL_DIRECT or DATABASE_URL_SESSION is required"}))
+        sys.exit(1)
+
+    upstream = urllib.parse.urlparse(os.environ[url_name])
+    proxy = FaultProxy(upstream.hostname, upstream.port or 5432)
+
+    # Only the proxied URL, short timeouts, fast reconnect
+    for name in ("DATABASE_URL_DIRECT", "DATABASE_URL_SESSION", "DATABASE_URL_TRANSACTION", "DATABASE_URL_REPLICA"):
+        os.environ.pop(name, None)
+    netloc = upstream.netloc.rsplit("@", 1)
+    credentials = netloc[0] + "@" if len(netloc) == 2 else ""
+    os.environ[url_name] = upstream._replace(netloc=f"{credentials}127.0.0.1:{proxy.port}").geturl()
+    os.environ.setdefault("DB_CONNECT_TIMEOUT", "2")
+    os.environ.setdefault("DB_RECONNECT_MIN_DELAY", "0.5")
+    os.environ.setdefault("DB_RECONNECT_MAX_DELAY", "2")
+
+    from app import database
+    database.init_db_pool()
+
+    report = {"mode": args.mode, "healthy": summarize(run_calls(database, args.calls))}
+
+    proxy.set_mode(args.mode)
+    fault = run_calls(database, args.calls)
+    report["fault"] = summarize(fault)
+    # The breaker opens within DB_BREAKER_FAILURES calls; the second half
+    # of the fault phase must all be fast 503s
+    tail = fault[len(fault) // 2:]
+    fast = all(outcome == "unavailable" for _, outcome in tail)
+    report["fail_fast_max_ms"] = round(max(ms for ms, _ in tail), 3) if fast else None
+
+    proxy.set_mode("pass")
+    deadline = time.monotonic() + args.recover_timeout
+    while database.breaker.is_open and time.monotonic() < deadline:
+        time.sleep(0.1)
+    report["recovered"] = not database.breaker.is_open
+    report["after_recovery"] = summarize(run_calls(database, args.calls))
+
+    print(json.dumps(report, indent=2))
+    database.close_db_pool()
+    ok = report["recovered"] and report["fail_fast_max_ms"] is not None and report["fail_fast_max_ms"] < 5
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
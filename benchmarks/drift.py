@@ -0,0 +1,52 @@
+"""
+Drift monitor overhead benchmark
+Measures DriftMonitor.record() per screening (request path) and report()
+latency, replaying rows of the raw training CSV. Budget: a few microseconds
+per record. Replaying training data should also report "stable" everywhere.
+
+Usage:
+    python benchmarks/drift.py --records 100000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.utils.drift import DriftMonitor, build_baseline, TRAINING_DATA_PATH
+
+def main():
+    parser = argparse.ArgumentParser(description="Drift monitor overhead")
+    parser.add_argument("--records", type=int, default=100000)
+    args = parser.parse_args()
+
+    df = pd.read_csv(TRAINING_DATA_PATH)
+    baseline = build_baseline(df)
+    df = df.rename(columns={"Residence_type": "residence_type"})
+    df["bmi"] = pd.to_numeric(df["bmi"], errors="coerce")
+    inputs = df.to_dict("records")
+
+    monitor = DriftMonitor(baseline, window=args.records)
+    start = time.perf_counter()
+    for i in range(args.records):
+        monitor.record(inputs[i % len(inputs)])
+    record_us = (time.perf_counter() - start) / args.records * 1e6
+
+    start = time.perf_counter()
+    report = monitor.report()
+    report_ms = (time.perf_counter() - start) * 1e3
+
+    print(json.dumps({
+        "records": args.records,
+        "record_us": round(record_us, 2),
+        "report_ms": round(report_ms, 3),
+        "status": {f: r["status"] for f, r in report["features"].items()},
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Feature encoder parity + latency check
+Encodes every row of the raw training CSV one at a time with FeatureEncoder
+(the request path) and compares the result with feature_store.encode_raw
+(the training layout). Any column mismatch fails with a non-zero exit.
+Also reports the per-request encoding cost.
+
+Usage:
+    python benchmarks/encoder.py --repeat 20000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.utils.encoder import FeatureEncoder
+from ml.utils.feature_store import SOURCES, encode_raw, training_columns
+
+def main():
+    parser = argparse.ArgumentParser(description="FeatureEncoder parity and latency")
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+
+    columns = training_columns()
+    encoder = FeatureEncoder(columns)
+
+    # Training layout (encode_raw also fills missing BMI with the median)
+    source = pd.read_csv(SOURCES["raw"])
+    expected = encode_raw(source)
+    # Raw API-style values for the same rows
+    raw = expected.assign(
+        gender=source.loc[expected.index, "gender"],
+        residence_type=source.loc[expected.index, "Residence_type"],
+        work_type=source.loc[expected.index, "work_type"],
+        smoking_status=source.loc[expected.index, "smoking_status"],
+    )
+    records = raw.to_dict("records")
+
+    encoded = np.vstack([encoder.encode(r) for r in records])
+    target = expected[columns].to_numpy(dtype=np.float64)
+    mismatched = [c for i, c in enumerate(columns) if not np.allclose(encoded[:, i], target[:, i])]
+
+    record = records[0]
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        encoder.encode(record)
+    encode_us = (time.perf_counter() - start) / args.repeat * 1e6
+
+    start = time.perf_counter()
+    for _ in range(args.repeat // 10):
+        encoder.encode_frame(record)
+    frame_us = (time.perf_counter() - start) / (args.repeat // 10) * 1e6
+
+    print(json.dumps({
+        "rows_checked": len(records),
+        "mismatched_columns": mismatched,
+        "encode_us": round(encode_us, 2),
+        "encode_frame_us": round(frame_us, 2),
+    }, indent=2))
+    sys.exit(1 if mismatched else 0)
+
+if __name__ == "__main__":
+    main()
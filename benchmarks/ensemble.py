@@ -0,0 +1,110 @@
+"""
+Model set latency benchmark
+Scores the same prepared rows with the primary model alone and with a model
+set of the primary plus gated variants (sex-specific and age-banded; the
+variants reuse the deployed model unless ENSEMBLE_CONFIG is set, so only
+the ensemble overhead and member count are measured). Reports single-row
+p50 / p99 and per-row batch cost, per-member timings and skip counts.
+
+Budget: single-row model set scoring p99 < --budget-ms (default 10 ms);
+exits 1 when exceeded or when a primary-only set does not reproduce the
+primary model's scores.
+
+Usage:
+    python benchmarks/ensemble.py --rows 2000 --batch 10000
+    ENSEMBLE_CONFIG=ml/models/ensemble.json python benchmarks/ensemble.py
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.utils.prediction import StrokePredictor
+from ml.utils.ensemble import EnsembleMember, Gate, ModelSet
+
+def percentile_ms(timings, q):
+    return round(float(np.percentile(timings, q)) * 1000, 3)
+
+def time_rows(fn, rows):
+    timings = []
+    for i in range(len(rows)):
+        row = rows.iloc[i:i + 1]
+        start = time.perf_counter()
+        fn(row)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def demo_model_set(model, columns):
+    """Primary + sex-specific + age-banded members, all backed by the deployed model"""
+    return ModelSet([
+        EnsembleMember("primary", model),
+        EnsembleMember("female", model, gate=Gate("gender", equals=0)),
+        EnsembleMember("male", model, gate=Gate("gender", equals=1)),
+        EnsembleMember("age_65_plus", model, weight=2.0, gate=Gate("age", min=65)),
+    ], combine="mean", columns=columns)
+
+def main():
+    parser = argparse.ArgumentParser(description="Model set latency")
+    parser.add_argument("--rows", type=int, default=2000, help="single-row requests to time")
+    parser.add_argument("--batch", type=int, default=10000)
+    parser.add_argument("--budget-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    predictor = StrokePredictor()
+    model_set = predictor.model_set or demo_model_set(predictor.model, predictor.expected_columns)
+
+    data_path = os.path.join("ml", "data", "processed", "stroke_data_final.csv")
+    X = pd.read_csv(data_path)[predictor.expected_columns].astype(np.float64)
+    rows = X.sample(args.rows, replace=True, random_state=0).reset_index(drop=True)
+    batch = X.sample(args.batch, replace=True, random_state=1).reset_index(drop=True)
+
+    # A set holding only the primary model must reproduce it exactly
+    primary_only = ModelSet([EnsembleMember("primary", predictor.model)])
+    parity_error = float(np.max(np.abs(
+        primary_only.predict_proba(batch.head(500))[0] - predictor.model.predict_proba(batch.head(500))[:, 1]
+    )))
+
+    primary_single = time_rows(lambda row: predictor.model.predict_proba(row), rows)
+    set_single = time_rows(model_set.predict_proba, rows)
+    single_stats = model_set.get_stats()
+
+    start = time.perf_counter()
+    predictor.model.predict_proba(batch)
+    primary_batch = time.perf_counter() - start
+    start = time.perf_counter()
+    _, batch_timings = model_set.predict_proba(batch)
+    set_batch = time.perf_counter() - start
+
+    set_p99 = percentile_ms(set_single, 99)
+    report = {
+        "members": [m.name for m in model_set.members],
+        "combine": model_set.combine,
+        "single_row": {
+            "primary_p50_ms": percentile_ms(primary_single, 50),
+            "primary_p99_ms": percentile_ms(primary_single, 99),
+            "model_set_p50_ms": percentile_ms(set_single, 50),
+            "model_set_p99_ms": set_p99,
+            "members": single_stats,
+        },
+        "batch": {
+            "rows": len(batch),
+            "primary_us_per_row": round(primary_batch / len(batch) * 1e6, 3),
+            "model_set_us_per_row": round(set_batch / len(batch) * 1e6, 3),
+            "member_ms": {name: None if ms is None else round(ms, 3) for name, ms in batch_timings.items()},
+        },
+        "primary_only_max_abs_error": parity_error,
+        "budget_ms": args.budget_ms,
+        "within_budget": set_p99 < args.budget_ms,
+    }
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["within_budget"] and parity_error < 1e-12 else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Feature attribution latency benchmark
+Measures explainer cost for one row (request path) and per row in batches
+against the deployed model. Budget: < 2 ms per single-row explanation.
+
+Usage:
+    python benchmarks/explain.py --batch 10000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.utils.prediction import StrokePredictor
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Explainer latency")
+    parser.add_argument("--batch", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    predictor = StrokePredictor()
+    if predictor.explainer is None:
+        print(json.dumps({"error": f"model {type(predictor.model).__name__} not supported by explainer"}))
+        sys.exit(1)
+
+    data_path = os.path.join("ml", "data", "processed", "stroke_data_final.csv")
+    X = pd.read_csv(data_path)[predictor.expected_columns].astype(np.float64)
+    batch = X.sample(args.batch, replace=True, random_state=0).reset_index(drop=True)
+    row = batch.head(1)
+
+    # Attributions must add up to the model output: probability for forests,
+    # log-odds for boosting / linear models (the combined score with ENSEMBLE_CONFIG)
+    contributions, bias = predictor.explainer.explain(batch.head(200))
+    total = contributions.sum(axis=1) + bias
+    probability = np.clip(predictor._score(batch.head(200))[0], 1e-12, 1 - 1e-12)
+    max_error = float(min(
+        np.max(np.abs(total - probability)),
+        np.max(np.abs(total - np.log(probability / (1 - probability))))
+    ))
+
+    single = best_of(lambda: predictor.explainer.explain(row), args.repeat)
+    batched = best_of(lambda: predictor.explainer.explain(batch), max(1, args.repeat // 10))
+
+    print(json.dumps({
+        "model": type(predictor.model).__name__,
+        "single_row_ms": round(single * 1000, 3),
+        "batch_rows": args.batch,
+        "batch_per_row_us": round(batched / args.batch * 1e6, 3),
+        "additivity_max_error": max_error,
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Logging overhead benchmark
+Time spent in the request thread for the info lines one /screening/predict
+request used to emit, comparing the old synchronous basicConfig + f-string
+setup with the queue-based JSON pipeline (lazy args, optional sampling).
+
+Output goes to a file (not a TTY) to resemble container log collection.
+
+Usage:
+    python benchmarks/logging_overhead.py --requests 20000
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import logging_config
+
+USER = {"id": "8f14e45f-ceea-4e7a-9f4b-6f2c1d6a0b11", "email": "patient@example.com"}
+
+def request_fstring(logger):
+    """Log lines of one predict request as originally written"""
+    risk_level, probability = "Medium", 0.4321
+    logger.info(f"Prediction made for user {USER['email']}: {risk_level} ({probability:.4f})")
+    logger.info(f"Risk factors: {['High BMI']}, Confidence: Medium")
+    logger.info(f"Screening saved to database with ID: {USER['id']}")
+
+def request_lazy(logger):
+    """Log lines of one predict request with lazy args + hot-path flag"""
+    logger.info(
+        "Prediction made for user %s: %s (%.4f), confidence %s",
+        USER["id"], "Medium", 0.4321, "Medium", extra=logging_config.HOT_PATH
+    )
+    logger.info("Screening saved to database with ID: %s", USER["id"], extra=logging_config.HOT_PATH)
+
+def reset_root():
+    root = logging.getLogger()
+    for handler in root.handlers:
+        handler.close()
+    root.handlers = []
+
+def run(fn, logger, requests):
+    start = time.perf_counter()
+    for _ in range(requests):
+        fn(logger)
+    return (time.perf_counter() - start) / requests * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Logging overhead per request")
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Baseline: synchronous handler, formatting in the request thread
+        reset_root()
+        logging.basicConfig(
+            level=logging.INFO,
+            format=logging_config.TEXT_FORMAT,
+            filename=os.path.join(tmp, "sync.log")
+        )
+        logger = logging.getLogger("bench")
+        results["sync_fstring_us"] = run(request_fstring, logger, args.requests)
+
+        # Queue pipeline; the listener writes to a file instead of stderr
+        for label, rates in (("queue_json_us", {}), ("queue_json_sampled_10pct_us", {logging.INFO: 0.1})):
+            reset_root()
+            logging_config.shutdown_logging()
+            logging_config.LOG_SAMPLE_RATES = rates
+            # Large enough that no record is dropped for a full queue
+            logging_config.LOG_QUEUE_SIZE = args.requests * 3
+            sys_stderr = sys.stderr
+            sys.stderr = open(os.path.join(tmp, f"{label}.log"), "w")
+            try:
+                logging_config.setup_logging()
+                results[label] = run(request_lazy, logger, args.requests)
+                logging_config.shutdown_logging()
+            finally:
+                sys.stderr.close()
+                sys.stderr = sys_stderr
+
+    report = {
+        "requests": args.requests,
+        "per_request_us": {k: round(v, 2) for k, v in results.items()},
+    }
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
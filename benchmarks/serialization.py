@@ -0,0 +1,106 @@
+"""
+List endpoint serialization benchmark
+Compares the original path (Model(**dict(row)) per row, then response_model
+validation + jsonable_encoder + json.dumps) against rows_response (projection
++ orjson) for large admin lists.
+
+Usage:
+    python benchmarks/serialization.py --rows 10000 --repeat 5
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import List
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.models import PatientSummary, ScreeningResponse
+from app.serialization import rows_response
+
+def screening_rows(n):
+    now = datetime.now(timezone.utc)
+    user_id = uuid.uuid4()
+    return [
+        {
+            "id": uuid.uuid4(), "user_id": user_id, "age_at_screening": 40 + i % 40,
+            "height_cm": Decimal("170.00"), "weight_kg": Decimal("70.50"), "bmi": Decimal("24.4"),
+            "hypertension": i % 3 == 0, "heart_disease": i % 7 == 0, "ever_married": True,
+            "work_type": "Private", "residence_type": "Urban", "avg_glucose_level": Decimal("105.25"),
+            "smoking_status": "never smoked", "stroke_probability": Decimal("0.4123"),
+            "risk_level": "Medium", "created_at": now - timedelta(minutes=i),
+        }
+        for i in range(n)
+    ]
+
+def patient_rows(n):
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": uuid.uuid4(), "full_name": f"Patient {i}", "email": f"p{i}@example.com",
+            "date_of_birth": date(1970, 1, 1), "gender": "Female", "role": "PATIENT",
+            "total_screenings": i % 12, "last_screening_date": now, "highest_risk_level": "Low",
+        }
+        for i in range(n)
+    ]
+
+def original_path(rows, model):
+    """What the handlers did before: build models, then response_model re-validates"""
+    models = [model(**dict(r)) for r in rows]
+    validated = TypeAdapter(List[model]).validate_python(
+        [m.model_dump() for m in models]
+    )
+    return JSONResponse(jsonable_encoder(validated)).body
+
+def fast_path(rows, model):
+    return rows_response(rows, model).body
+
+def time_it(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), sum(timings) / len(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="List serialization benchmark")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cases = {
+        "patient_screenings": (screening_rows(args.rows), ScreeningResponse),
+        "patients": (patient_rows(args.rows), PatientSummary),
+    }
+
+    results = {}
+    for name, (rows, model) in cases.items():
+        # Both paths must produce the same JSON
+        assert json.loads(original_path(rows[:50], model)) == json.loads(fast_path(rows[:50], model))
+
+        best_orig, mean_orig = time_it(lambda: original_path(rows, model), args.repeat)
+        best_fast, mean_fast = time_it(lambda: fast_path(rows, model), args.repeat)
+        results[name] = {
+            "rows": args.rows,
+            "original_ms": round(best_orig * 1000, 2),
+            "original_mean_ms": round(mean_orig * 1000, 2),
+            "fast_ms": round(best_fast * 1000, 2),
+            "fast_mean_ms": round(mean_fast * 1000, 2),
+            "speedup": round(best_orig / best_fast, 1),
+        }
+
+    print(json.dumps({"meta": {"python": platform.python_version()}, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Request / response validation benchmark
+Cost per call of the Pydantic work done for each request type: parsing the
+JSON body of /screening/predict and /auth/register, building the predict
+response, and encoding a /screening/history page (per-row models vs the
+cached TypeAdapter vs the trusted-row projection).
+
+Usage:
+    python benchmarks/validation.py --iterations 20000 --page 50
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pydantic
+from pydantic import TypeAdapter
+
+from app.models import ScreeningInput, UserRegister, ScreeningResult, ScreeningSummary
+from app.serialization import rows_response
+
+SCREENING_BODY = json.dumps({
+    "height_cm": 170, "weight_kg": 70.5, "hypertension": False, "heart_disease": False,
+    "ever_married": True, "work_type": "Private", "residence_type": "Urban",
+    "avg_glucose_level": 105.3, "smoking_status": "never smoked",
+}).encode()
+
+REGISTER_BODY = json.dumps({
+    "email": "patient@example.com", "password": "Secret123!", "full_name": "Test Patient",
+    "date_of_birth": "1970-01-01", "gender": "Female", "phone_number": "+6281234567890",
+}).encode()
+
+def screening_row(i=0):
+    return {
+        "id": str(uuid.uuid4()), "user_id": str(uuid.uuid4()), "age_at_screening": 55,
+        "height_cm": 170.0, "weight_kg": 70.5, "bmi": 24.4, "hypertension": False,
+        "heart_disease": False, "ever_married": True, "work_type": "Private",
+        "residence_type": "Urban", "avg_glucose_level": 105.3, "smoking_status": "never smoked",
+        "stroke_probability": 0.4123, "risk_level": "Medium",
+        "risk_factors": ["High BMI"], "confidence": "Medium", "prediction": 0, "threshold": 0.5,
+        "created_at": datetime.now(timezone.utc) - timedelta(minutes=i),
+    }
+
+def per_call_us(fn, iterations):
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return round((time.perf_counter() - start) / iterations * 1e6, 2)
+
+def main():
+    parser = argparse.ArgumentParser(description="Validation cost per request type")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--page", type=int, default=50, help="rows per history page")
+    args = parser.parse_args()
+
+    row = screening_row()
+    percentile = {"percentile": 62.5, "age_band": "55-64", "gender": "Female", "population": 812}
+    page = [screening_row(i) for i in range(args.page)]
+    list_iterations = max(args.iterations // args.page, 100)
+    # Built once, as a handler would have to cache it
+    adapter = TypeAdapter(List[ScreeningSummary])
+
+    results = {
+        "predict_body_us": per_call_us(lambda: ScreeningInput.model_validate_json(SCREENING_BODY), args.iterations),
+        "register_body_us": per_call_us(lambda: UserRegister.model_validate_json(REGISTER_BODY), args.iterations),
+        "predict_response_us": per_call_us(lambda: ScreeningResult(**row, population_percentile=percentile), args.iterations),
+        "history_page_us": {
+            "per_row_models": per_call_us(
+                lambda: TypeAdapter(List[ScreeningSummary]).dump_json([ScreeningSummary(**r) for r in page]),
+                list_iterations
+            ),
+            "cached_type_adapter": per_call_us(lambda: adapter.dump_json(adapter.validate_python(page)), list_iterations),
+            "trusted_projection": per_call_us(lambda: rows_response(page, ScreeningSummary), list_iterations),
+        },
+    }
+
+    # Validated and trusted list paths must produce the same document
+    assert json.loads(adapter.dump_json(adapter.validate_python(page))) == \
+        json.loads(rows_response(page, ScreeningSummary).body)
+
+    print(json.dumps({
+        "pydantic": pydantic.VERSION,
+        "iterations": args.iterations,
+        "page_rows": args.page,
+        "results": results,
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
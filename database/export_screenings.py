@@ -0,0 +1,66 @@
+"""
+Export Screenings Script
+Write stroke_screenings (with anonymized patient attributes) to Parquet or
+Arrow IPC for the data team, streaming in bounded batches
+
+Usage:
+    python database/export_screenings.py screenings.parquet
+    python database/export_screenings.py out.arrows --format arrow --risk-level High
+    python database/export_screenings.py q1.parquet --start-date 2025-01-01 --end-date 2025-03-31
+"""
+import sys
+import os
+import argparse
+from datetime import date
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from app import export
+from app.database import close_db_pool
+from app.models import RiskLevel
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export stroke screenings to columnar files")
+    parser.add_argument("output", help="Output file path")
+    parser.add_argument("--format", choices=sorted(export.EXPORT_FORMATS), default="parquet")
+    parser.add_argument("--compression", default="zstd", help="zstd, lz4, snappy, gzip or none")
+    parser.add_argument("--start-date", type=date.fromisoformat, default=None)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None)
+    parser.add_argument("--risk-level", type=RiskLevel, choices=list(RiskLevel), default=None)
+    parser.add_argument("--batch-size", type=int, default=export.EXPORT_BATCH_SIZE)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    
+    print("=" * 60)
+    print("EXPORTING SCREENINGS")
+    print("=" * 60)
+    print(f"\nFormat: {args.format} ({args.compression})")
+    print(f"Output: {args.output}")
+    
+    try:
+        rows = export.export_to_file(
+            args.output,
+            fmt=args.format,
+            compression=args.compression,
+            start_date=args.start_date,
+            end_date=args.end_date,
+            risk_level=args.risk_level,
+            batch_size=args.batch_size
+        )
+        size_mb = os.path.getsize(args.output) / (1024 * 1024)
+        print(f"\n✅ Exported {rows} screenings ({size_mb:.1f} MB)")
+    except Exception as e:
+        print(f"\n❌ Export failed: {e}")
+        sys.exit(1)
+    finally:
+        close_db_pool()
+
+if __name__ == "__main__":
+    main()
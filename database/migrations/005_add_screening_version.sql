@@ -0,0 +1,62 @@
+-- Migration: Add per-user screening version counter
+-- Description: Counter yang naik setiap kali screening user berubah,
+--              dipakai untuk ETag / delta sync di GET /screening/history
+-- Created: 2026-10-19
+
+ALTER TABLE users
+ADD COLUMN IF NOT EXISTS screening_version BIGINT NOT NULL DEFAULT 0;
+
+-- updated_at hanya untuk perubahan data user: bump screening_version
+-- (trigger di bawah) tidak boleh ikut mengubahnya
+DROP TRIGGER IF EXISTS update_users_updated_at ON users;
+CREATE TRIGGER update_users_updated_at
+    BEFORE UPDATE ON users
+    FOR EACH ROW
+    WHEN ((to_jsonb(OLD) - 'screening_version' - 'updated_at')
+          IS DISTINCT FROM (to_jsonb(NEW) - 'screening_version' - 'updated_at'))
+    EXECUTE FUNCTION update_updated_at_column();
+
+-- Bump version on any insert / update / delete of a user's screenings
+CREATE OR REPLACE FUNCTION bump_screening_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        UPDATE users SET screening_version = screening_version + 1 WHERE id = OLD.user_id;
+        RETURN OLD;
+    END IF;
+    UPDATE users SET screening_version = screening_version + 1 WHERE id = NEW.user_id;
+    IF TG_OP = 'UPDATE' AND NEW.user_id IS DISTINCT FROM OLD.user_id THEN
+        UPDATE users SET screening_version = screening_version + 1 WHERE id = OLD.user_id;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS bump_screening_version_on_change ON stroke_screenings;
+CREATE TRIGGER bump_screening_version_on_change
+    AFTER INSERT OR UPDATE OR DELETE ON stroke_screenings
+    FOR EACH ROW
+    EXECUTE FUNCTION bump_screening_version();
+
+-- Backfill: start existing users at their current screening count.
+-- Satu batch = 5000 user; run_migration.py mengulang statement ini per
+-- transaksi sampai tidak ada baris lagi (jika dijalankan manual, ulangi
+-- sampai UPDATE 0). User yang sudah di-bump trigger dilewati.
+UPDATE users u
+SET screening_version = s.total
+FROM (
+    SELECT user_id, COUNT(*) AS total
+    FROM stroke_screenings
+    WHERE user_id IN (
+        SELECT id
+        FROM users
+        WHERE screening_version = 0
+          AND EXISTS (SELECT 1 FROM stroke_screenings x WHERE x.user_id = users.id)
+        LIMIT 5000  -- migrate:batch
+    )
+    GROUP BY user_id
+) s
+WHERE s.user_id = u.id
+  AND u.screening_version = 0;
+
+COMMENT ON COLUMN users.screening_version IS 'Naik setiap kali screening user berubah (ETag untuk history)';
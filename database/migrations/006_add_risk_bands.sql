@@ -0,0 +1,33 @@
+-- Migration: Risk bands table shared with the API
+-- Description: Batas probabilitas per risk level disimpan di satu tabel;
+--              get_risk_level() membacanya, dan API memakai band yang sama
+--              dari model (ml/utils/calibration.py, sinkron via
+--              database/sync_risk_bands.py). Sebelumnya fungsi SQL memakai
+--              0.7/0.4 sementara API memakai 0.56/0.40.
+-- Created: 2026-10-19
+
+CREATE TABLE IF NOT EXISTS risk_bands (
+    risk_level risk_level PRIMARY KEY,
+    min_probability DECIMAL(5, 4) NOT NULL CHECK (min_probability >= 0 AND min_probability <= 1),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Same values as RISK_BANDS in ml/utils/calibration.py
+INSERT INTO risk_bands (risk_level, min_probability) VALUES
+    ('Low', 0.0000),
+    ('Medium', 0.4000),
+    ('High', 0.5600)
+ON CONFLICT (risk_level) DO NOTHING;
+
+-- Reads the table, so it is STABLE rather than IMMUTABLE
+CREATE OR REPLACE FUNCTION get_risk_level(probability DECIMAL)
+RETURNS risk_level AS $$
+    SELECT risk_level
+    FROM risk_bands
+    WHERE min_probability <= probability
+    ORDER BY min_probability DESC
+    LIMIT 1
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON TABLE risk_bands IS 'Batas bawah probabilitas per risk level (sumber yang sama dengan API)';
+COMMENT ON FUNCTION get_risk_level IS 'Menentukan risk level dari probability (0-1) berdasarkan tabel risk_bands';
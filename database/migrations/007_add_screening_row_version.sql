@@ -0,0 +1,41 @@
+-- Migration: Per-screening version stamp for history delta sync
+-- Description: Setiap screening dicap dengan users.screening_version hasil
+--              bump saat INSERT / UPDATE. Bump mengunci baris users sampai
+--              commit, jadi per user nomor ini urut sesuai urutan commit
+--              (created_at diisi saat transaksi mulai, atau di client untuk
+--              write yang ditunda, sehingga cursor created_at bisa melewati
+--              baris yang commit belakangan). GET /screening/history?since=
+--              memakai nomor ini. Screening lama tetap NULL (hanya muncul
+--              di history penuh).
+-- Created: 2026-10-19
+
+ALTER TABLE stroke_screenings
+ADD COLUMN IF NOT EXISTS screening_version BIGINT;
+
+-- Same bumps as 005, plus the new users.screening_version written to the row
+CREATE OR REPLACE FUNCTION bump_screening_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        UPDATE users SET screening_version = screening_version + 1 WHERE id = OLD.user_id;
+        RETURN OLD;
+    END IF;
+    IF TG_OP = 'UPDATE' AND NEW.user_id IS DISTINCT FROM OLD.user_id THEN
+        UPDATE users SET screening_version = screening_version + 1 WHERE id = OLD.user_id;
+    END IF;
+    UPDATE users SET screening_version = screening_version + 1
+    WHERE id = NEW.user_id
+    RETURNING screening_version INTO NEW.screening_version;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- BEFORE (was AFTER) so the stamp is written to the new row
+CREATE OR REPLACE TRIGGER bump_screening_version_on_change
+    BEFORE INSERT OR UPDATE OR DELETE ON stroke_screenings
+    FOR EACH ROW
+    EXECUTE FUNCTION bump_screening_version();
+
+CREATE INDEX IF NOT EXISTS idx_screenings_user_version ON stroke_screenings(user_id, screening_version);
+
+COMMENT ON COLUMN stroke_screenings.screening_version IS 'users.screening_version saat baris ini terakhir ditulis (cursor ?since= history)';
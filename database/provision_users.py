@@ -0,0 +1,169 @@
+"""
+Bulk User Provisioning Script
+Create patient accounts from a CSV file for clinic onboarding
+
+CSV columns: email, full_name, date_of_birth (YYYY-MM-DD), gender (Male/Female),
+             phone_number (optional), password (optional)
+Rows without a password get a random temporary password; the generated
+credentials are written to --credentials-out.
+
+Emails are matched case-insensitively: a repeated email is reported and
+only its first row is used. Passwords are hashed in parallel threads (bcrypt
+releases the GIL) and users are inserted in batches with
+INSERT ... ON CONFLICT (email) DO NOTHING, so re-running the same file is
+safe. Each batch is its own transaction; a batch rejected by a table
+constraint is retried row by row and only the offending rows are reported.
+
+Usage:
+    python database/provision_users.py clinic_patients.csv --credentials-out credentials.csv
+"""
+import sys
+import os
+import csv
+import secrets
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import psycopg2
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from psycopg2.extras import execute_values
+from pydantic import ValidationError
+from app.auth import get_password_hash
+from app.database import get_db_cursor, close_db_pool
+from app.models import UserRegister
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+BATCH_SIZE = 500
+
+def read_users(path):
+    """
+    Validate CSV rows with UserRegister; return (users, errors)
+    users: [(line_no, user, generated)], one per email (case-insensitive)
+    """
+    users, errors = [], []
+    first_line = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for line_no, row in enumerate(csv.DictReader(f), start=2):
+            row = {k.strip(): (v.strip() if v else None) for k, v in row.items() if k}
+            generated = not row.get('password')
+            if generated:
+                row['password'] = secrets.token_urlsafe(12)
+            try:
+                user = UserRegister(**row)
+            except ValidationError as e:
+                errors.append((line_no, row.get('email'), e.errors()[0]['msg']))
+                continue
+            key = user.email.lower()
+            if key in first_line:
+                errors.append((line_no, user.email, f"duplicate email (first on line {first_line[key]}), row skipped"))
+                continue
+            first_line[key] = line_no
+            users.append((line_no, user, generated))
+    return users, errors
+
+def insert_batch(cursor, batch):
+    """Insert one batch, return the set of emails actually created"""
+    rows = execute_values(
+        cursor,
+        """
+        INSERT INTO users (
+            email, password, full_name, date_of_birth,
+            gender, phone_number, role
+        )
+        VALUES %s
+        ON CONFLICT (email) DO NOTHING
+        RETURNING email
+        """,
+        batch,
+        template="(%s, %s, %s, %s, %s, %s, 'PATIENT')",
+        page_size=len(batch),
+        fetch=True
+    )
+    return {r['email'] for r in rows}
+
+def insert_rows(batch):
+    """
+    Insert one batch in its own transaction; if a constraint rejects it,
+    retry row by row. Returns (created emails, [(line_no, email, error)])
+    """
+    try:
+        with get_db_cursor() as cursor:
+            return insert_batch(cursor, [row for _, row in batch]), []
+    except psycopg2.Error:
+        pass
+
+    created, failed = set(), []
+    for line_no, row in batch:
+        try:
+            with get_db_cursor() as cursor:
+                created |= insert_batch(cursor, [row])
+        except psycopg2.Error as e:
+            failed.append((line_no, row[0], (e.pgerror or str(e)).strip().splitlines()[0]))
+    return created, failed
+
+def provision(path, credentials_out=None, workers=8):
+    users, errors = read_users(path)
+
+    print("=" * 60)
+    print("PROVISIONING USERS")
+    print("=" * 60)
+    print(f"\nValid rows: {len(users)}")
+    for line_no, email, message in errors:
+        print(f"⚠️  Line {line_no} ({email}): {message}")
+
+    if not credentials_out and any(generated for _, _, generated in users):
+        print("⚠️  Some rows have no password and --credentials-out is not set;")
+        print("    those users will need a password reset to log in.")
+
+    print("\nHashing passwords...")
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        hashes = list(pool.map(get_password_hash, (u.password for _, u, _ in users)))
+
+    created, failed = set(), []
+    for start in range(0, len(users), BATCH_SIZE):
+        batch = [
+            (line_no, (u.email, hashed, u.full_name, u.date_of_birth, u.gender.value, u.phone_number))
+            for (line_no, u, _), hashed in zip(users[start:start + BATCH_SIZE], hashes[start:start + BATCH_SIZE])
+        ]
+        batch_created, batch_failed = insert_rows(batch)
+        created |= batch_created
+        failed += batch_failed
+    for line_no, email, message in failed:
+        print(f"❌ Line {line_no} ({email}): {message}")
+
+    if credentials_out:
+        with open(credentials_out, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['email', 'temporary_password'])
+            for _, u, generated in users:
+                if generated and u.email in created:
+                    writer.writerow([u.email, u.password])
+
+    print(f"\n✅ Created {len(created)} users, skipped {len(users) - len(created) - len(failed)} existing emails"
+          f"{f', {len(failed)} rows rejected by the database' if failed else ''}")
+    if credentials_out:
+        print(f"Temporary passwords written to {credentials_out}")
+    return created
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk create patient accounts from CSV")
+    parser.add_argument("csv_file")
+    parser.add_argument("--credentials-out", default=None, help="CSV for generated passwords")
+    parser.add_argument("--workers", type=int, default=8, help="Password hashing threads")
+    args = parser.parse_args()
+
+    try:
+        provision(args.csv_file, args.credentials_out, args.workers)
+    except Exception as e:
+        print(f"\n❌ Provisioning failed: {e}")
+        sys.exit(1)
+    finally:
+        close_db_pool()
+
+if __name__ == "__main__":
+    main()
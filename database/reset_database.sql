@@ -22,11 +22,13 @@ DROP FUNCTION IF EXISTS get_risk_level(DECIMAL) CASCADE;
 DROP FUNCTION IF EXISTS calculate_bmi(DECIMAL, DECIMAL) CASCADE;
 DROP FUNCTION IF EXISTS get_user_age(DATE) CASCADE;
 DROP FUNCTION IF EXISTS update_updated_at_column() CASCADE;
+DROP FUNCTION IF EXISTS bump_screening_version() CASCADE;
 
 -- ============================================
 -- STEP 3: DROP TABLES (CASCADE akan drop foreign keys)
 -- ============================================
 
+DROP TABLE IF EXISTS risk_bands CASCADE;
 DROP TABLE IF EXISTS stroke_screenings CASCADE;
 DROP TABLE IF EXISTS users CASCADE;
 
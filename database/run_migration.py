@@ -1,13 +1,34 @@
 """
 Database Migration Runner for ML Stroke Guard
-Run all migrations and seeds in order
+Run pending migrations and seeds in order
+
+Applied migrations are recorded in schema_migrations (version, checksum,
+duration), so reruns only apply new files. A migration runs as a sequence of
+steps (see plan_steps): CREATE INDEX as CREATE INDEX CONCURRENTLY outside a
+transaction, every write-blocking DDL statement committed on its own with a
+short lock_timeout (retried), data backfills in their own transactions
+(optionally batched), so no lock is held longer than its statement. Progress
+is committed with each step in schema_migration_progress; a failed run
+resumes at the first unfinished step. --dry-run prints each pending step
+with the locks it holds until commit and the size of the tables it locks.
+
+Usage:
+    python database/run_migration.py --dry-run
+    python database/run_migration.py --yes --report migration.json
+    python database/run_migration.py --baseline 007   # existing database
 """
 
 import os
+import re
 import sys
+import json
+import time
+import hashlib
+import argparse
 from pathlib import Path
 from dotenv import load_dotenv
 import psycopg2
+import psycopg2.errors
 from psycopg2 import sql
 
 # Load environment variables
@@ -112,32 +133,587 @@ def run_sql_file(cursor, file_path):
         print_error(f"Error executing {file_path}: {e}")
         return False
 
-def run_migrations(cursor, conn):
-    """Run all migration files"""
-    print_header("RUNNING MIGRATIONS")
-    
-    migrations_dir = Path(__file__).parent / 'migrations'
-    migration_files = sorted(migrations_dir.glob('*.sql'))
-    
-    if not migration_files:
-        print_warning("No migration files found!")
-        return False
-    
-    success_count = 0
-    for migration_file in migration_files:
-        print_info(f"Executing: {migration_file.name}")
-        
-        if run_sql_file(cursor, migration_file):
+# ============================================
+# MIGRATIONS (tracked, lock-aware)
+# ============================================
+
+MIGRATIONS_DIR = Path(__file__).parent / 'migrations'
+
+# Applied versions; one row per migration file
+MIGRATIONS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version VARCHAR(255) PRIMARY KEY,
+        filename VARCHAR(255) NOT NULL,
+        checksum CHAR(64) NOT NULL,
+        applied_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+        duration_ms INTEGER
+    )
+"""
+
+# Steps already committed of a migration that has not finished yet
+MIGRATION_PROGRESS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS schema_migration_progress (
+        version VARCHAR(255) PRIMARY KEY,
+        checksum CHAR(64) NOT NULL,
+        steps_done INTEGER NOT NULL,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    )
+"""
+
+# A DDL statement waiting for its lock queues every later INSERT behind it:
+# give up quickly and retry instead of stalling screening inserts
+MIGRATION_LOCK_TIMEOUT = os.getenv('MIGRATION_LOCK_TIMEOUT', '3s')
+MIGRATION_LOCK_RETRIES = int(os.getenv('MIGRATION_LOCK_RETRIES', 5))
+# Tables above this many rows are "large" for the lock report / guard
+MIGRATION_LARGE_TABLE_ROWS = int(os.getenv('MIGRATION_LARGE_TABLE_ROWS', 100000))
+# A backfill containing this comment limits itself to one batch per run
+# and is repeated, one transaction per batch, until it changes no rows
+BATCH_MARKER = '-- migrate:batch'
+
+# Only one runner at a time
+MIGRATION_ADVISORY_LOCK = 7420148
+
+DOLLAR_TAG = re.compile(r'\$[A-Za-z_][A-Za-z_0-9]*\$|\$\$')
+INDEX_RE = re.compile(
+    r'^CREATE\s+(UNIQUE\s+)?INDEX\s+(CONCURRENTLY\s+)?(IF\s+NOT\s+EXISTS\s+)?(\w+)\s+ON\s+(?:ONLY\s+)?([\w."]+)',
+    re.IGNORECASE
+)
+TABLE_PATTERNS = [
+    ('alter_table', re.compile(r'^ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?([\w."]+)', re.I)),
+    ('create_table', re.compile(r'^CREATE\s+(?:UNLOGGED\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?([\w."]+)', re.I)),
+    ('trigger', re.compile(r'^(?:CREATE|DROP)\s+(?:OR\s+REPLACE\s+)?TRIGGER\s+.*?\bON\s+([\w."]+)', re.I | re.S)),
+    ('drop_index', re.compile(r'^DROP\s+INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+EXISTS\s+)?([\w."]+)', re.I)),
+    ('update', re.compile(r'^UPDATE\s+(?:ONLY\s+)?([\w."]+)', re.I)),
+    ('delete', re.compile(r'^DELETE\s+FROM\s+(?:ONLY\s+)?([\w."]+)', re.I)),
+    ('insert', re.compile(r'^INSERT\s+INTO\s+([\w."]+)', re.I)),
+    ('view', re.compile(r'^CREATE\s+(?:OR\s+REPLACE\s+)?VIEW\s+([\w."]+)', re.I)),
+    ('comment', re.compile(r'^COMMENT\s+ON\s+(?:TABLE|COLUMN)\s+([\w"]+)', re.I)),
+]
+REFERENCES_RE = re.compile(r'\bREFERENCES\s+([\w."]+)', re.I)
+VOLATILE_DEFAULT = re.compile(r'DEFAULT\s+(now|clock_timestamp|random|gen_random_uuid|uuid_generate_v\d)\s*\(', re.I)
+
+def split_sql(text):
+    """
+    Split a SQL file into statements on top-level semicolons
+    (quotes, comments and $$ bodies are not split)
+    """
+    statements = []
+    start = i = 0
+    n = len(text)
+
+    def add(chunk):
+        body = strip_leading_comments(chunk)
+        if body:
+            statements.append(body)
+
+    while i < n:
+        c = text[i]
+        if text.startswith('--', i):
+            j = text.find('\n', i)
+            i = n if j < 0 else j
+        elif text.startswith('/*', i):
+            j = text.find('*/', i + 2)
+            i = n if j < 0 else j + 2
+        elif c in ("'", '"'):
+            j = i + 1
+            while j < n:
+                if text[j] == c:
+                    if j + 1 < n and text[j + 1] == c:
+                        j += 2
+                        continue
+                    break
+                j += 1
+            i = j + 1
+        elif c == '$' and DOLLAR_TAG.match(text, i):
+            tag = DOLLAR_TAG.match(text, i).group(0)
+            j = text.find(tag, i + len(tag))
+            i = n if j < 0 else j + len(tag)
+        elif c == ';':
+            add(text[start:i])
+            start = i = i + 1
+        else:
+            i += 1
+    add(text[start:])
+    return statements
+
+def strip_leading_comments(chunk):
+    lines = chunk.strip().splitlines()
+    while lines and (not lines[0].strip() or lines[0].strip().startswith('--')):
+        lines.pop(0)
+    return '\n'.join(lines).strip()
+
+def analyze_statement(statement):
+    """
+    Classify a statement: the SQL to run (plain CREATE INDEX is rewritten to
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS), the table it locks, the lock
+    mode, whether it blocks INSERTs, whether it is a data backfill and
+    whether it must run outside a transaction
+    """
+    flat = ' '.join(re.sub(r'--[^\n]*', '', statement).split())
+    upper = flat.upper()
+    info = {
+        'sql': statement, 'kind': 'other', 'table': None, 'lock': None,
+        'blocks_writes': False, 'scan': False, 'concurrent': False, 'note': '',
+        'locks': [], 'backfill': False, 'batched': BATCH_MARKER in statement,
+    }
+
+    match = INDEX_RE.match(flat)
+    if match:
+        unique, _, _, name, table = match.groups()
+        rest = flat[match.end(4):].lstrip()
+        info.update(
+            kind='create_index', table=table, index=name, concurrent=True,
+            sql=f"CREATE {unique or ''}INDEX CONCURRENTLY IF NOT EXISTS {name} {rest}",
+            lock='SHARE UPDATE EXCLUSIVE', scan=True,
+            note='built without blocking writes (outside a transaction)'
+        )
+        info['locks'] = [(table, info['lock'])]
+        return info
+
+    for kind, pattern in TABLE_PATTERNS:
+        match = pattern.match(flat)
+        if match:
+            info['kind'] = kind
+            info['table'] = match.group(1)
+            break
+
+    kind = info['kind']
+    if kind == 'alter_table':
+        info.update(lock='ACCESS EXCLUSIVE', blocks_writes=True)
+        if re.search(r'ALTER\s+COLUMN\s+\S+\s+(SET\s+DATA\s+)?TYPE', upper) or VOLATILE_DEFAULT.search(flat):
+            info.update(scan=True, note='rewrites the whole table under the lock')
+        elif re.search(r'SET\s+NOT\s+NULL', upper) or (
+            re.search(r'ADD\s+(CONSTRAINT\s+\S+\s+)?(FOREIGN\s+KEY|CHECK|PRIMARY\s+KEY|UNIQUE)', upper)
+            and 'NOT VALID' not in upper
+        ):
+            info.update(scan=True, note='scans the table under the lock (use NOT VALID + VALIDATE CONSTRAINT)')
+        else:
+            info['note'] = 'catalog-only change, lock held briefly'
+    elif kind == 'create_table':
+        info['note'] = 'new table'
+        referenced = REFERENCES_RE.findall(flat)
+        if referenced:
+            # The foreign key trigger locks the referenced tables, not the new one
+            info.update(blocks_writes=True, note='new table; locks referenced tables')
+            info['locks'] = [(table, 'SHARE ROW EXCLUSIVE') for table in dict.fromkeys(referenced)]
+            return info
+    elif kind == 'trigger':
+        info.update(lock='SHARE ROW EXCLUSIVE', blocks_writes=True, note='lock held briefly')
+    elif kind == 'drop_index':
+        concurrent = 'CONCURRENTLY' in upper
+        info.update(
+            lock='SHARE UPDATE EXCLUSIVE' if concurrent else 'ACCESS EXCLUSIVE',
+            blocks_writes=not concurrent, note='' if concurrent else 'use DROP INDEX CONCURRENTLY'
+        )
+    elif kind in ('update', 'delete'):
+        info.update(lock='ROW EXCLUSIVE', scan=' WHERE ' not in f' {upper} ', backfill=True,
+                    note='row locks only; long transactions delay vacuum')
+    elif kind == 'insert':
+        # INSERT ... SELECT copies existing data; INSERT ... VALUES is seed data
+        info.update(lock='ROW EXCLUSIVE', backfill=re.search(r'\bSELECT\b', upper) is not None)
+    elif kind == 'view':
+        info.update(lock='ACCESS EXCLUSIVE', note='locks the view only')
+    elif kind == 'comment':
+        info.update(lock='SHARE UPDATE EXCLUSIVE')
+    if info['table'] and info['lock']:
+        info['locks'] = [(info['table'], info['lock'])]
+    return info
+
+def plan_steps(statements):
+    """
+    Group a migration's statements into steps, each committed on its own:
+
+    - concurrent: CREATE INDEX CONCURRENTLY, outside a transaction
+    - ddl: one write-blocking statement (ALTER TABLE, triggers, ...) alone in
+      its transaction, so its lock is released as soon as it is done
+    - backfill: one UPDATE / DELETE / INSERT ... SELECT in a transaction
+      without DDL locks; repeated until it changes no rows when it carries
+      BATCH_MARKER
+    - transaction: consecutive statements that do not block writes (new
+      tables, functions, comments, seed rows)
+
+    'locks' of a step is every (table, mode) held until it commits
+    """
+    steps = []
+    for info in statements:
+        if info['concurrent']:
+            kind = 'concurrent'
+        elif info['backfill']:
+            kind = 'backfill'
+        elif info['blocks_writes']:
+            kind = 'ddl'
+        else:
+            kind = 'transaction'
+        if kind == 'transaction' and steps and steps[-1]['kind'] == 'transaction':
+            steps[-1]['statements'].append(info)
+        else:
+            steps.append({'kind': kind, 'statements': [info]})
+    for step in steps:
+        step['locks'] = list(dict.fromkeys(lock for info in step['statements'] for lock in info['locks']))
+    return steps
+
+class Migration:
+    """One migrations/NNN_name.sql file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.filename = path.name
+        self.version = path.stem.split('_', 1)[0]
+        content = path.read_bytes()
+        self.checksum = hashlib.sha256(content).hexdigest()
+        self.statements = [analyze_statement(s) for s in split_sql(content.decode('utf-8'))]
+        self.steps = plan_steps(self.statements)
+
+def load_migrations():
+    return [Migration(path) for path in sorted(MIGRATIONS_DIR.glob('*.sql'))]
+
+def table_exists(cursor, table):
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", (table,))
+    return cursor.fetchone()[0]
+
+def ensure_migrations_table(conn, baseline=False, dry_run=False):
+    """
+    Create schema_migrations / schema_migration_progress (dry_run only reads
+    them when they exist); returns ({version: checksum} applied,
+    {version: (checksum, steps_done)} in progress), or None when the
+    database has tables but no history and baseline is not set (running
+    001 again would fail halfway)
+    """
+    applied, progress = {}, {}
+    with conn.cursor() as cursor:
+        if not dry_run:
+            cursor.execute(MIGRATIONS_TABLE_SQL)
+            cursor.execute(MIGRATION_PROGRESS_TABLE_SQL)
+        if not dry_run or table_exists(cursor, 'schema_migrations'):
+            cursor.execute("SELECT version, checksum FROM schema_migrations")
+            applied = dict(cursor.fetchall())
+        if not dry_run or table_exists(cursor, 'schema_migration_progress'):
+            cursor.execute("SELECT version, checksum, steps_done FROM schema_migration_progress")
+            progress = {version: (checksum, done) for version, checksum, done in cursor.fetchall()}
+        has_schema = table_exists(cursor, 'users')
+    conn.commit()
+    if has_schema and not applied and not progress and not baseline:
+        print_error("Database already has tables but no schema_migrations history.")
+        print_info("Mark the migrations that are already applied with --baseline <version>,")
+        print_info("e.g. python database/run_migration.py --baseline 007")
+        return None
+    return applied, progress
+
+def table_stats(cursor, table, cache):
+    """(estimated rows, total bytes) or None when the table does not exist yet"""
+    if table not in cache:
+        cursor.execute(
+            """
+            SELECT c.reltuples::bigint, pg_total_relation_size(c.oid)
+            FROM pg_class c
+            WHERE c.oid = to_regclass(%s)
+            """,
+            (table,)
+        )
+        cache[table] = cursor.fetchone()
+    return cache[table]
+
+def format_bytes(size):
+    for unit in ('B', 'kB', 'MB', 'GB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+def describe_locks(cursor, locks, cache):
+    """[{table, lock, rows, large, summary}] for (table, mode) pairs, sized from current stats"""
+    described = []
+    for table, mode in locks:
+        stats = table_stats(cursor, table, cache)
+        rows = max(stats[0], 0) if stats else 0
+        size = f" (~{rows:,} rows, {format_bytes(stats[1])})" if stats else ""
+        described.append({
+            'table': table, 'lock': mode, 'rows': rows, 'large': rows >= MIGRATION_LARGE_TABLE_ROWS,
+            'summary': f"{mode} on {table}{size}",
+        })
+    return described
+
+def lock_impact(cursor, info, cache):
+    """Describe lock impact; 'blocking' is True for slow write-blocking work on a large table"""
+    locks = describe_locks(cursor, info['locks'], cache)
+    large = any(lock['large'] for lock in locks)
+    return {
+        'table': info['table'], 'lock': info['lock'], 'rows': max((lock['rows'] for lock in locks), default=0),
+        'large': large, 'blocks_writes': info['blocks_writes'],
+        'blocking': info['blocks_writes'] and info['scan'] and large,
+        'summary': f"{', '.join(lock['summary'] for lock in locks) or 'no table lock'}"
+                   f"{' - ' + info['note'] if info['note'] else ''}",
+    }
+
+def step_impact(cursor, step, cache):
+    """What the step's transaction holds until it commits (per batch for batched backfills)"""
+    locks = describe_locks(cursor, step['locks'], cache)
+    if step['kind'] == 'concurrent':
+        held = 'no transaction'
+    elif not locks:
+        held = 'holds no table locks'
+    else:
+        until = 'each batch commits' if step['statements'][0]['batched'] else 'commit'
+        held = f"holds {', '.join(lock['summary'] for lock in locks)} until {until}"
+    return {'kind': step['kind'], 'locks': [{k: v for k, v in lock.items() if k != 'summary'} for lock in locks],
+            'summary': held}
+
+def short_sql(statement, width=70):
+    flat = ' '.join(statement.split())
+    return flat if len(flat) <= width else flat[:width - 3] + '...'
+
+def run_transactional(conn, statements, timings, after=None, backfill=False):
+    """
+    Run statements in one transaction with lock_timeout, retrying lock
+    timeouts; after(cursor, batch_timings) runs last in the same transaction.
+    Returns the rowcount of the last statement
+    """
+    for attempt in range(MIGRATION_LOCK_RETRIES + 1):
+        batch_timings = []
+        rowcount = None
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SET LOCAL lock_timeout = %s", (MIGRATION_LOCK_TIMEOUT,))
+                if backfill:
+                    # Row locks only: may run past the connection's statement_timeout
+                    cursor.execute("SET LOCAL statement_timeout = 0")
+                for info in statements:
+                    start = time.perf_counter()
+                    cursor.execute(info['sql'])
+                    rowcount = cursor.rowcount
+                    batch_timings.append((info, (time.perf_counter() - start) * 1000))
+                if after is not None:
+                    after(cursor, batch_timings)
             conn.commit()
-            print_success(f"Completed: {migration_file.name}")
-            success_count += 1
+            timings.extend(batch_timings)
+            return rowcount
+        except psycopg2.errors.LockNotAvailable:
+            conn.rollback()
+            if attempt == MIGRATION_LOCK_RETRIES:
+                raise
+            delay = min(30, 2 ** attempt)
+            print_warning(f"Lock not available within {MIGRATION_LOCK_TIMEOUT}, retrying in {delay}s")
+            time.sleep(delay)
+
+def run_concurrent_index(conn, info, timings):
+    """CREATE INDEX CONCURRENTLY outside a transaction; drops the index if the build fails"""
+    conn.autocommit = True
+    cursor = conn.cursor()
+    try:
+        # Waits for running transactions, never for new inserts
+        cursor.execute("SET statement_timeout = 0")
+        cursor.execute("SET lock_timeout = 0")
+        start = time.perf_counter()
+        try:
+            cursor.execute(info['sql'])
+        except Exception:
+            # A failed concurrent build leaves an INVALID index behind
+            cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {info['index']}")
+            raise
+        timings.append((info, (time.perf_counter() - start) * 1000))
+    finally:
+        cursor.execute("RESET statement_timeout")
+        cursor.execute("RESET lock_timeout")
+        cursor.close()
+        conn.autocommit = False
+
+def run_batched_backfill(conn, info, timings, after):
+    """Repeat a BATCH_MARKER backfill, one transaction per batch, until it changes no rows"""
+    batch_timings = []
+    while run_transactional(conn, [info], batch_timings, backfill=True):
+        pass
+    total_ms = sum(ms for _, ms in batch_timings)
+    print_info(f"  backfill ran in {len(batch_timings)} batches")
+    run_transactional(conn, [], timings, after=lambda cursor, _: after(cursor, [(info, total_ms)]))
+    timings.append((info, total_ms))
+
+def record_step(cursor, migration, step_number, duration_ms):
+    """
+    Commit progress with the step it belongs to; the last step records the
+    version in schema_migrations instead
+    """
+    if step_number == len(migration.steps):
+        cursor.execute(
+            """
+            INSERT INTO schema_migrations (version, filename, checksum, duration_ms)
+            VALUES (%s, %s, %s, %s)
+            """,
+            (migration.version, migration.filename, migration.checksum, round(duration_ms))
+        )
+        cursor.execute("DELETE FROM schema_migration_progress WHERE version = %s", (migration.version,))
+    else:
+        cursor.execute(
+            """
+            INSERT INTO schema_migration_progress (version, checksum, steps_done)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (version) DO UPDATE
+            SET checksum = EXCLUDED.checksum, steps_done = EXCLUDED.steps_done, updated_at = NOW()
+            """,
+            (migration.version, migration.checksum, step_number)
+        )
+
+def apply_migration(conn, migration, steps_done=0):
+    """Apply one migration from step steps_done + 1; returns [(statement info, ms)]"""
+    timings = []
+    for number, step in enumerate(migration.steps, 1):
+        if number <= steps_done:
+            continue
+
+        def after(cursor, batch_timings, number=number):
+            total_ms = sum(ms for _, ms in timings) + sum(ms for _, ms in batch_timings)
+            record_step(cursor, migration, number, total_ms)
+
+        info = step['statements'][0]
+        if step['kind'] == 'concurrent':
+            # The index is built IF NOT EXISTS: safe to repeat if the progress commit is lost
+            run_concurrent_index(conn, info, timings)
+            run_transactional(conn, [], timings, after=after)
+        elif step['kind'] == 'backfill' and info['batched']:
+            run_batched_backfill(conn, info, timings, after)
         else:
+            run_transactional(conn, step['statements'], timings, after=after, backfill=step['kind'] == 'backfill')
+    return timings
+
+def pending_migrations(migrations, applied, allow_changed=False):
+    """Migrations not yet applied; None if an applied file was edited"""
+    pending = []
+    changed = False
+    for migration in migrations:
+        checksum = applied.get(migration.version)
+        if checksum is None:
+            pending.append(migration)
+        elif checksum != migration.checksum:
+            changed = True
+            report = print_warning if allow_changed else print_error
+            report(f"{migration.filename} changed after it was applied (checksum mismatch)")
+    if changed and not allow_changed:
+        print_info("Add a new migration instead of editing an applied one (or pass --allow-changed)")
+        return None
+    return pending
+
+def resume_points(pending, progress):
+    """{version: steps already committed}; None if a half-applied file was edited"""
+    done = {}
+    for migration in pending:
+        if migration.version not in progress:
+            continue
+        checksum, steps_done = progress[migration.version]
+        if checksum != migration.checksum:
+            print_error(f"{migration.filename} changed while half-applied ({steps_done} steps committed)")
+            print_info("Restore the file, or finish it by hand and record it (see database/README.md)")
+            return None
+        print_warning(f"{migration.filename} is half-applied: resuming at step {steps_done + 1}/{len(migration.steps)}")
+        done[migration.version] = steps_done
+    return done
+
+def baseline_migrations(conn, migrations, version):
+    """Record migrations up to version (an int: 6 and 006 are the same) as applied without running them"""
+    with conn.cursor() as cursor:
+        for migration in migrations:
+            if int(migration.version) > version:
+                break
+            cursor.execute(
+                """
+                INSERT INTO schema_migrations (version, filename, checksum, duration_ms)
+                VALUES (%s, %s, %s, NULL)
+                ON CONFLICT (version) DO NOTHING
+                """,
+                (migration.version, migration.filename, migration.checksum)
+            )
+            cursor.execute("DELETE FROM schema_migration_progress WHERE version = %s", (migration.version,))
+            print_success(f"Baselined: {migration.filename}")
+    conn.commit()
+
+def run_migrations(conn, dry_run=False, allow_changed=False, allow_blocking=False):
+    """
+    Apply pending migrations in order; returns a report dict, or None on failure
+    dry_run only prints the steps and the locks they hold
+    """
+    print_header("DRY RUN: PENDING MIGRATIONS" if dry_run else "RUNNING MIGRATIONS")
+
+    migrations = load_migrations()
+    if not migrations:
+        print_warning("No migration files found!")
+        return None
+
+    history = ensure_migrations_table(conn, dry_run=dry_run)
+    if history is None:
+        return None
+    applied, progress = history
+    pending = pending_migrations(migrations, applied, allow_changed)
+    if pending is None:
+        return None
+    if not pending:
+        print_success("Database is up to date, no pending migrations")
+        return {"applied": [], "dry_run": dry_run}
+    done = resume_points(pending, progress)
+    if done is None:
+        return None
+
+    # Lock impact of every remaining step, measured against current table sizes
+    stats_cache = {}
+    blocking = []
+    with conn.cursor() as cursor:
+        for migration in pending:
+            for step in migration.steps[done.get(migration.version, 0):]:
+                step['impact'] = step_impact(cursor, step, stats_cache)
+                for info in step['statements']:
+                    info['impact'] = lock_impact(cursor, info, stats_cache)
+                    if info['impact']['blocking']:
+                        blocking.append((migration, info))
+    conn.commit()
+
+    report = {"dry_run": dry_run, "applied": []}
+    if dry_run:
+        for migration in pending:
+            first = done.get(migration.version, 0)
+            print_info(f"{migration.filename} ({len(migration.statements)} statements, {len(migration.steps)} steps)")
+            steps = []
+            for number, step in enumerate(migration.steps[first:], first + 1):
+                print(f"  step {number} ({step['kind']}): {step['impact']['summary']}")
+                for info in step['statements']:
+                    impact = info['impact']
+                    tag = "BLOCKS" if impact['blocking'] else ("brief " if impact['blocks_writes'] else "  ok  ")
+                    print(f"    [{tag}] {short_sql(info['sql'])}")
+                    print(f"             {impact['summary']}")
+                steps.append({
+                    "step": number, "kind": step['kind'], "holds": step['impact']['locks'],
+                    "statements": [
+                        {"sql": short_sql(info['sql'], 200), **{k: v for k, v in info['impact'].items() if k != 'summary'}}
+                        for info in step['statements']
+                    ],
+                })
+            report["applied"].append({"version": migration.version, "filename": migration.filename, "steps": steps})
+    if blocking:
+        print_warning(f"{len(blocking)} statement(s) block inserts on large tables for a full scan/rewrite:")
+        for migration, info in blocking:
+            print(f"  {migration.filename}: {short_sql(info['sql'])}")
+        if not dry_run and not allow_blocking:
+            print_error("Refusing to run them; split the change (e.g. NOT VALID constraints) or pass --allow-blocking")
+            return None
+    if dry_run:
+        return report
+
+    for migration in pending:
+        print_info(f"Applying: {migration.filename}")
+        try:
+            timings = apply_migration(conn, migration, done.get(migration.version, 0))
+        except Exception as e:
             conn.rollback()
-            print_error(f"Failed: {migration_file.name}")
-            return False
-    
-    print_success(f"\nAll {success_count} migrations completed successfully!")
-    return True
+            print_error(f"Failed: {migration.filename}: {e}")
+            print_info("Committed steps are kept; rerun to resume at the failed step")
+            return None
+        for info, ms in timings:
+            print(f"  {ms:9.1f} ms  {short_sql(info['sql'])}")
+        total_ms = sum(ms for _, ms in timings)
+        print_success(f"Completed: {migration.filename} in {total_ms:.0f} ms")
+        report["applied"].append({
+            "version": migration.version, "filename": migration.filename, "duration_ms": round(total_ms, 1),
+            "statements": [{"sql": short_sql(info['sql'], 200), "ms": round(ms, 1)} for info, ms in timings],
+        })
+
+    print_success(f"\nAll {len(pending)} pending migrations completed successfully!")
+    return report
 
 def run_seeds(cursor, conn, include_sample_data=False):
     """Run all seed files"""
@@ -224,6 +800,17 @@ def verify_migration(cursor):
 
 def main():
     """Main migration runner"""
+    parser = argparse.ArgumentParser(description="Apply pending database migrations")
+    parser.add_argument("--dry-run", action="store_true", help="List pending statements and their lock impact, change nothing")
+    parser.add_argument("--yes", "-y", action="store_true", help="Do not ask for confirmation")
+    parser.add_argument("--sample-data", action="store_true", help="Also run the sample data seed")
+    parser.add_argument("--skip-seeds", action="store_true", help="Only run migrations")
+    parser.add_argument("--baseline", metavar="VERSION", type=int, help="Mark migrations up to VERSION as applied without running them")
+    parser.add_argument("--allow-changed", action="store_true", help="Only warn when an applied migration file was edited")
+    parser.add_argument("--allow-blocking", action="store_true", help="Run statements that block inserts on large tables")
+    parser.add_argument("--report", metavar="PATH", help="Write per-statement timings / lock impact as JSON")
+    args = parser.parse_args()
+    
     print_header("ML STROKE GUARD - DATABASE MIGRATION")
     
     # Check if .env exists
@@ -232,16 +819,19 @@ def main():
         print_info("Please create .env file with database credentials")
         sys.exit(1)
     
-    # Ask for confirmation
-    print_warning("This will create/modify database tables.")
-    response = input(f"{Colors.BOLD}Continue? (y/n): {Colors.ENDC}").lower()
-    
-    if response != 'y':
-        print_info("Migration cancelled.")
-        sys.exit(0)
-    
-    # Ask about sample data
-    sample_data = input(f"{Colors.BOLD}Include sample data for testing? (y/n): {Colors.ENDC}").lower() == 'y'
+    sample_data = args.sample_data
+    if not (args.yes or args.dry_run or args.baseline is not None):
+        # Ask for confirmation
+        print_warning("This will create/modify database tables.")
+        response = input(f"{Colors.BOLD}Continue? (y/n): {Colors.ENDC}").lower()
+        
+        if response != 'y':
+            print_info("Migration cancelled.")
+            sys.exit(0)
+        
+        # Ask about sample data
+        if not args.skip_seeds and not sample_data:
+            sample_data = input(f"{Colors.BOLD}Include sample data for testing? (y/n): {Colors.ENDC}").lower() == 'y'
     
     # Connect to database
     print_info("Connecting to database...")
@@ -250,13 +840,34 @@ def main():
     print_success("Connected to database!")
     
     try:
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", (MIGRATION_ADVISORY_LOCK,))
+        if not cursor.fetchone()[0]:
+            print_error("Another migration run holds the migration lock")
+            sys.exit(1)
+        conn.commit()
+        
+        if args.baseline is not None:
+            ensure_migrations_table(conn, baseline=True)
+            baseline_migrations(conn, load_migrations(), args.baseline)
+            return
+        
         # Run migrations
-        if not run_migrations(cursor, conn):
+        report = run_migrations(
+            conn, dry_run=args.dry_run,
+            allow_changed=args.allow_changed, allow_blocking=args.allow_blocking
+        )
+        if report is None:
             print_error("Migration failed!")
             sys.exit(1)
+        if args.report:
+            with open(args.report, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print_info(f"Report written to {args.report}")
+        if args.dry_run:
+            return
         
         # Run seeds
-        if not run_seeds(cursor, conn, include_sample_data=sample_data):
+        if not args.skip_seeds and not run_seeds(cursor, conn, include_sample_data=sample_data):
             print_error("Seeding failed!")
             sys.exit(1)
         
@@ -266,7 +877,7 @@ def main():
         print_header("MIGRATION COMPLETED SUCCESSFULLY")
         print_success("Database is ready to use!")
         
-        if not sample_data:
+        if not sample_data and not args.skip_seeds:
             print_info("\nDefault admin credentials:")
             print(f"  Email: admin@strokeguard.com")
             print(f"  Password: Admin123!")
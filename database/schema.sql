@@ -55,6 +55,8 @@ CREATE TABLE users (
     gender gender_type NOT NULL,
     phone_number VARCHAR(20),
     role user_role NOT NULL DEFAULT 'PATIENT',
+    -- Naik setiap kali screening user berubah (ETag history)
+    screening_version BIGINT NOT NULL DEFAULT 0,
     created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
     
@@ -90,6 +92,8 @@ CREATE TABLE stroke_screenings (
     -- Metadata
     created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    -- users.screening_version saat baris terakhir ditulis (cursor ?since= history)
+    screening_version BIGINT,
     
     -- Constraints
     CONSTRAINT fk_user FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
@@ -101,6 +105,19 @@ CREATE TABLE stroke_screenings (
     CONSTRAINT valid_probability CHECK (stroke_probability >= 0 AND stroke_probability <= 1)
 );
 
+-- Risk bands (shared with the API, see ml/utils/calibration.py;
+-- refreshed from the deployed model by database/sync_risk_bands.py)
+CREATE TABLE risk_bands (
+    risk_level risk_level PRIMARY KEY,
+    min_probability DECIMAL(5, 4) NOT NULL CHECK (min_probability >= 0 AND min_probability <= 1),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+INSERT INTO risk_bands (risk_level, min_probability) VALUES
+    ('Low', 0.0000),
+    ('Medium', 0.4000),
+    ('High', 0.5600);
+
 -- ============================================
 -- INDEXES
 -- ============================================
@@ -115,6 +132,7 @@ CREATE INDEX idx_screenings_created_at ON stroke_screenings(created_at DESC);
 CREATE INDEX idx_screenings_risk_level ON stroke_screenings(risk_level);
 CREATE INDEX idx_screenings_user_created ON stroke_screenings(user_id, created_at DESC);
 CREATE INDEX idx_screenings_user_risk ON stroke_screenings(user_id, risk_level);
+CREATE INDEX idx_screenings_user_version ON stroke_screenings(user_id, screening_version);
 
 -- ============================================
 -- FUNCTIONS
@@ -150,27 +168,45 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql IMMUTABLE;
 
--- Get risk level function
+-- Get risk level function (reads risk_bands, so STABLE rather than IMMUTABLE)
 CREATE OR REPLACE FUNCTION get_risk_level(probability DECIMAL)
 RETURNS risk_level AS $$
+    SELECT risk_level
+    FROM risk_bands
+    WHERE min_probability <= probability
+    ORDER BY min_probability DESC
+    LIMIT 1
+$$ LANGUAGE sql STABLE;
+
+-- Bump users.screening_version on any change to a user's screenings and
+-- stamp the row with the new value (the users row lock orders it by commit)
+CREATE OR REPLACE FUNCTION bump_screening_version()
+RETURNS TRIGGER AS $$
 BEGIN
-    IF probability >= 0.7 THEN
-        RETURN 'High'::risk_level;
-    ELSIF probability >= 0.4 THEN
-        RETURN 'Medium'::risk_level;
-    ELSE
-        RETURN 'Low'::risk_level;
+    IF TG_OP = 'DELETE' THEN
+        UPDATE users SET screening_version = screening_version + 1 WHERE id = OLD.user_id;
+        RETURN OLD;
+    END IF;
+    IF TG_OP = 'UPDATE' AND NEW.user_id IS DISTINCT FROM OLD.user_id THEN
+        UPDATE users SET screening_version = screening_version + 1 WHERE id = OLD.user_id;
     END IF;
+    UPDATE users SET screening_version = screening_version + 1
+    WHERE id = NEW.user_id
+    RETURNING screening_version INTO NEW.screening_version;
+    RETURN NEW;
 END;
-$$ LANGUAGE plpgsql IMMUTABLE;
+$$ LANGUAGE plpgsql;
 
 -- ============================================
 -- TRIGGERS
 -- ============================================
 
+-- screening_version bumps do not count as a change to the user
 CREATE TRIGGER update_users_updated_at
     BEFORE UPDATE ON users
     FOR EACH ROW
+    WHEN ((to_jsonb(OLD) - 'screening_version' - 'updated_at')
+          IS DISTINCT FROM (to_jsonb(NEW) - 'screening_version' - 'updated_at'))
     EXECUTE FUNCTION update_updated_at_column();
 
 CREATE TRIGGER update_stroke_screenings_updated_at
@@ -178,6 +214,11 @@ CREATE TRIGGER update_stroke_screenings_updated_at
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
 
+CREATE TRIGGER bump_screening_version_on_change
+    BEFORE INSERT OR UPDATE OR DELETE ON stroke_screenings
+    FOR EACH ROW
+    EXECUTE FUNCTION bump_screening_version();
+
 -- ============================================
 -- VIEWS
 -- ============================================
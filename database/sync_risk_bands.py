@@ -0,0 +1,50 @@
+"""
+Sync Risk Bands
+Write the risk bands stored with the deployed model into the risk_bands
+table, so SQL get_risk_level() matches the API after a model/calibration
+update.
+
+Usage:
+    python database/sync_risk_bands.py
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import joblib
+from psycopg2.extras import execute_values
+from app.database import get_db_cursor, close_db_pool
+from ml.utils.calibration import RiskBands
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+METADATA_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'ml', 'models', 'model_metadata.joblib')
+
+def main():
+    metadata = joblib.load(METADATA_PATH)
+    bands = RiskBands.from_metadata(metadata.get('risk_bands'))
+
+    try:
+        with get_db_cursor() as cursor:
+            execute_values(
+                cursor,
+                """
+                INSERT INTO risk_bands (risk_level, min_probability)
+                VALUES %s
+                ON CONFLICT (risk_level) DO UPDATE
+                SET min_probability = EXCLUDED.min_probability, updated_at = NOW()
+                """,
+                bands.to_metadata()
+            )
+    finally:
+        close_db_pool()
+
+    for level, low in bands.to_metadata():
+        print(f"{level}: >= {low:.4f}")
+
+if __name__ == "__main__":
+    main()
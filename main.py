@@ -5,13 +5,15 @@ import logging
 
 # Import routers
 from app.routers import auth, screening, admin
-from app.database import init_db_pool, close_db_pool
+from app.database import init_db_pool, close_db_pool, breaker
+from app.degraded import pending_writes
+from app import profiling
+from app.logging_config import setup_logging
+from app.serialization import FastJSONResponse
+from app.compression import CompressionMiddleware, COMPRESSION_ENABLED
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Setup logging (queue-based, JSON; see app/logging_config.py)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # Lifespan context manager for startup/shutdown events
@@ -23,8 +25,9 @@ async def lifespan(app: FastAPI):
         init_db_pool()
         logger.info("Database connection pool initialized")
     except Exception as e:
+        # Start degraded; the circuit breaker reconnects in the background
         logger.error(f"Failed to initialize database: {e}")
-        raise
+        breaker.trip(e)
     
     yield
     
@@ -38,7 +41,8 @@ app = FastAPI(
     title="StrokeGuard API",
     description="API for stroke risk prediction with user management",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # CORS middleware
@@ -50,6 +54,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Response compression above COMPRESSION_MIN_SIZE (see app/compression.py)
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Sampling profiler (opt-in, see app/profiling.py)
+if profiling.PROFILING_ENABLED:
+    profiling.track_threadpool()
+    app.middleware("http")(profiling.profile_requests)
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(screening.router)
@@ -74,9 +87,12 @@ def read_root():
 # Health check endpoint
 @app.get("/health")
 def health_check():
+    database = breaker.status()
     return {
-        "status": "healthy",
-        "database": "connected"
+        "status": "degraded" if breaker.is_open else "healthy",
+        "database": "unavailable" if breaker.is_open else "connected",
+        "circuit_breaker": database,
+        "pending_writes": len(pending_writes)
     }
 
 if __name__ == "__main__":
@@ -86,11 +102,25 @@ if __name__ == "__main__":
     # Get port from environment variable (Railway) or default to 8000
     port = int(os.getenv("PORT", 8000))
     
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=port,
-        reload=False,  # Disable reload in production
-        log_level="info"
-    )
+    # API workers and inference workers are sized independently
+    workers = int(os.getenv("WEB_CONCURRENCY", 1))
+    inference_workers = int(os.getenv("INFERENCE_WORKERS", 0))
+    
+    inference_server = None
+    if inference_workers > 0:
+        from ml.utils.inference_server import start_inference_server
+        inference_server = start_inference_server(inference_workers)
+    
+    try:
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=port,
+            workers=workers,
+            reload=False,  # Disable reload in production
+            log_level="info"
+        )
+    finally:
+        if inference_server is not None:
+            inference_server.shutdown()
 
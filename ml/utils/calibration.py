@@ -0,0 +1,154 @@
+"""
+Probability calibration and risk bands
+
+Calibration is fitted offline (isotonic or Platt) and stored in the model
+metadata as a compact lookup table of knots:
+
+    metadata['calibration'] = {'method': 'isotonic', 'x': [...], 'y': [...]}
+
+At load time the table becomes two NumPy arrays; applying it is a piecewise
+linear interpolation (binary search over the knots), for one row or a whole
+batch. The 0/1 prediction still compares the raw score with the threshold
+tuned on raw scores (isotonic tables have flat steps, so comparing
+calibrated values could flip rows); the reported threshold is that
+threshold mapped through the table once at load time.
+
+Risk bands are the single source for the risk level:
+- the API level comes from RiskBands (metadata['risk_bands'] or RISK_BANDS)
+- the database get_risk_level() reads the risk_bands table
+  (migration 006, refreshed from the model with database/sync_risk_bands.py)
+
+Fit and store a calibration:
+    python -m ml.utils.calibration --method isotonic --data holdout.csv
+"""
+import argparse
+import bisect
+from pathlib import Path
+
+import numpy as np
+
+# (risk level, lower bound) in ascending order
+RISK_BANDS = [("Low", 0.0), ("Medium", 0.40), ("High", 0.56)]
+
+# Knots stored for a Platt (sigmoid) calibration
+PLATT_KNOTS = 101
+
+class Calibrator:
+    """Monotone lookup table raw score -> calibrated probability"""
+
+    def __init__(self, x, y, method="isotonic"):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.method = method
+
+    @classmethod
+    def from_metadata(cls, table):
+        """Calibrator from metadata['calibration'], or None when absent"""
+        if not table:
+            return None
+        return cls(table["x"], table["y"], table.get("method", "isotonic"))
+
+    def to_metadata(self):
+        return {"method": self.method, "x": self.x.tolist(), "y": self.y.tolist()}
+
+    def apply(self, probabilities):
+        """Calibrate an array of raw probabilities (clamped to the table ends)"""
+        return np.interp(probabilities, self.x, self.y)
+
+    def apply_one(self, probability):
+        return float(np.interp(probability, self.x, self.y))
+
+class RiskBands:
+    """Probability -> risk level by lower bounds"""
+
+    def __init__(self, bands=RISK_BANDS):
+        bands = sorted(((str(level), float(low)) for level, low in bands), key=lambda b: b[1])
+        self.labels = [level for level, _ in bands]
+        self.bounds = [low for _, low in bands]
+        # Lower bounds above the first one decide the band
+        self._cuts = self.bounds[1:]
+        self._labels = np.array(self.labels, dtype=object)
+        self._cut_array = np.array(self._cuts)
+
+    @classmethod
+    def from_metadata(cls, bands):
+        return cls(bands or RISK_BANDS)
+
+    def to_metadata(self):
+        return list(zip(self.labels, self.bounds))
+
+    def level(self, probability: float) -> str:
+        return self.labels[bisect.bisect_right(self._cuts, probability)]
+
+    def levels(self, probabilities) -> np.ndarray:
+        """Vectorized level() for an array of probabilities"""
+        return self._labels[np.searchsorted(self._cut_array, probabilities, side="right")]
+
+def fit_calibrator(scores, y, method="isotonic"):
+    """
+    Fit a Calibrator on raw model scores and true labels
+
+    Parameters:
+    scores (array): predict_proba(X)[:, 1] on held-out rows
+    y (array): 0/1 labels
+    method (str): 'isotonic' or 'platt'
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    if method == "isotonic":
+        from sklearn.isotonic import IsotonicRegression
+        iso = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds="clip").fit(scores, y)
+        x, values = iso.X_thresholds_, iso.y_thresholds_
+        # Extend to the full [0, 1] range so interpolation clamps correctly
+        if x[0] > 0.0:
+            x, values = np.r_[0.0, x], np.r_[values[0], values]
+        if x[-1] < 1.0:
+            x, values = np.r_[x, 1.0], np.r_[values, values[-1]]
+        return Calibrator(x, values, "isotonic")
+
+    if method == "platt":
+        from sklearn.linear_model import LogisticRegression
+        logit = np.log(np.clip(scores, 1e-6, 1 - 1e-6) / np.clip(1 - scores, 1e-6, 1))
+        platt = LogisticRegression(C=1e6).fit(logit[:, None], y)
+        x = np.linspace(0.0, 1.0, PLATT_KNOTS)
+        grid = np.log(np.clip(x, 1e-6, 1 - 1e-6) / np.clip(1 - x, 1e-6, 1))
+        return Calibrator(x, platt.predict_proba(grid[:, None])[:, 1], "platt")
+
+    raise ValueError(f"Unknown calibration method: {method}")
+
+def main():
+    import joblib
+    import pandas as pd
+
+    root = Path(__file__).parent.parent.parent
+    models = root / "ml" / "models"
+
+    parser = argparse.ArgumentParser(description="Fit a calibration table and store it with the model")
+    parser.add_argument("--method", choices=["isotonic", "platt"], default="isotonic")
+    # Required: the training CSV is what the model was fitted on, and a
+    # calibration fitted on it would be overconfident
+    parser.add_argument("--data", required=True,
+                        help="held-out labelled rows in the training column layout (not stroke_data_final.csv)")
+    args = parser.parse_args()
+    if Path(args.data).resolve() == (root / "ml" / "data" / "processed" / "stroke_data_final.csv").resolve():
+        parser.error("--data must be held-out data, not the training set")
+
+    model = joblib.load(str(models / "optimized_stroke_model.joblib"))
+    metadata_path = models / "model_metadata.joblib"
+    metadata = joblib.load(str(metadata_path))
+
+    df = pd.read_csv(args.data)
+    scores = model.predict_proba(df.drop(columns="stroke"))[:, 1]
+    calibrator = fit_calibrator(scores, df["stroke"], args.method)
+
+    metadata["calibration"] = calibrator.to_metadata()
+    metadata.setdefault("risk_bands", RISK_BANDS)
+    joblib.dump(metadata, str(metadata_path))
+
+    threshold = metadata["optimized_performance"]["optimal_threshold"]
+    print(f"{args.method} calibration with {len(calibrator.x)} knots saved to {metadata_path}")
+    print(f"Decision threshold {threshold:.4f} -> {calibrator.apply_one(threshold):.4f} (calibrated)")
+
+if __name__ == "__main__":
+    main()
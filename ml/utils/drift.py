@@ -0,0 +1,240 @@
+"""
+Online input-drift monitoring
+
+Live screening inputs are compared with the training data distribution:
+- Numeric features (age, bmi, avg_glucose_level) are counted into fixed
+  bins cut at the training deciles. PSI and KS are computed from the bin
+  counts (KS is evaluated on the bin edges, so it is a lower bound of the
+  exact statistic).
+- Categorical features are counted per category; PSI only.
+
+Memory is constant: each feature keeps one counter per bin/category for the
+current window and the previous one. Windows rotate every DRIFT_WINDOW
+recorded inputs, so reports cover the last DRIFT_WINDOW..2*DRIFT_WINDOW
+screenings. Recording one input is a handful of bisects and integer
+increments (a few microseconds) and never touches the database.
+
+The baseline is stored in the model metadata under 'drift_baseline'
+(write it with `python -m ml.utils.drift`); without it, it is built from the
+raw training CSV when the monitor is created.
+
+Counters are per process: with several API workers each reports its own
+share of the traffic.
+"""
+import bisect
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DRIFT_MONITOR_ENABLED = os.getenv("DRIFT_MONITOR_ENABLED", "true").lower() == "true"
+DRIFT_WINDOW = int(os.getenv("DRIFT_WINDOW", 5000))
+DRIFT_MIN_SAMPLES = int(os.getenv("DRIFT_MIN_SAMPLES", 100))
+DRIFT_BINS = 10
+
+# Usual PSI reading: < 0.1 stable, 0.1-0.25 moderate shift, > 0.25 drift
+PSI_MODERATE = 0.1
+PSI_DRIFT = 0.25
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+METADATA_PATH = PROJECT_ROOT / "ml" / "models" / "model_metadata.joblib"
+TRAINING_DATA_PATH = PROJECT_ROOT / "ml" / "data" / "raw" / "healthcare-dataset-stroke-data.csv"
+
+NUMERIC_FEATURES = ["age", "bmi", "avg_glucose_level"]
+CATEGORICAL_FEATURES = [
+    "gender", "hypertension", "heart_disease", "ever_married",
+    "work_type", "residence_type", "smoking_status",
+]
+
+# Values not seen in training are counted here
+OTHER = "__other__"
+
+_EPS = 1e-4
+
+def _category(value):
+    """Normalize a categorical value (bools and 0/1 become '0' / '1')"""
+    if isinstance(value, (bool, np.bool_)):
+        return str(int(value))
+    if value == "Yes" or value == "No":
+        return "1" if value == "Yes" else "0"
+    return str(value)
+
+def build_baseline(df: pd.DataFrame) -> dict:
+    """
+    Baseline distributions from raw training rows
+
+    Parameters:
+    df (pd.DataFrame): rows in the raw dataset format
+                       (healthcare-dataset-stroke-data.csv)
+    """
+    df = df.rename(columns={"Residence_type": "residence_type"})
+    baseline = {"rows": int(len(df)), "numeric": {}, "categorical": {}}
+
+    for feature in NUMERIC_FEATURES:
+        values = pd.to_numeric(df[feature], errors="coerce").dropna().to_numpy(dtype=np.float64)
+        quantiles = np.quantile(values, np.linspace(0, 1, DRIFT_BINS + 1)[1:-1])
+        edges = sorted(set(float(q) for q in quantiles))
+        counts = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+        baseline["numeric"][feature] = {
+            "edges": edges,
+            "fractions": (counts / counts.sum()).tolist(),
+        }
+
+    for feature in CATEGORICAL_FEATURES:
+        shares = df[feature].map(_category).value_counts(normalize=True)
+        baseline["categorical"][feature] = {str(k): float(v) for k, v in shares.items()}
+
+    return baseline
+
+def load_baseline() -> dict:
+    """Baseline from the model metadata, or built from the training CSV"""
+    if METADATA_PATH.exists():
+        import joblib
+        baseline = joblib.load(str(METADATA_PATH)).get("drift_baseline")
+        if baseline:
+            return baseline
+    return build_baseline(pd.read_csv(TRAINING_DATA_PATH))
+
+def psi(expected, actual) -> float:
+    """Population stability index between two fraction vectors"""
+    expected = np.maximum(np.asarray(expected, dtype=np.float64), _EPS)
+    actual = np.maximum(np.asarray(actual, dtype=np.float64), _EPS)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+def ks(expected, actual) -> float:
+    """Max CDF gap between two binned distributions on the same edges"""
+    return float(np.max(np.abs(np.cumsum(expected) - np.cumsum(actual))))
+
+def _status(value: float) -> str:
+    if value >= PSI_DRIFT:
+        return "drift"
+    if value >= PSI_MODERATE:
+        return "moderate"
+    return "stable"
+
+class DriftMonitor:
+    """Windowed streaming histograms per input feature"""
+
+    def __init__(self, baseline: dict, window: int = DRIFT_WINDOW):
+        self.baseline = baseline
+        self.window = window
+        self.lock = threading.Lock()
+
+        self.edges = {f: spec["edges"] for f, spec in baseline["numeric"].items()}
+        # Category -> slot index, with OTHER as the last slot
+        self.slots = {}
+        for feature, shares in baseline["categorical"].items():
+            names = list(shares) + [OTHER]
+            self.slots[feature] = {name: i for i, name in enumerate(names)}
+
+        self.started_at = time.time()
+        self.total = 0
+        self.previous = self._empty()
+        self.current = self._empty()
+        self.in_window = 0
+
+    def _empty(self):
+        counts = {f: [0] * (len(edges) + 1) for f, edges in self.edges.items()}
+        counts.update({f: [0] * len(slots) for f, slots in self.slots.items()})
+        return counts
+
+    def record(self, values: dict):
+        """Count one live input (raw API values); missing features are skipped"""
+        with self.lock:
+            counts = self.current
+            for feature, edges in self.edges.items():
+                value = values.get(feature)
+                if value is not None and value == value:
+                    counts[feature][bisect.bisect_right(edges, value)] += 1
+            for feature, slots in self.slots.items():
+                value = values.get(feature)
+                if value is not None:
+                    counts[feature][slots.get(_category(value), len(slots) - 1)] += 1
+
+            self.total += 1
+            self.in_window += 1
+            if self.in_window >= self.window:
+                self.previous, self.current = self.current, self._empty()
+                self.in_window = 0
+
+    def reset(self):
+        """Drop all live counts"""
+        with self.lock:
+            self.previous = self._empty()
+            self.current = self._empty()
+            self.in_window = 0
+            self.total = 0
+            self.started_at = time.time()
+
+    def report(self) -> dict:
+        """PSI / KS per feature over the current and previous window"""
+        with self.lock:
+            counts = {f: np.add(self.previous[f], self.current[f]) for f in self.current}
+            total = self.total
+
+        features = {}
+        for feature, spec in self.baseline["numeric"].items():
+            features[feature] = self._compare(counts[feature], spec["fractions"], spec["edges"])
+        for feature, shares in self.baseline["categorical"].items():
+            expected = list(shares.values()) + [0.0]
+            labels = list(shares) + [OTHER]
+            features[feature] = self._compare(counts[feature], expected, labels=labels)
+
+        return {
+            "pid": os.getpid(),
+            "started_at": self.started_at,
+            "total_recorded": total,
+            "window": self.window,
+            "baseline_rows": self.baseline.get("rows"),
+            "features": features,
+        }
+
+    @staticmethod
+    def _compare(counts, expected, edges=None, labels=None) -> dict:
+        n = int(counts.sum())
+        result = {"samples": n}
+        if n < DRIFT_MIN_SAMPLES:
+            result["status"] = "insufficient_data"
+            return result
+
+        actual = counts / n
+        result["psi"] = round(psi(expected, actual), 4)
+        result["status"] = _status(result["psi"])
+        if edges is not None:
+            result["ks"] = round(ks(expected, actual), 4)
+            result["edges"] = edges
+            result["fractions"] = [round(float(a), 4) for a in actual]
+        else:
+            result["fractions"] = {label: round(float(a), 4) for label, a in zip(labels, actual)}
+        return result
+
+_monitor = None
+_monitor_lock = threading.Lock()
+
+def get_drift_monitor():
+    """Per-process DriftMonitor, or None when disabled or the baseline is unavailable"""
+    global _monitor
+    if not DRIFT_MONITOR_ENABLED:
+        return None
+    if _monitor is None:
+        with _monitor_lock:
+            if _monitor is None:
+                _monitor = DriftMonitor(load_baseline())
+    return _monitor
+
+def save_baseline():
+    """Store the baseline built from the training CSV in the model metadata"""
+    import joblib
+    metadata = joblib.load(str(METADATA_PATH))
+    metadata["drift_baseline"] = build_baseline(pd.read_csv(TRAINING_DATA_PATH))
+    joblib.dump(metadata, str(METADATA_PATH))
+    return metadata["drift_baseline"]
+
+if __name__ == "__main__":
+    baseline = save_baseline()
+    print(f"Drift baseline from {baseline['rows']} rows saved to {METADATA_PATH}")
+    for feature, spec in baseline["numeric"].items():
+        print(f"{feature}: edges {[round(e, 2) for e in spec['edges']]}")
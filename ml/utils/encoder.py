@@ -0,0 +1,92 @@
+"""
+Feature encoder: raw screening values -> model feature vector
+
+Built once from the training column layout. Every input field and every
+category is resolved to a column position up front, so encoding a request
+is a few scalar writes into one zeroed array (no per-request dicts, no
+column-name matching). A category or column the layout does not have fails
+when the encoder is built or when the value arrives, instead of being
+zero-filled.
+
+Raw input (same names as the API / stroke_screenings columns):
+    age, bmi, avg_glucose_level (numbers)
+    hypertension, heart_disease, ever_married (bool / 0-1)
+    gender ('Male' / 'Female'), residence_type ('Urban' / 'Rural')
+    work_type, smoking_status (category strings, e.g. 'Self-employed')
+"""
+import numpy as np
+import pandas as pd
+
+from ml.utils.feature_store import WORK_TYPES, SMOKING_STATUSES
+
+# One-hot groups: input field -> categories (column = f"{field}_{category}")
+CATEGORIES = {
+    'work_type': WORK_TYPES,
+    'smoking_status': SMOKING_STATUSES,
+}
+
+# Binary columns: model column -> (input field, value encoded as 1)
+BINARY = {
+    'gender': ('gender', 'Male'),
+    'Residence_type': ('residence_type', 'Urban'),
+}
+
+NUMERIC = ['age', 'bmi', 'avg_glucose_level']
+FLAGS = ['hypertension', 'heart_disease', 'ever_married']
+ENGINEERED = ['age_health_interaction', 'bmi_glucose_risk', 'risk_factors', 'age_lifestyle_risk']
+
+class FeatureEncoder:
+    """Encode raw screening inputs into the training column order"""
+
+    def __init__(self, columns):
+        self.columns = pd.Index(columns)
+        self.size = len(self.columns)
+        index = {name: i for i, name in enumerate(self.columns)}
+
+        expected = NUMERIC + FLAGS + list(BINARY) + ENGINEERED + [
+            f"{field}_{value}" for field, values in CATEGORIES.items() for value in values
+        ]
+        missing = [name for name in expected if name not in index]
+        if missing:
+            raise ValueError(f"Model columns missing for encoder: {missing}")
+        unknown = [name for name in self.columns if name not in expected]
+        if unknown:
+            raise ValueError(f"Encoder cannot fill model columns: {unknown}")
+
+        self.numeric = [(field, index[field]) for field in NUMERIC]
+        self.flags = [(field, index[field]) for field in FLAGS]
+        self.binary = [(field, value, index[column]) for column, (field, value) in BINARY.items()]
+        self.one_hot = [
+            (field, {value: index[f"{field}_{value}"] for value in values})
+            for field, values in CATEGORIES.items()
+        ]
+        self.engineered = [index[name] for name in ENGINEERED]
+
+    def encode(self, data) -> np.ndarray:
+        """One raw input mapping -> float64 vector of length len(columns)"""
+        row = np.zeros(self.size)
+        for field, i in self.numeric:
+            row[i] = float(data[field])
+        for field, i in self.flags:
+            row[i] = 1.0 if data[field] else 0.0
+        for field, value, i in self.binary:
+            row[i] = 1.0 if data[field] == value else 0.0
+        for field, positions in self.one_hot:
+            try:
+                row[positions[data[field]]] = 1.0
+            except KeyError:
+                raise ValueError(f"Unknown {field}: {data[field]!r}")
+
+        age, bmi, glucose = row[self.numeric[0][1]], row[self.numeric[1][1]], row[self.numeric[2][1]]
+        conditions = float(data['hypertension']) + float(data['heart_disease'])
+        risk_factors = conditions + (bmi >= 25) + (glucose >= 200)
+        i_health, i_bmi_glucose, i_risk, i_lifestyle = self.engineered
+        row[i_health] = age * conditions
+        row[i_bmi_glucose] = bmi * glucose
+        row[i_risk] = risk_factors
+        row[i_lifestyle] = age * risk_factors
+        return row
+
+    def encode_frame(self, data) -> pd.DataFrame:
+        """One raw input mapping -> single-row DataFrame with model column names"""
+        return pd.DataFrame(self.encode(data)[None, :], columns=self.columns)
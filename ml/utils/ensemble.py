@@ -0,0 +1,297 @@
+"""
+Model set: the primary model plus variants (e.g. sex-specific or age-banded
+models) scored on the same prepared feature matrix
+
+Every member sees the one DataFrame the encoder / prepare_input_batch built.
+A member's gate is a cheap rule on one feature column (equals / min / max)
+evaluated as a numpy mask first; the member's predict_proba only runs on the
+rows it passes and is skipped entirely when none do, so a single-row request
+only pays for the members that apply to it.
+
+Scores are combined per row over the members that scored it:
+    mean   weighted average
+    gated  the last listed member that scored the row (specialists listed
+           after the primary model override it)
+
+Config (ENSEMBLE_CONFIG=path/to/ensemble.json), model paths relative to the
+project root; the primary model is member "primary" unless include_primary
+is false:
+
+    {"combine": "gated",
+     "members": [
+        {"name": "female", "path": "ml/models/female_model.joblib", "gate": {"column": "gender", "equals": 0}},
+        {"name": "male", "path": "ml/models/male_model.joblib", "gate": {"column": "gender", "equals": 1}},
+        {"name": "senior", "path": "ml/models/senior_model.joblib", "weight": 2.0, "gate": {"column": "age", "min": 65}}
+     ]}
+
+The calibrator / threshold stored with the primary model are applied to the
+combined score, so refit them (ml/utils/calibration.py) on the ensemble.
+
+Every row must be scored by some member. load_model_set refuses a config
+whose gates can leave a row unscored: it needs an ungated member, or gates
+on one column that together cover all its values (equals 0 and 1 on a 0/1
+column, or min / max ranges that join up from -inf to +inf).
+
+Risk drivers are explained over the whole set (ModelSetExplainer): member
+attributions are combined with the same weights / override as the scores,
+so they add up to the combined score. When a member has no explainer (or
+the units do not combine) callers fall back to rule-based risk factors.
+"""
+import os
+import json
+import time
+import threading
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+from ml.utils.encoder import FLAGS, BINARY, CATEGORIES
+from ml.utils.explain import build_explainer
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+ENSEMBLE_CONFIG = os.getenv("ENSEMBLE_CONFIG")
+
+COMBINE_MODES = ("mean", "gated")
+
+class Gate:
+    """Row filter on one feature column: equals, or min (inclusive) / max (exclusive)"""
+
+    def __init__(self, column, equals=None, min=None, max=None):
+        if equals is None and min is None and max is None:
+            raise ValueError(f"Gate on '{column}' needs equals, min or max")
+        self.column = column
+        self.equals = equals
+        self.min = min
+        self.max = max
+
+    def mask(self, df):
+        values = df[self.column].to_numpy()
+        if self.equals is not None:
+            return values == self.equals
+        mask = np.ones(len(values), dtype=bool)
+        if self.min is not None:
+            mask &= values >= self.min
+        if self.max is not None:
+            mask &= values < self.max
+        return mask
+
+    def describe(self):
+        if self.equals is not None:
+            return f"{self.column} == {self.equals}"
+        parts = []
+        if self.min is not None:
+            parts.append(f"{self.column} >= {self.min}")
+        if self.max is not None:
+            parts.append(f"{self.column} < {self.max}")
+        return " and ".join(parts)
+
+class EnsembleMember:
+    """One model in the set; gate=None scores every row"""
+
+    def __init__(self, name, model, weight=1.0, gate=None):
+        self.name = name
+        self.model = model
+        self.weight = float(weight)
+        self.gate = gate
+
+class ModelSet:
+    """Scores a feature matrix with every applicable member in one pass"""
+
+    def __init__(self, members, combine="mean", columns=None):
+        if not members:
+            raise ValueError("Model set needs at least one member")
+        if combine not in COMBINE_MODES:
+            raise ValueError(f"Unknown combine mode '{combine}' (expected one of {COMBINE_MODES})")
+        names = [member.name for member in members]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate member names: {names}")
+        if columns is not None:
+            unknown = [m.gate.column for m in members if m.gate is not None and m.gate.column not in columns]
+            if unknown:
+                raise ValueError(f"Gate columns not in the feature layout: {unknown}")
+        self.members = members
+        self.combine = combine
+        self.lock = threading.Lock()
+        self.stats = {m.name: {"calls": 0, "skipped": 0, "rows": 0, "total_ms": 0.0} for m in members}
+
+    def member_rows(self, df):
+        """
+        (member, rows, target) for every member whose gate passes some row of
+        df: rows is the slice it scores, target indexes those rows in df
+        (None for members whose gate excluded every row)
+        """
+        for member in self.members:
+            mask = member.gate.mask(df) if member.gate is not None else None
+            if mask is not None and not mask.any():
+                yield member, None, None
+            elif mask is None or mask.all():
+                yield member, df, slice(None)
+            else:
+                yield member, df[mask], mask
+
+    def predict_proba(self, df):
+        """
+        Combined positive-class scores for every row of df
+        Returns (scores, timings): timings maps member name -> ms for this
+        call, None for members whose gate excluded every row
+        """
+        n = len(df)
+        totals = np.zeros(n)
+        weights = np.zeros(n)
+        timings = {}
+        scored_rows = {}
+
+        for member, rows, target in self.member_rows(df):
+            if rows is None:
+                timings[member.name] = None
+                continue
+            start = time.perf_counter()
+            scores = member.model.predict_proba(rows)[:, 1]
+            timings[member.name] = (time.perf_counter() - start) * 1000
+            scored_rows[member.name] = len(rows)
+
+            if self.combine == "mean":
+                totals[target] += member.weight * scores
+                weights[target] += member.weight
+            else:
+                totals[target] = scores
+                weights[target] = 1.0
+
+        if not weights.all():
+            # Unreachable for sets from load_model_set (coverage is checked there)
+            raise ValueError("No model set member scored some rows (add an ungated member)")
+        self._record(timings, scored_rows)
+        return totals / weights, timings
+
+    def _record(self, timings, scored_rows):
+        with self.lock:
+            for name, ms in timings.items():
+                stats = self.stats[name]
+                stats["calls"] += 1
+                if ms is None:
+                    stats["skipped"] += 1
+                else:
+                    stats["total_ms"] += ms
+                    stats["rows"] += scored_rows[name]
+
+    def get_stats(self):
+        """Per member: calls, skipped calls, rows scored, mean ms per scored call"""
+        with self.lock:
+            result = {}
+            for member in self.members:
+                stats = dict(self.stats[member.name])
+                scored = stats["calls"] - stats["skipped"]
+                stats["mean_ms"] = round(stats["total_ms"] / scored, 3) if scored else None
+                stats["total_ms"] = round(stats["total_ms"], 3)
+                stats["gate"] = member.gate.describe() if member.gate is not None else None
+                result[member.name] = stats
+        return result
+
+class ModelSetExplainer:
+    """
+    Attributions for the combined score: each member's explainer runs on the
+    rows that member scored, combined like ModelSet.predict_proba. Same
+    interface as ml.utils.explain.Explainer
+    """
+
+    def __init__(self, model_set, explainers):
+        self.model_set = model_set
+        self.explainers = {member.name: explainer for member, explainer in zip(model_set.members, explainers)}
+        self.primary = explainers[0]
+
+    @property
+    def units(self):
+        return self.primary.units
+
+    def explain(self, X):
+        n = len(X)
+        contributions = np.zeros((n, len(self.primary.feature_names)))
+        bias = np.zeros(n)
+        weights = np.zeros(n)
+        for member, rows, target in self.model_set.member_rows(X):
+            if rows is None:
+                continue
+            member_contributions, member_bias = self.explainers[member.name].explain(rows)
+            if self.model_set.combine == "mean":
+                contributions[target] += member.weight * member_contributions
+                bias[target] += member.weight * member_bias
+                weights[target] += member.weight
+            else:
+                contributions[target] = member_contributions
+                bias[target] = member_bias
+                weights[target] = 1.0
+        return contributions / weights[:, None], bias / weights
+
+    def top_drivers(self, contributions, k=5):
+        return self.primary.top_drivers(contributions, k)
+
+def build_model_set_explainer(model_set, columns, background=None):
+    """
+    ModelSetExplainer, or None when some member cannot be explained or the
+    attributions would not add up to the combined score (a weighted mean of
+    probabilities is not a mean of log-odds)
+    """
+    explainers = [build_explainer(member.model, columns, background=background) for member in model_set.members]
+    if any(explainer is None for explainer in explainers):
+        return None
+    units = {explainer.units for explainer in explainers}
+    if len(units) > 1 or (model_set.combine == "mean" and units != {"probability"}):
+        return None
+    return ModelSetExplainer(model_set, explainers)
+
+def _binary_columns(columns):
+    """Model columns the encoder only ever fills with 0 / 1"""
+    prefixes = tuple(f"{field}_" for field in CATEGORIES)
+    return {c for c in columns if c in FLAGS or c in BINARY or c.startswith(prefixes)}
+
+def _column_covered(gates, binary):
+    """Whether gates on one column pass every value it can take"""
+    if binary and {0, 1} <= {gate.equals for gate in gates if gate.equals is not None}:
+        return True
+    ranges = sorted(
+        ((gate.min, gate.max) for gate in gates if gate.equals is None),
+        key=lambda r: -np.inf if r[0] is None else r[0]
+    )
+    reached = -np.inf
+    for low, high in ranges:
+        if (-np.inf if low is None else low) > reached:
+            return False
+        reached = max(reached, np.inf if high is None else high)
+    return reached == np.inf
+
+def check_coverage(members, columns):
+    """Raise ValueError when the members' gates can leave a row unscored"""
+    if any(member.gate is None for member in members):
+        return
+    by_column = {}
+    for member in members:
+        by_column.setdefault(member.gate.column, []).append(member.gate)
+    binary = _binary_columns(columns)
+    if not any(_column_covered(gates, column in binary) for column, gates in by_column.items()):
+        gates = ", ".join(member.gate.describe() for member in members)
+        raise ValueError(f"Model set gates do not cover every row ({gates}); add an ungated member")
+
+def load_model_set(primary_model, columns, config_path=ENSEMBLE_CONFIG):
+    """ModelSet from an ENSEMBLE_CONFIG file, or None when not configured"""
+    if not config_path:
+        return None
+    with open(config_path, encoding="utf-8") as f:
+        config = json.load(f)
+
+    members = []
+    if config.get("include_primary", True):
+        members.append(EnsembleMember("primary", primary_model, weight=config.get("primary_weight", 1.0)))
+    for spec in config.get("members", []):
+        path = Path(spec["path"])
+        if not path.is_absolute():
+            path = PROJECT_ROOT / path
+        gate = Gate(**spec["gate"]) if spec.get("gate") else None
+        members.append(EnsembleMember(
+            spec.get("name", path.stem), joblib.load(str(path)),
+            weight=spec.get("weight", 1.0), gate=gate
+        ))
+    model_set = ModelSet(members, combine=config.get("combine", "mean"), columns=list(columns))
+    check_coverage(model_set.members, list(columns))
+    return model_set
@@ -0,0 +1,263 @@
+"""
+Per-prediction feature attributions
+
+Contributions are computed from the fitted model's own structure, so they
+sum (with a bias term) to the model output:
+- Tree ensembles (RandomForest / ExtraTrees / DecisionTree / GradientBoosting):
+  path contributions (Saabas). All trees are compiled once into padded NumPy
+  arrays and traversed level by level for every row and every tree at once,
+  so cost grows with tree depth, not with the number of trees.
+- Linear models (LogisticRegression etc.): coef * (x - training mean), in
+  log-odds.
+- XGBoost / LightGBM: their native exact contribution APIs.
+
+A Pipeline is unwrapped when its preprocessing keeps one column per feature
+(e.g. a scaler). Unsupported models yield no explainer and callers fall back
+to rule-based risk factors.
+"""
+import numpy as np
+import pandas as pd
+
+# Readable labels for model columns (used for stored risk drivers)
+FEATURE_LABELS = {
+    'gender': 'Gender',
+    'age': 'Age',
+    'hypertension': 'Hypertension',
+    'heart_disease': 'Heart Disease',
+    'ever_married': 'Marital Status',
+    'Residence_type': 'Residence Type',
+    'avg_glucose_level': 'Glucose Level',
+    'bmi': 'BMI',
+    'work_type_Govt_job': 'Work Type',
+    'work_type_Never_worked': 'Work Type',
+    'work_type_Private': 'Work Type',
+    'work_type_Self-employed': 'Work Type',
+    'work_type_children': 'Work Type',
+    'smoking_status_Unknown': 'Smoking Status',
+    'smoking_status_formerly smoked': 'Smoking Status',
+    'smoking_status_never smoked': 'Smoking Status',
+    'smoking_status_smokes': 'Smoking Status',
+    'risk_factors': 'Combined Risk Factors',
+    'age_health_interaction': 'Age with Heart/Blood Pressure Conditions',
+    'bmi_glucose_risk': 'BMI with Glucose Level',
+    'age_lifestyle_risk': 'Age with Risk Factors',
+}
+
+# Labels that are model inputs but not risk factors: never reported as risk
+# drivers (stored with the screening and shown to the patient), although
+# their contributions are still computed
+DEMOGRAPHIC_LABELS = {'Gender', 'Marital Status', 'Work Type', 'Residence Type'}
+
+class TreeEnsembleExplainer:
+    """Vectorized path contributions for sklearn tree ensembles"""
+
+    def __init__(self, trees, scale, output):
+        """
+        trees: list of sklearn Tree objects (tree_)
+        scale: multiplier per tree (1/n for forests, learning_rate for boosting)
+        output: 'proba' (classifier trees, class 1 probability) or 'raw'
+        """
+        n_trees = len(trees)
+        max_nodes = max(t.node_count for t in trees)
+        self.max_depth = max(t.max_depth for t in trees)
+
+        # Padded arrays: (n_trees, max_nodes)
+        self.feature = np.zeros((n_trees, max_nodes), dtype=np.intp)
+        self.threshold = np.zeros((n_trees, max_nodes))
+        self.left = np.full((n_trees, max_nodes), -1, dtype=np.intp)
+        self.right = np.full((n_trees, max_nodes), -1, dtype=np.intp)
+        self.value = np.zeros((n_trees, max_nodes))
+
+        for i, tree in enumerate(trees):
+            n = tree.node_count
+            self.feature[i, :n] = np.maximum(tree.feature, 0)
+            self.threshold[i, :n] = tree.threshold
+            self.left[i, :n] = tree.children_left
+            self.right[i, :n] = tree.children_right
+            values = tree.value[:, 0, :]
+            if output == 'proba':
+                # Works for both count and fraction encoded node values
+                self.value[i, :n] = values[:, 1] / values.sum(axis=1)
+            else:
+                self.value[i, :n] = values[:, 0]
+
+        self.scale = np.asarray(scale, dtype=np.float64).reshape(n_trees)
+        self.tree_index = np.arange(n_trees)
+        self.units = 'probability' if output == 'proba' else 'log-odds'
+
+    def contributions(self, X):
+        """Return (contributions (n_rows, n_features), bias (n_rows,))"""
+        # sklearn compares float32 feature values against thresholds
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        n_rows, n_features = X.shape
+        n_trees = len(self.tree_index)
+
+        node = np.zeros((n_rows, n_trees), dtype=np.intp)
+        contrib = np.zeros((n_rows, n_features))
+        rows = np.arange(n_rows)[:, None]
+        trees = self.tree_index[None, :]
+        weighted = self.value * self.scale[:, None]
+
+        for _ in range(self.max_depth):
+            left = self.left[trees, node]
+            active = left != -1
+            if not active.any():
+                break
+            feature = self.feature[trees, node]
+            go_left = X[rows, feature] <= self.threshold[trees, node]
+            child = np.where(go_left, left, self.right[trees, node])
+            child = np.where(active, child, node)
+            delta = weighted[trees, child] - weighted[trees, node]
+            np.add.at(contrib, (np.broadcast_to(rows, feature.shape)[active], feature[active]), delta[active])
+            node = child
+
+        bias = np.full(n_rows, weighted[:, 0].sum())
+        return contrib, bias
+
+class LinearExplainer:
+    """coef * (x - mean) contributions in log-odds"""
+
+    units = 'log-odds'
+
+    def __init__(self, coef, intercept, mean):
+        self.coef = np.asarray(coef, dtype=np.float64).ravel()
+        self.mean = np.asarray(mean, dtype=np.float64).ravel()
+        self.base = float(np.ravel(intercept)[0]) + float(self.coef @ self.mean)
+
+    def contributions(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        contrib = (X - self.mean) * self.coef
+        return contrib, np.full(X.shape[0], self.base)
+
+class NativeExplainer:
+    """XGBoost / LightGBM built-in exact contributions (last column = bias)"""
+
+    units = 'log-odds'
+
+    def __init__(self, model):
+        self.model = model
+
+    def contributions(self, X):
+        if hasattr(self.model, 'get_booster'):
+            import xgboost
+            values = self.model.get_booster().predict(xgboost.DMatrix(np.asarray(X)), pred_contribs=True)
+        else:
+            values = self.model.predict(np.asarray(X), pred_contrib=True)
+        values = np.asarray(values, dtype=np.float64)
+        return values[:, :-1], values[:, -1]
+
+class Explainer:
+    """Model explainer with optional preprocessing in front"""
+
+    def __init__(self, engine, feature_names, transform=None):
+        self.engine = engine
+        self.feature_names = list(feature_names)
+        self.transform = transform
+
+        # (n_features, n_labels) 0/1 matrix grouping columns under one label
+        labels = [FEATURE_LABELS.get(name, name) for name in self.feature_names]
+        self.labels = list(dict.fromkeys(labels))
+        self.label_matrix = np.zeros((len(labels), len(self.labels)))
+        for i, label in enumerate(labels):
+            self.label_matrix[i, self.labels.index(label)] = 1.0
+        self.driver_labels = np.array([label not in DEMOGRAPHIC_LABELS for label in self.labels])
+
+    @property
+    def units(self):
+        """'probability' or 'log-odds': what contributions + bias add up to"""
+        return self.engine.units
+
+    def explain(self, X):
+        """
+        Contributions for rows of X (DataFrame in model column order)
+        Returns (contributions (n_rows, n_features), bias (n_rows,))
+        """
+        if self.transform is not None:
+            X = self.transform(X)
+        elif isinstance(X, pd.DataFrame):
+            X = X.to_numpy(dtype=np.float64)
+        return self.engine.contributions(X)
+
+    def top_drivers(self, contributions, k=5):
+        """
+        Readable labels of the features pushing risk up the most, per row
+        Contributions of one-hot columns are summed under their shared label;
+        DEMOGRAPHIC_LABELS are left out
+        """
+        contributions = np.atleast_2d(contributions)
+        grouped = (contributions @ self.label_matrix)[:, self.driver_labels]
+        unique_labels = [label for label, keep in zip(self.labels, self.driver_labels) if keep]
+
+        drivers = []
+        for row in grouped:
+            order = np.argsort(-row)[:k]
+            drivers.append([unique_labels[i] for i in order if row[i] > 0])
+        return drivers
+
+def _engine_for(estimator, background_mean):
+    """Build the contribution engine for a fitted estimator, or None"""
+    name = type(estimator).__name__
+
+    if hasattr(estimator, 'get_booster') or hasattr(estimator, 'booster_'):
+        return NativeExplainer(estimator)
+
+    if hasattr(estimator, 'tree_') and hasattr(estimator, 'predict_proba'):
+        return TreeEnsembleExplainer([estimator.tree_], [1.0], 'proba')
+
+    estimators = getattr(estimator, 'estimators_', None)
+    if name in ('RandomForestClassifier', 'ExtraTreesClassifier') and estimators:
+        trees = [e.tree_ for e in estimators]
+        return TreeEnsembleExplainer(trees, [1.0 / len(trees)] * len(trees), 'proba')
+
+    if name == 'GradientBoostingClassifier' and estimators is not None and estimators.shape[1] == 1:
+        trees = [e.tree_ for e in estimators[:, 0]]
+        engine = TreeEnsembleExplainer(trees, [estimator.learning_rate] * len(trees), 'raw')
+        # Output = init estimator log-odds + sum of scaled tree outputs
+        init = estimator._raw_predict_init(np.zeros((1, estimator.n_features_in_), dtype=np.float32))
+        return _BiasShift(engine, float(init[0, 0]))
+
+    if hasattr(estimator, 'coef_') and np.asarray(estimator.coef_).shape[0] == 1 and background_mean is not None:
+        return LinearExplainer(estimator.coef_, estimator.intercept_, background_mean)
+
+    return None
+
+class _BiasShift:
+    """Add a constant to an engine's bias"""
+
+    def __init__(self, engine, shift):
+        self.engine = engine
+        self.shift = shift
+        self.units = engine.units
+
+    def contributions(self, X):
+        contrib, bias = self.engine.contributions(X)
+        return contrib, bias + self.shift
+
+def build_explainer(model, feature_names, background=None):
+    """
+    Build an Explainer for model, or None if its structure is not supported
+
+    Parameters:
+    model: fitted estimator or sklearn Pipeline
+    feature_names (list): model input columns, in order
+    background (pd.DataFrame): training rows (for linear baselines)
+    """
+    transform = None
+    estimator = model
+
+    if hasattr(model, 'steps'):
+        preprocess, estimator = model[:-1], model[-1]
+        probe = background[feature_names].head(1) if background is not None else None
+        if probe is None or preprocess.transform(probe).shape[1] != len(feature_names):
+            return None
+        transform = lambda X: np.asarray(preprocess.transform(X), dtype=np.float64)
+
+    background_mean = None
+    if background is not None:
+        frame = background[feature_names]
+        background_mean = transform(frame).mean(axis=0) if transform else frame.to_numpy(dtype=np.float64).mean(axis=0)
+
+    engine = _engine_for(estimator, background_mean)
+    if engine is None:
+        return None
+    return Explainer(engine, feature_names, transform)
@@ -0,0 +1,126 @@
+"""
+Feature store: engineered feature matrices cached as memory-mapped .npy files
+
+Matrices are keyed by a hash of the source CSV bytes plus
+FEATURE_TRANSFORM_VERSION, so any change to the data or to the transform
+logic produces a new entry. Later runs load X / y with np.load(mmap_mode='r')
+(zero-copy) instead of re-parsing CSV text.
+
+Usage:
+    from ml.utils.feature_store import load_features
+    X, y, columns = load_features('processed')
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ml.utils.preprocessing import create_features_batch
+
+# Bump whenever the engineered feature logic below changes
+FEATURE_TRANSFORM_VERSION = "1"
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DATA_DIR = PROJECT_ROOT / "ml" / "data"
+CACHE_DIR = Path(os.getenv("FEATURE_CACHE_DIR", DATA_DIR / "features"))
+
+SOURCES = {
+    "raw": DATA_DIR / "raw" / "healthcare-dataset-stroke-data.csv",
+    "processed": DATA_DIR / "processed" / "stroke_data_final.csv",
+}
+
+TARGET_COLUMN = "stroke"
+
+WORK_TYPES = ["Govt_job", "Never_worked", "Private", "Self-employed", "children"]
+SMOKING_STATUSES = ["Unknown", "formerly smoked", "never smoked", "smokes"]
+
+def source_fingerprint(path):
+    """SHA-256 of source file contents plus transform version"""
+    digest = hashlib.sha256()
+    digest.update(FEATURE_TRANSFORM_VERSION.encode())
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+def training_columns():
+    """Feature column order used for training (header of the processed CSV)"""
+    header = pd.read_csv(SOURCES["processed"], nrows=0).columns
+    return [c for c in header if c != TARGET_COLUMN]
+
+def encode_raw(df):
+    """
+    Encode the raw Kaggle CSV into the training column layout (unscaled)
+    Rows with gender 'Other' are dropped, missing BMI is filled with the median
+    """
+    df = df[df["gender"].isin(["Male", "Female"])].copy()
+    bmi = pd.to_numeric(df["bmi"], errors="coerce")
+    df["bmi"] = bmi.fillna(bmi.median())
+    df["gender"] = (df["gender"] == "Male").astype(np.int8)
+    df["ever_married"] = (df["ever_married"] == "Yes").astype(np.int8)
+    df["Residence_type"] = (df["Residence_type"] == "Urban").astype(np.int8)
+
+    for value in WORK_TYPES:
+        df[f"work_type_{value}"] = (df["work_type"] == value).astype(np.int8)
+    for value in SMOKING_STATUSES:
+        df[f"smoking_status_{value}"] = (df["smoking_status"] == value).astype(np.int8)
+
+    return create_features_batch(df.drop(columns=["id", "work_type", "smoking_status"]))
+
+def build_features(source):
+    """Parse a source CSV once and return (X, y, columns)"""
+    columns = training_columns()
+    df = pd.read_csv(SOURCES[source])
+    if source == "raw":
+        df = encode_raw(df)
+
+    X = np.ascontiguousarray(df[columns].to_numpy(dtype=np.float64))
+    y = df[TARGET_COLUMN].to_numpy(dtype=np.int8)
+    return X, y, columns
+
+def cache_path(source):
+    """Cache directory for the current contents of a source"""
+    return CACHE_DIR / f"{source}-{source_fingerprint(SOURCES[source])}"
+
+def load_features(source="processed", rebuild=False):
+    """
+    Load (X, y, columns) for a source, building the cache if needed
+    X and y are read-only memory maps when served from cache
+    """
+    if source not in SOURCES:
+        raise ValueError(f"Unknown feature source: {source}")
+
+    path = cache_path(source)
+    meta_file = path / "meta.json"
+
+    if rebuild or not meta_file.exists():
+        X, y, columns = build_features(source)
+        path.mkdir(parents=True, exist_ok=True)
+        # Write data first; meta.json marks the entry as complete
+        np.save(path / "X.npy", X)
+        np.save(path / "y.npy", y)
+        tmp_meta = path / "meta.json.tmp"
+        with open(tmp_meta, "w") as f:
+            json.dump({
+                "source": source,
+                "transform_version": FEATURE_TRANSFORM_VERSION,
+                "columns": columns,
+                "rows": int(X.shape[0]),
+            }, f, indent=2)
+        os.replace(tmp_meta, meta_file)
+
+    with open(meta_file) as f:
+        meta = json.load(f)
+
+    X = np.load(path / "X.npy", mmap_mode="r")
+    y = np.load(path / "y.npy", mmap_mode="r")
+    return X, y, meta["columns"]
+
+# Build caches from the command line
+if __name__ == "__main__":
+    for name in SOURCES:
+        X, y, columns = load_features(name, rebuild=True)
+        print(f"{name}: {X.shape[0]} rows x {X.shape[1]} features -> {cache_path(name)}")
@@ -0,0 +1,129 @@
+"""
+Multi-process inference server
+
+A separate pool of processes owns the StrokePredictor instances, so API
+concurrency (uvicorn workers) and inference parallelism (INFERENCE_WORKERS)
+can be sized independently and the model is loaded once per inference
+process instead of once per API worker.
+
+The server is a multiprocessing manager listening on localhost. API workers
+connect with InferenceClient, send the prepared feature dict and get the
+prediction back; each connection is served on its own thread and dispatched
+to a ProcessPoolExecutor.
+
+Usage:
+    server = start_inference_server(workers=4)   # in main.py, before uvicorn
+    client = get_inference_client()              # in each API worker
+    result = client.predict(ml_input)
+"""
+import os
+import secrets
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.managers import BaseManager
+
+logger = logging.getLogger(__name__)
+
+ADDRESS_ENV = "INFERENCE_SERVER_ADDRESS"
+AUTHKEY_ENV = "INFERENCE_SERVER_AUTHKEY"
+
+# Predictor owned by each inference worker process
+_worker_predictor = None
+
+# Pool owned by the manager server process
+_server_pool = None
+
+def _init_worker():
+    """Load the model once per inference process"""
+    global _worker_predictor
+    from ml.utils.prediction import StrokePredictor
+    _worker_predictor = StrokePredictor()
+
+def _worker_ready():
+    return _worker_predictor is not None
+
+def _predict_in_worker(data_dict):
+    return _worker_predictor.make_prediction(data_dict)
+
+def _predict_batch_in_worker(data):
+    result = _worker_predictor.predict_batch(data)
+    return {
+        "probabilities": result["probabilities"].tolist(),
+        "predictions": result["predictions"].tolist(),
+        "valid": result["valid"].tolist(),
+        "threshold": result["threshold"],
+        "model_timings": result["model_timings"],
+    }
+
+class InferencePool:
+    """Process pool of StrokePredictor workers (lives in the server process)"""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        # Start every worker and load the model before serving traffic
+        ready = [self.executor.submit(_worker_ready) for _ in range(workers)]
+        for future in ready:
+            future.result()
+
+    def predict(self, data_dict: dict) -> dict:
+        return self.executor.submit(_predict_in_worker, data_dict).result()
+
+    def predict_batch(self, data) -> dict:
+        return self.executor.submit(_predict_batch_in_worker, data).result()
+
+    def ping(self) -> int:
+        return self.workers
+
+def _init_server(workers: int):
+    global _server_pool
+    _server_pool = InferencePool(workers)
+
+def _get_pool():
+    return _server_pool
+
+class InferenceManager(BaseManager):
+    pass
+
+InferenceManager.register("get_pool", callable=_get_pool)
+
+def start_inference_server(workers: int, host: str = "127.0.0.1", port: int = 0) -> InferenceManager:
+    """
+    Start the inference server in a child process
+    Exports its address and auth key through the environment so that API
+    worker processes started afterwards can connect
+    """
+    authkey = os.getenv(AUTHKEY_ENV) or secrets.token_hex(16)
+    manager = InferenceManager(address=(host, port), authkey=authkey.encode())
+    manager.start(initializer=_init_server, initargs=(workers,))
+
+    bound_host, bound_port = manager.address
+    os.environ[ADDRESS_ENV] = f"{bound_host}:{bound_port}"
+    os.environ[AUTHKEY_ENV] = authkey
+
+    logger.info(f"Inference server started with {workers} workers on {bound_host}:{bound_port}")
+    return manager
+
+class InferenceClient:
+    """Connection from an API worker to the inference server"""
+
+    def __init__(self, address: str, authkey: str):
+        host, port = address.rsplit(":", 1)
+        self.address = address
+        self.manager = InferenceManager(address=(host, int(port)), authkey=authkey.encode())
+        self.manager.connect()
+        # Proxies open one connection per calling thread, so this is thread-safe
+        self.pool = self.manager.get_pool()
+
+    def predict(self, data_dict: dict) -> dict:
+        return self.pool.predict(data_dict)
+
+    def predict_batch(self, data) -> dict:
+        return self.pool.predict_batch(data)
+
+def get_inference_client():
+    """Client for the configured inference server, or None to predict in-process"""
+    address = os.getenv(ADDRESS_ENV)
+    if not address:
+        return None
+    return InferenceClient(address, os.getenv(AUTHKEY_ENV, ""))
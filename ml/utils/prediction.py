@@ -7,14 +7,33 @@ import sys
 
 # Import dengan absolute path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-from ml.utils.preprocessing import prepare_input_data, validate_input
+from ml.utils.preprocessing import validate_input, prepare_input_batch, validate_input_batch
+from ml.utils.encoder import FeatureEncoder
+from ml.utils.calibration import Calibrator, RiskBands
+from ml.utils.explain import build_explainer
+from ml.utils.shadow import load_shadow
+from ml.utils.ensemble import load_model_set, build_model_set_explainer
+import time
 
 class StrokePredictor:
-    def __init__(self):
+    def __init__(self, models_dir=None):
+        """
+        Parameters:
+        models_dir (str | Path): Folder berisi optimized_stroke_model.joblib dan
+                                 model_metadata.joblib (default: ml/models)
+        """
+        self.models_dir = models_dir
         self.model = None
         self.metadata = None
         self.expected_columns = None
         self.optimal_threshold = None
+        self.calibrator = None
+        self.risk_bands = RiskBands()
+        self.threshold = None
+        self.encoder = None
+        self.explainer = None
+        self.shadow = None
+        self.model_set = None
         self._load_model()
 
     def _load_model(self):
@@ -25,8 +44,9 @@ class StrokePredictor:
             project_root = current_file.parent.parent.parent
 
             # Define paths
-            model_path = project_root / "ml" / "models" / "optimized_stroke_model.joblib"
-            metadata_path = project_root / "ml" / "models" / "model_metadata.joblib"
+            models_dir = Path(self.models_dir) if self.models_dir else project_root / "ml" / "models"
+            model_path = models_dir / "optimized_stroke_model.joblib"
+            metadata_path = models_dir / "model_metadata.joblib"
             data_path = project_root / "ml" / "data" / "processed" / "stroke_data_final.csv"
 
             print(f"Loading model from: {model_path}")
@@ -49,18 +69,69 @@ class StrokePredictor:
             # Set variables
             self.expected_columns = original_data.drop('stroke', axis=1).columns.tolist()
             self.optimal_threshold = self.metadata['optimized_performance']['optimal_threshold']
+            self.encoder = FeatureEncoder(self.expected_columns)
+
+            # Kalibrasi + risk bands yang disimpan bersama model (lihat ml/utils/calibration.py)
+            self.calibrator = Calibrator.from_metadata(self.metadata.get('calibration'))
+            self.risk_bands = RiskBands.from_metadata(self.metadata.get('risk_bands'))
+            self.threshold = (
+                self.calibrator.apply_one(self.optimal_threshold)
+                if self.calibrator is not None else float(self.optimal_threshold)
+            )
+
+            # Feature attributions from the model structure (None if unsupported)
+            try:
+                self.explainer = build_explainer(self.model, self.expected_columns, background=original_data)
+            except Exception as e:
+                print(f"Feature attributions unavailable: {e}")
+                self.explainer = None
+
+            # Ensemble (ENSEMBLE_CONFIG): model utama + varian, dinilai bersama
+            self.model_set = load_model_set(self.model, self.expected_columns)
+            if self.model_set is not None:
+                print(f"Model set enabled: {[m.name for m in self.model_set.members]} ({self.model_set.combine})")
+                # Risk drivers harus menjelaskan skor gabungan, bukan model utama saja
+                try:
+                    self.explainer = build_model_set_explainer(self.model_set, self.expected_columns, background=original_data)
+                except Exception as e:
+                    print(f"Model set attributions unavailable: {e}")
+                    self.explainer = None
+                if self.explainer is None:
+                    print("Model set cannot be explained as a whole, using rule-based risk factors")
+
+            # Kandidat model (shadow) dinilai di background, tidak ikut respons
+            try:
+                self.shadow = load_shadow(self.optimal_threshold)
+                if self.shadow is not None:
+                    print(f"Shadow model enabled: {self.shadow.name}")
+            except Exception as e:
+                print(f"Shadow model unavailable: {e}")
+                self.shadow = None
 
             print("Model and data loaded successfully")
 
         except Exception as e:
             raise Exception(f"Error loading model and data: {str(e)}")
 
+    def _score(self, df):
+        """
+        Skor kelas positif untuk semua baris df
+        Returns (scores, timings): timings = ms per anggota model set
+        (None jika dilewati gate); tanpa ENSEMBLE_CONFIG hanya 'primary'
+        """
+        if self.model_set is not None:
+            return self.model_set.predict_proba(df)
+        start = time.perf_counter()
+        scores = self.model.predict_proba(df)[:, 1]
+        return scores, {"primary": (time.perf_counter() - start) * 1000}
+
     def make_prediction(self, data_dict):
         """
         Melakukan prediksi stroke
         
         Parameters:
-        data_dict (dict): Dictionary berisi data input user
+        data_dict (dict): Input mentah user (lihat ml/utils/encoder.py), mis.
+                          work_type 'Self-employed', smoking_status 'never smoked'
         
         Returns:
         dict: Hasil prediksi dengan probability dan risk factors
@@ -71,26 +142,32 @@ class StrokePredictor:
             if not is_valid:
                 raise ValueError(error_message)
 
-            # Prepare input data
-            df = prepare_input_data(data_dict, self.expected_columns)
+            # Encode ke layout kolom training
+            df = self.encoder.encode_frame(data_dict)
             
             # Prediksi
-            probability = self.model.predict_proba(df)[0, 1]
-            prediction = 1 if probability >= self.optimal_threshold else 0
+            scores, model_timings = self._score(df)
+            score = scores[0]
+            primary_ms = sum(ms for ms in model_timings.values() if ms is not None)
+            prediction = 1 if score >= self.optimal_threshold else 0
+            probability = self.calibrator.apply_one(score) if self.calibrator is not None else score
             
-            # Hitung risk factors
-            risk_factors = []
-            if int(data_dict['hypertension']) == 1:
-                risk_factors.append("Hypertension")
-            if int(data_dict['heart_disease']) == 1:
-                risk_factors.append("Heart Disease")
-            if float(data_dict['bmi']) >= 25:
-                risk_factors.append("High BMI")
-            if float(data_dict['avg_glucose_level']) >= 200:
-                risk_factors.append("High Glucose Level")
-            if float(data_dict['age']) >= 65:
-                risk_factors.append("Advanced Age")
+            if self.shadow is not None:
+                self.shadow.submit(df, [score], [prediction], primary_ms)
             
+            # Risk drivers dari kontribusi fitur model (fallback: aturan ambang)
+            feature_contributions = None
+            if self.explainer is not None:
+                contributions, _ = self.explainer.explain(df)
+                risk_factors = self.explainer.top_drivers(contributions)[0]
+                feature_contributions = {
+                    name: float(value)
+                    for name, value in zip(self.expected_columns, contributions[0])
+                    if value != 0
+                }
+            else:
+                risk_factors = self._rule_based_risk_factors(data_dict)
+
             # Determine confidence level
             confidence_margin = abs(probability - 0.5)
             if confidence_margin > 0.3:
@@ -103,14 +180,82 @@ class StrokePredictor:
             return {
                 "prediction": int(prediction),
                 "probability": float(probability),
+                "risk_level": self.risk_bands.level(probability),
                 "risk_factors": risk_factors,
                 "confidence": confidence,
-                "threshold": float(self.optimal_threshold)
+                "threshold": float(self.threshold),
+                "feature_contributions": feature_contributions,
+                "model_timings": model_timings
             }
 
         except Exception as e:
             raise Exception(f"Error during prediction: {str(e)}")
 
+    @staticmethod
+    def _rule_based_risk_factors(data_dict):
+        """Risk factors dari ambang klinis (dipakai jika model tidak bisa dijelaskan)"""
+        risk_factors = []
+        if int(data_dict['hypertension']) == 1:
+            risk_factors.append("Hypertension")
+        if int(data_dict['heart_disease']) == 1:
+            risk_factors.append("Heart Disease")
+        if float(data_dict['bmi']) >= 25:
+            risk_factors.append("High BMI")
+        if float(data_dict['avg_glucose_level']) >= 200:
+            risk_factors.append("High Glucose Level")
+        if float(data_dict['age']) >= 65:
+            risk_factors.append("Advanced Age")
+        return risk_factors
+
+    def predict_batch(self, data, explain=False):
+        """
+        Prediksi stroke untuk banyak baris sekaligus (vectorized)
+        
+        Parameters:
+        data (pd.DataFrame | dict): Data kolom dalam layout training (expected_columns, one-hot)
+        explain (bool): Sertakan kontribusi fitur dan risk drivers per baris
+        
+        Returns:
+        dict: probabilities (terkalibrasi), predictions dan risk_levels
+              (NaN / -1 / None untuk baris tidak valid), mask validasi per baris,
+              serta model_timings (ms per anggota model set untuk batch ini)
+        """
+        df = prepare_input_batch(data, self.expected_columns)
+        # Nilai non-numerik sudah menjadi NaN; baris dengan NaN tidak diskor
+        valid = validate_input_batch(data) & ~df.isna().any(axis=1).to_numpy()
+        
+        probabilities = np.full(len(df), np.nan)
+        predictions = np.full(len(df), -1, dtype=np.int8)
+        risk_levels = np.full(len(df), None, dtype=object)
+        model_timings = {}
+        if valid.any():
+            scores, model_timings = self._score(df[valid])
+            primary_ms = sum(ms for ms in model_timings.values() if ms is not None) / int(valid.sum())
+            predictions[valid] = scores >= self.optimal_threshold
+            probabilities[valid] = self.calibrator.apply(scores) if self.calibrator is not None else scores
+            risk_levels[valid] = self.risk_bands.levels(probabilities[valid])
+            
+            if self.shadow is not None:
+                self.shadow.submit(df[valid], scores, predictions[valid], primary_ms)
+        
+        result = {
+            "probabilities": probabilities,
+            "predictions": predictions,
+            "risk_levels": risk_levels,
+            "valid": valid,
+            "threshold": float(self.threshold),
+            "model_timings": model_timings
+        }
+        
+        if explain and self.explainer is not None:
+            contributions = np.zeros((len(df), len(self.expected_columns)))
+            if valid.any():
+                contributions[valid], _ = self.explainer.explain(df[valid])
+            result["contributions"] = contributions
+            result["risk_drivers"] = self.explainer.top_drivers(contributions)
+        
+        return result
+
 # Test code
 if __name__ == "__main__":
     try:
@@ -120,22 +265,15 @@ if __name__ == "__main__":
         # Test prediction with sample data
         sample_data = {
             'age': 50,
-            'gender': 1,
-            'hypertension': 0,
-            'heart_disease': 0,
-            'ever_married': 1,
-            'Residence_type': 1,
+            'gender': 'Male',
+            'hypertension': False,
+            'heart_disease': False,
+            'ever_married': True,
+            'work_type': 'Private',
+            'residence_type': 'Urban',
             'avg_glucose_level': 100,
             'bmi': 25,
-            'work_type_Govt_job': 0,
-            'work_type_Never_worked': 0,
-            'work_type_Private': 1,
-            'work_type_Self-employed': 0,
-            'work_type_children': 0,
-            'smoking_status_Unknown': 0,
-            'smoking_status_formerly smoked': 0,
-            'smoking_status_never smoked': 1,
-            'smoking_status_smokes': 0
+            'smoking_status': 'never smoked'
         }
         
         result = predictor.make_prediction(sample_data)
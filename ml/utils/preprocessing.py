@@ -1,68 +1,6 @@
 import pandas as pd
 import numpy as np
 
-def create_features(data_dict):
-    """
-    Membuat fitur tambahan dari input data
-    
-    Parameters:
-    data_dict (dict): Dictionary berisi data input user
-    
-    Returns:
-    dict: Dictionary dengan fitur tambahan
-    """
-    # Konversi ke float untuk perhitungan
-    numeric_features = ['age', 'bmi', 'avg_glucose_level', 'hypertension', 'heart_disease']
-    for key in numeric_features:
-        data_dict[key] = float(data_dict[key])
-    
-    # Buat fitur interaksi
-    data_dict['age_health_interaction'] = data_dict['age'] * (
-        data_dict['hypertension'] + data_dict['heart_disease']
-    )
-    data_dict['bmi_glucose_risk'] = data_dict['bmi'] * data_dict['avg_glucose_level']
-    
-    # Hitung risk factors
-    high_bmi = 1 if data_dict['bmi'] >= 25 else 0
-    high_glucose = 1 if data_dict['avg_glucose_level'] >= 200 else 0
-    data_dict['risk_factors'] = (
-        data_dict['hypertension'] + 
-        data_dict['heart_disease'] + 
-        high_bmi + 
-        high_glucose
-    )
-    
-    data_dict['age_lifestyle_risk'] = data_dict['age'] * data_dict['risk_factors']
-    
-    return data_dict
-
-def prepare_input_data(data_dict, expected_columns):
-    """
-    Menyiapkan data input sesuai format yang diharapkan model
-    
-    Parameters:
-    data_dict (dict): Dictionary berisi data input user
-    expected_columns (list): List kolom yang diharapkan oleh model
-    
-    Returns:
-    pd.DataFrame: DataFrame yang siap untuk prediksi
-    """
-    # Buat fitur tambahan
-    data_dict = create_features(data_dict)
-    
-    # Buat DataFrame
-    df = pd.DataFrame([data_dict])
-    
-    # Pastikan semua kolom yang diharapkan ada
-    for col in expected_columns:
-        if col not in df.columns:
-            df[col] = 0
-    
-    # Urutkan kolom sesuai dengan urutan training
-    df = df[expected_columns]
-    
-    return df
-
 def validate_input(data_dict):
     """
     Memvalidasi input dari user
@@ -91,4 +29,110 @@ def validate_input(data_dict):
     except ValueError:
         return False, "Invalid numeric values provided"
     except KeyError as e:
-        return False, f"Missing required field: {str(e)}"
\ No newline at end of file
+        return False, f"Missing required field: {str(e)}"
+
+# Batas validasi (sama dengan validate_input)
+VALID_RANGES = {
+    'age': (0, 120),
+    'bmi': (10, 60),
+    'avg_glucose_level': (0, 500),
+}
+
+def _to_float(values):
+    """Kolom -> array float64; nilai non-numerik menjadi NaN (bukan exception)"""
+    return np.asarray(pd.to_numeric(pd.Series(np.asarray(values).ravel()), errors='coerce'), dtype=np.float64)
+
+# Kolom numerik yang dibaca rumus fitur interaksi
+FEATURE_INPUTS = ('age', 'bmi', 'avg_glucose_level', 'hypertension', 'heart_disease')
+
+def _as_columns(data, keys):
+    """
+    Ambil kolom keys dari DataFrame / dict of arrays sebagai NumPy float64
+    Nilai yang tidak bisa diubah ke angka menjadi NaN, sehingga satu baris
+    rusak hanya gagal di mask validasi dan tidak menggagalkan seluruh batch
+    """
+    return {key: _to_float(data[key]) for key in keys}
+
+def create_features_batch(data):
+    """
+    Fitur interaksi (sama dengan FeatureEncoder) untuk banyak baris sekaligus
+    
+    Parameters:
+    data (pd.DataFrame | dict): DataFrame atau dict berisi array per kolom
+    
+    Returns:
+    pd.DataFrame | dict: Data baru (input tidak diubah) dengan fitur tambahan;
+    kolom selain FEATURE_INPUTS (id, email, ...) diteruskan apa adanya
+    """
+    columns = _as_columns(data, FEATURE_INPUTS)
+    
+    age = columns['age']
+    bmi = columns['bmi']
+    glucose = columns['avg_glucose_level']
+    hypertension = columns['hypertension']
+    heart_disease = columns['heart_disease']
+    
+    risk_factors = hypertension + heart_disease + (bmi >= 25) + (glucose >= 200)
+    
+    features = {
+        'age': age,
+        'bmi': bmi,
+        'avg_glucose_level': glucose,
+        'hypertension': hypertension,
+        'heart_disease': heart_disease,
+        'age_health_interaction': age * (hypertension + heart_disease),
+        'bmi_glucose_risk': bmi * glucose,
+        'risk_factors': risk_factors,
+        'age_lifestyle_risk': age * risk_factors,
+    }
+    
+    if isinstance(data, pd.DataFrame):
+        return data.assign(**features)
+    return {**data, **features}
+
+def validate_input_batch(data):
+    """
+    Versi vectorized dari validate_input
+    
+    Parameters:
+    data (pd.DataFrame | dict): DataFrame atau dict berisi array per kolom
+    
+    Returns:
+    np.ndarray: Mask boolean per baris (True = valid)
+    
+    Raises:
+    KeyError: Jika kolom wajib tidak ada
+    """
+    columns = _as_columns(data, VALID_RANGES)
+    mask = None
+    
+    for key, (low, high) in VALID_RANGES.items():
+        values = columns[key]
+        # NaN (nilai non-numerik) otomatis gagal pada perbandingan
+        valid = (values >= low) & (values <= high)
+        mask = valid if mask is None else mask & valid
+    
+    return mask
+
+def prepare_input_batch(data, expected_columns):
+    """
+    Menyiapkan banyak baris (layout kolom training) untuk model
+    
+    Parameters:
+    data (pd.DataFrame | dict): DataFrame atau dict berisi array per kolom
+    expected_columns (list): List kolom yang diharapkan oleh model
+    
+    Returns:
+    pd.DataFrame: DataFrame float64 dengan urutan kolom training (nilai
+    non-numerik menjadi NaN)
+    
+    Raises:
+    ValueError: Jika ada kolom model yang tidak ada di data
+    """
+    df = pd.DataFrame(create_features_batch(data))
+    missing = [col for col in expected_columns if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing model columns: {missing}")
+    return pd.DataFrame(
+        {col: _to_float(df[col]) for col in expected_columns}, index=df.index
+    )
@@ -0,0 +1,140 @@
+"""
+Shadow model evaluation
+
+A candidate model scores the same feature rows as the primary model, off the
+response path: make_prediction() only puts (features, primary result) on a
+bounded queue and returns. One background thread drains the queue in
+batches, scores them with a single predict_proba call and appends one JSON
+line per row to SHADOW_LOG_PATH:
+
+    {"ts", "pid", "model", "primary_probability", "shadow_probability",
+     "primary_prediction", "shadow_prediction", "disagree",
+     "primary_ms", "shadow_ms"}
+
+shadow_ms is the batch scoring time divided by the batch size. When the
+queue is full (shadow slower than traffic) rows are dropped and counted,
+never waited for. Several inference processes can share the log: it is an
+O_APPEND descriptor and every line goes out in one unbuffered os.write, so
+lines from different processes never interleave.
+
+Enable with SHADOW_MODEL_PATH=/path/to/candidate.joblib.
+"""
+import os
+import json
+import time
+import queue
+import threading
+from pathlib import Path
+
+import joblib
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+SHADOW_MODEL_PATH = os.getenv("SHADOW_MODEL_PATH")
+SHADOW_THRESHOLD = os.getenv("SHADOW_THRESHOLD")
+SHADOW_LOG_PATH = Path(os.getenv("SHADOW_LOG_PATH", PROJECT_ROOT / "ml" / "data" / "shadow" / "shadow_predictions.jsonl"))
+SHADOW_QUEUE_SIZE = int(os.getenv("SHADOW_QUEUE_SIZE", 1000))
+SHADOW_BATCH_SIZE = int(os.getenv("SHADOW_BATCH_SIZE", 64))
+
+class ShadowEvaluator:
+    """Scores primary predictions with a candidate model in a background thread"""
+
+    def __init__(self, model, threshold, name, log_path=SHADOW_LOG_PATH,
+                 queue_size=SHADOW_QUEUE_SIZE, batch_size=SHADOW_BATCH_SIZE):
+        self.model = model
+        self.threshold = float(threshold)
+        self.name = name
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.lock = threading.Lock()
+        self.stats = {"submitted": 0, "dropped": 0, "scored": 0, "disagreements": 0, "errors": 0}
+
+        log_path = Path(log_path)
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        self.log_fd = os.open(log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+        self.thread = threading.Thread(target=self._run, name="shadow-model", daemon=True)
+        self.thread.start()
+
+    def submit(self, df, probabilities, predictions, primary_ms):
+        """Queue rows for shadow scoring; drops them if the queue is full"""
+        try:
+            self.queue.put_nowait((df, probabilities, predictions, primary_ms))
+            with self.lock:
+                self.stats["submitted"] += len(df)
+        except queue.Full:
+            with self.lock:
+                self.stats["dropped"] += len(df)
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            rows = len(batch[0][0])
+            while rows < self.batch_size:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+                rows += len(item[0])
+            try:
+                self._score(batch)
+            except Exception as e:
+                with self.lock:
+                    self.stats["errors"] += rows
+                print(f"Shadow scoring failed: {e}")
+
+    def _score(self, batch):
+        df = pd.concat([item[0] for item in batch], ignore_index=True)
+        start = time.perf_counter()
+        shadow_probabilities = self.model.predict_proba(df)[:, 1]
+        shadow_ms = (time.perf_counter() - start) * 1000 / len(df)
+
+        now = time.time()
+        pid = os.getpid()
+        lines = []
+        disagreements = 0
+        i = 0
+        for _, probabilities, predictions, primary_ms in batch:
+            for probability, prediction in zip(probabilities, predictions):
+                shadow_probability = float(shadow_probabilities[i])
+                shadow_prediction = int(shadow_probability >= self.threshold)
+                disagree = shadow_prediction != int(prediction)
+                disagreements += disagree
+                lines.append((json.dumps({
+                    "ts": now,
+                    "pid": pid,
+                    "model": self.name,
+                    "primary_probability": float(probability),
+                    "shadow_probability": shadow_probability,
+                    "primary_prediction": int(prediction),
+                    "shadow_prediction": shadow_prediction,
+                    "disagree": disagree,
+                    "primary_ms": round(primary_ms, 3),
+                    "shadow_ms": round(shadow_ms, 3),
+                }) + "\n").encode("utf-8"))
+                i += 1
+
+        for line in lines:
+            os.write(self.log_fd, line)
+        with self.lock:
+            self.stats["scored"] += len(lines)
+            self.stats["disagreements"] += disagreements
+
+    def get_stats(self):
+        """Counters since start, plus current queue depth"""
+        with self.lock:
+            stats = dict(self.stats)
+        stats["queued"] = self.queue.qsize()
+        stats["model"] = self.name
+        return stats
+
+def load_shadow(primary_threshold):
+    """ShadowEvaluator for SHADOW_MODEL_PATH, or None when not configured"""
+    if not SHADOW_MODEL_PATH:
+        return None
+    path = Path(SHADOW_MODEL_PATH)
+    model = joblib.load(str(path))
+    threshold = float(SHADOW_THRESHOLD) if SHADOW_THRESHOLD else primary_threshold
+    return ShadowEvaluator(model, threshold, path.stem)
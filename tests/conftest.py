@@ -0,0 +1,94 @@
+"""
+Shared fixtures: the API on an in-memory database (or local Postgres in a
+rolled back transaction) and a small model trained from the processed data
+
+    memory_database    seeded MemoryDatabase routed through get_db_cursor()
+    rollback_database  local Postgres (DATABASE_URL_TEST), skipped if unset
+    client             TestClient on main.app (lifespan not run)
+    predictor          StrokePredictor on a fixture-trained model, used by
+                       the screening router
+"""
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import joblib
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from fastapi.testclient import TestClient
+
+from app import db_backends, rate_limit
+from app.auth import create_access_token
+from app.db_backends import MemoryDatabase
+from ml.utils.prediction import StrokePredictor
+
+DATA_PATH = PROJECT_ROOT / "ml" / "data" / "processed" / "stroke_data_final.csv"
+METADATA_PATH = PROJECT_ROOT / "ml" / "models" / "model_metadata.joblib"
+
+@pytest.fixture(autouse=True)
+def fresh_rate_limits(monkeypatch):
+    """Token buckets are per process: start every test with full buckets"""
+    monkeypatch.setattr(rate_limit, "_backend", rate_limit.InMemoryBackend())
+
+@pytest.fixture
+def memory_database():
+    db = MemoryDatabase.seeded(patients=5, screenings_per_patient=3)
+    with db_backends.memory_database(db):
+        yield db
+
+@pytest.fixture
+def rollback_database():
+    if not os.getenv("DATABASE_URL_TEST"):
+        pytest.skip("DATABASE_URL_TEST is not set")
+    with db_backends.rollback_database() as backend:
+        yield backend
+
+@pytest.fixture
+def client(memory_database):
+    from main import app
+
+    return TestClient(app)
+
+def auth_headers(user: dict) -> dict:
+    """Bearer header for a user row (same claims as /auth/login)"""
+    token = create_access_token(data={"sub": user["email"], "role": user["role"]})
+    return {"Authorization": f"Bearer {token}"}
+
+@pytest.fixture
+def patient_headers(memory_database):
+    return auth_headers(memory_database.patient)
+
+@pytest.fixture
+def admin_headers(memory_database):
+    return auth_headers(memory_database.admin)
+
+@pytest.fixture(scope="session")
+def model_dir(tmp_path_factory):
+    """Small random forest on the training layout, next to the real metadata"""
+    from sklearn.ensemble import RandomForestClassifier
+
+    data = pd.read_csv(DATA_PATH)
+    model = RandomForestClassifier(n_estimators=10, max_depth=6, random_state=0)
+    model.fit(data.drop("stroke", axis=1), data["stroke"])
+
+    directory = tmp_path_factory.mktemp("models")
+    joblib.dump(model, directory / "optimized_stroke_model.joblib")
+    shutil.copy(METADATA_PATH, directory / "model_metadata.joblib")
+    return directory
+
+@pytest.fixture(scope="session")
+def stroke_predictor(model_dir):
+    return StrokePredictor(models_dir=model_dir)
+
+@pytest.fixture
+def predictor(stroke_predictor, monkeypatch):
+    from app.routers import screening
+
+    monkeypatch.setattr(screening, "predictor", stroke_predictor)
+    monkeypatch.setattr(screening, "inference_client", None)
+    return stroke_predictor
@@ -0,0 +1,104 @@
+"""
+Admin router: lists (?fields=), dashboard counts, screenings export
+"""
+import io
+import json
+
+import pytest
+
+from app import export
+from app.models import PatientSummary
+
+def test_admin_endpoints_require_admin(client, patient_headers):
+    assert client.get("/admin/patients", headers=patient_headers).status_code == 403
+    assert client.get("/admin/dashboard-stats", headers=patient_headers).status_code == 403
+
+def test_patients(client, admin_headers, memory_database):
+    response = client.get("/admin/patients", headers=admin_headers)
+
+    assert response.status_code == 200
+    rows = response.json()
+    assert {row["id"] for row in rows} == {p["id"] for p in memory_database.patients}
+    assert all(row["total_screenings"] == 3 for row in rows)
+
+def test_patients_field_selection(client, admin_headers):
+    response = client.get("/admin/patients", params={"fields": "id,full_name"}, headers=admin_headers)
+
+    assert response.status_code == 200
+    assert all(set(row) == {"id", "full_name"} for row in response.json())
+
+@pytest.mark.parametrize("fields", ["", ",", " , "])
+def test_patients_empty_field_selection(client, admin_headers, fields):
+    response = client.get("/admin/patients", params={"fields": fields}, headers=admin_headers)
+
+    assert response.status_code == 200
+    assert set(response.json()[0]) == set(PatientSummary.model_fields)
+
+def test_patients_unknown_field(client, admin_headers):
+    response = client.get("/admin/patients", params={"fields": "id,password"}, headers=admin_headers)
+
+    assert response.status_code == 400
+
+def test_patient_screenings(client, admin_headers, memory_database):
+    patient = memory_database.patients[2]
+
+    response = client.get(f"/admin/patient/{patient['id']}/screenings", headers=admin_headers)
+
+    assert response.status_code == 200
+    assert [row["id"] for row in response.json()] == [s["id"] for s in memory_database.screenings_of(patient["id"])]
+
+def test_patient_screenings_not_found(client, admin_headers, memory_database):
+    response = client.get(f"/admin/patient/{memory_database.admin['id']}/screenings", headers=admin_headers)
+
+    assert response.status_code == 404
+
+def test_dashboard_stats(client, admin_headers, memory_database):
+    response = client.get("/admin/dashboard-stats", headers=admin_headers)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total_patients"] == len(memory_database.patients)
+    assert body["total_screenings"] == len(memory_database.screenings)
+    assert body["high_risk_count"] == sum(s["risk_level"] == "High" for s in memory_database.screenings.values())
+
+def test_export_requires_salt(client, admin_headers, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_ID_SALT", "")
+
+    response = client.get("/admin/export/screenings", params={"format": "ndjson"}, headers=admin_headers)
+
+    assert response.status_code == 503
+
+def test_export_ndjson(client, admin_headers, memory_database, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_ID_SALT", "test-salt")
+
+    response = client.get("/admin/export/screenings", params={"format": "ndjson"}, headers=admin_headers)
+
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == len(memory_database.screenings)
+    assert [row["created_at"] for row in rows] == sorted(row["created_at"] for row in rows)
+    assert list(rows[0]) == [name for name, _, _ in export.EXPORT_COLUMNS]
+    user_ids = {s["user_id"] for s in memory_database.screenings.values()}
+    assert not user_ids & {row["patient_key"] for row in rows}
+
+def test_export_filters(client, admin_headers, memory_database, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_ID_SALT", "test-salt")
+
+    response = client.get(
+        "/admin/export/screenings", params={"format": "ndjson", "risk_level": "High"}, headers=admin_headers
+    )
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == sum(s["risk_level"] == "High" for s in memory_database.screenings.values())
+    assert all(row["risk_level"] == "High" for row in rows)
+
+def test_export_parquet(client, admin_headers, memory_database, monkeypatch):
+    pq = pytest.importorskip("pyarrow.parquet")
+    monkeypatch.setattr(export, "EXPORT_ID_SALT", "test-salt")
+
+    response = client.get("/admin/export/screenings", params={"format": "parquet"}, headers=admin_headers)
+
+    assert response.status_code == 200
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.num_rows == len(memory_database.screenings)
+    assert table.column_names == export.export_schema().names
@@ -0,0 +1,54 @@
+"""
+Auth router: register, login, /auth/me
+"""
+from app.db_backends import SEED_PASSWORD
+
+NEW_USER = {
+    "email": "new.patient@example.com",
+    "password": "Secret123!",
+    "full_name": "New Patient",
+    "date_of_birth": "1985-06-15",
+    "gender": "Female",
+    "phone_number": "+6281234567890",
+}
+
+def test_register_creates_patient(client, memory_database):
+    response = client.post("/auth/register", json=NEW_USER)
+
+    assert response.status_code == 201
+    body = response.json()
+    assert body["email"] == NEW_USER["email"]
+    assert body["role"] == "PATIENT"
+    assert "password" not in body
+    stored = memory_database.user_by_email(NEW_USER["email"])
+    assert stored["password"] != NEW_USER["password"]
+
+def test_register_duplicate_email(client):
+    assert client.post("/auth/register", json=NEW_USER).status_code == 201
+
+    response = client.post("/auth/register", json=NEW_USER)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Email already registered"
+
+def test_login_and_me(client):
+    client.post("/auth/register", json=NEW_USER)
+
+    response = client.post("/auth/login", json={"email": NEW_USER["email"], "password": NEW_USER["password"]})
+    assert response.status_code == 200
+    token = response.json()["access_token"]
+
+    me = client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+    assert me.status_code == 200
+    assert me.json()["full_name"] == NEW_USER["full_name"]
+
+def test_login_wrong_password(client):
+    client.post("/auth/register", json=NEW_USER)
+
+    response = client.post("/auth/login", json={"email": NEW_USER["email"], "password": SEED_PASSWORD + "x"})
+
+    assert response.status_code == 401
+
+def test_me_requires_valid_token(client):
+    assert client.get("/auth/me").status_code in (401, 403)
+    assert client.get("/auth/me", headers={"Authorization": "Bearer not-a-token"}).status_code == 401
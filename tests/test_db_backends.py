@@ -0,0 +1,48 @@
+"""
+Database backends: rollback semantics, named-cursor export reads
+"""
+import pytest
+
+from app import export
+from app.database import get_db_cursor
+
+def test_memory_block_rolls_back_on_error(memory_database):
+    patient = memory_database.patient
+    before = (len(memory_database.screenings), patient["screening_version"])
+
+    with pytest.raises(RuntimeError):
+        with get_db_cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO stroke_screenings (user_id, age_at_screening) VALUES (%s, %s) RETURNING id",
+                (patient["id"], 60)
+            )
+            raise RuntimeError("handler failed")
+
+    assert (len(memory_database.screenings), patient["screening_version"]) == before
+
+def test_memory_rejects_unknown_sql(memory_database):
+    with pytest.raises(NotImplementedError):
+        with get_db_cursor() as cursor:
+            cursor.execute("SELECT secret FROM somewhere")
+
+def test_export_rows_in_batches(memory_database, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_ID_SALT", "test-salt")
+
+    batches = list(export.iter_screening_rows(batch_size=4))
+
+    assert [len(rows) for rows in batches][:-1] == [4] * (len(batches) - 1)
+    assert sum(map(len, batches)) == len(memory_database.screenings)
+    assert len(batches[0][0]) == len(export.EXPORT_COLUMNS)
+
+def test_rollback_database_sees_own_writes(rollback_database):
+    with get_db_cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) AS total FROM users")
+        before = cursor.fetchone()["total"]
+        cursor.execute(
+            """
+            INSERT INTO users (email, password, full_name, date_of_birth, gender, role)
+            VALUES ('rollback@example.com', 'x', 'Rollback Test', '1990-01-01', 'Male', 'PATIENT')
+            """
+        )
+        cursor.execute("SELECT COUNT(*) AS total FROM users")
+        assert cursor.fetchone()["total"] == before + 1
@@ -0,0 +1,83 @@
+"""
+FeatureEncoder parity, column by column
+
+- against stroke_data_final.csv (the matrix the deployed model was trained
+  on): each processed row is turned back into raw API-style values and
+  re-encoded. The engineered risk_factors / bmi_glucose_risk /
+  age_lifestyle_risk columns of that file were produced by the original
+  training notebook with a different definition than the one served, so
+  they are expected failures (strict: the test starts failing once the
+  training data is regenerated and the skew is gone).
+- against feature_store.encode_raw on the raw Kaggle CSV (the layout new
+  models are trained on): every column must match.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml.utils.encoder import FeatureEncoder
+from ml.utils.feature_store import SOURCES, TARGET_COLUMN, encode_raw, training_columns
+
+COLUMNS = training_columns()
+
+TRAINING_SKEW = {"risk_factors", "bmi_glucose_risk", "age_lifestyle_risk"}
+
+def _category(row, prefix):
+    return next(column[len(prefix):] for column in COLUMNS if column.startswith(prefix) and row[column])
+
+@pytest.fixture(scope="module")
+def processed():
+    data = pd.read_csv(SOURCES["processed"])
+    # Oversampled rows interpolated between categories have two one-hot
+    # columns set; they have no raw equivalent
+    one_hot = [
+        [c for c in COLUMNS if c.startswith(prefix)]
+        for prefix in ("work_type_", "smoking_status_")
+    ]
+    single = np.logical_and.reduce([data[group].sum(axis=1) == 1 for group in one_hot])
+    return data[single].reset_index(drop=True)
+
+@pytest.fixture(scope="module")
+def processed_encoded(processed):
+    encoder = FeatureEncoder(COLUMNS)
+    records = [
+        {
+            "age": row["age"], "bmi": row["bmi"], "avg_glucose_level": row["avg_glucose_level"],
+            "hypertension": row["hypertension"], "heart_disease": row["heart_disease"],
+            "ever_married": row["ever_married"],
+            "gender": "Male" if row["gender"] == 1 else "Female",
+            "residence_type": "Urban" if row["Residence_type"] == 1 else "Rural",
+            "work_type": _category(row, "work_type_"),
+            "smoking_status": _category(row, "smoking_status_"),
+        }
+        for row in processed.to_dict("records")
+    ]
+    return np.vstack([encoder.encode(record) for record in records])
+
+@pytest.mark.parametrize("column", [
+    pytest.param(column, marks=pytest.mark.xfail(strict=True, reason="engineered differently in training data"))
+    if column in TRAINING_SKEW else column
+    for column in COLUMNS
+])
+def test_matches_training_data(column, processed, processed_encoded):
+    expected = processed[column].to_numpy(dtype=np.float64)
+    actual = processed_encoded[:, COLUMNS.index(column)]
+
+    np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-9, err_msg=column)
+
+def test_matches_encode_raw():
+    source = pd.read_csv(SOURCES["raw"])
+    expected = encode_raw(source)
+    raw = expected.assign(
+        gender=source.loc[expected.index, "gender"],
+        residence_type=source.loc[expected.index, "Residence_type"],
+        work_type=source.loc[expected.index, "work_type"],
+        smoking_status=source.loc[expected.index, "smoking_status"],
+    )
+    encoder = FeatureEncoder(COLUMNS)
+
+    encoded = np.vstack([encoder.encode(record) for record in raw.drop(columns=[TARGET_COLUMN]).to_dict("records")])
+
+    target = expected[COLUMNS].to_numpy(dtype=np.float64)
+    mismatched = [c for i, c in enumerate(COLUMNS) if not np.allclose(encoded[:, i], target[:, i])]
+    assert mismatched == []
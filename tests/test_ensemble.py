@@ -0,0 +1,71 @@
+"""
+Model set: gate coverage at load time, attributions of the combined score
+"""
+import json
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from ml.utils.ensemble import (
+    EnsembleMember, Gate, ModelSet, build_model_set_explainer, check_coverage, load_model_set,
+)
+from ml.utils.feature_store import SOURCES, TARGET_COLUMN
+
+COLUMNS = ["gender", "age", "hypertension", "bmi"]
+
+def members(*gates):
+    return [EnsembleMember(f"m{i}", None, gate=gate) for i, gate in enumerate(gates)]
+
+@pytest.mark.parametrize("gates", [
+    (None, Gate("gender", equals=0)),
+    (Gate("gender", equals=0), Gate("gender", equals=1)),
+    (Gate("age", max=0), Gate("age", min=0, max=1), Gate("age", min=1)),
+    (Gate("age", max=1), Gate("age", min=0)),
+])
+def test_coverage_accepted(gates):
+    check_coverage(members(*gates), COLUMNS)
+
+@pytest.mark.parametrize("gates", [
+    (Gate("gender", equals=0),),
+    (Gate("age", equals=0), Gate("age", equals=1)),
+    (Gate("age", max=0), Gate("age", min=1)),
+    (Gate("age", min=0),),
+    (Gate("gender", equals=0), Gate("age", min=65)),
+])
+def test_coverage_rejected(gates):
+    with pytest.raises(ValueError, match="do not cover"):
+        check_coverage(members(*gates), COLUMNS)
+
+def test_load_model_set_rejects_uncovered_config(tmp_path, stroke_predictor):
+    joblib.dump(stroke_predictor.model, tmp_path / "female.joblib")
+    config = tmp_path / "ensemble.json"
+    config.write_text(json.dumps({
+        "include_primary": False,
+        "members": [{"name": "female", "path": str(tmp_path / "female.joblib"), "gate": {"column": "gender", "equals": 0}}],
+    }))
+
+    with pytest.raises(ValueError, match="do not cover"):
+        load_model_set(stroke_predictor.model, stroke_predictor.expected_columns, str(config))
+
+@pytest.fixture(scope="module")
+def training():
+    data = pd.read_csv(SOURCES["processed"])
+    return data.drop(TARGET_COLUMN, axis=1).astype(np.float64), data[TARGET_COLUMN]
+
+@pytest.mark.parametrize("combine", ["mean", "gated"])
+def test_attributions_add_up_to_combined_score(combine, training, stroke_predictor):
+    X, y = training
+    senior = RandomForestClassifier(n_estimators=5, max_depth=4, random_state=1).fit(X, y)
+    model_set = ModelSet([
+        EnsembleMember("primary", stroke_predictor.model),
+        EnsembleMember("senior", senior, weight=2.0, gate=Gate("age", min=0.5)),
+    ], combine=combine, columns=list(X.columns))
+
+    explainer = build_model_set_explainer(model_set, list(X.columns), background=X)
+    contributions, bias = explainer.explain(X.head(300))
+    scores, _ = model_set.predict_proba(X.head(300))
+
+    np.testing.assert_allclose(contributions.sum(axis=1) + bias, scores, atol=1e-6)
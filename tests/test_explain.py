@@ -0,0 +1,36 @@
+"""
+Risk drivers from model attributions
+"""
+import numpy as np
+import pandas as pd
+
+from ml.utils.explain import DEMOGRAPHIC_LABELS
+from ml.utils.feature_store import SOURCES
+
+def test_risk_drivers_exclude_demographics(stroke_predictor):
+    explainer = stroke_predictor.explainer
+    rows = pd.read_csv(SOURCES["processed"])[stroke_predictor.expected_columns].astype(np.float64)
+
+    contributions, _ = explainer.explain(rows)
+
+    drivers = {label for row in explainer.top_drivers(contributions) for label in row}
+    assert drivers
+    assert not drivers & DEMOGRAPHIC_LABELS
+
+def test_demographic_contributions_still_computed(stroke_predictor):
+    explainer = stroke_predictor.explainer
+    rows = pd.read_csv(SOURCES["processed"])[stroke_predictor.expected_columns].head(200).astype(np.float64)
+
+    contributions, _ = explainer.explain(rows)
+
+    assert np.abs(contributions[:, stroke_predictor.expected_columns.index("gender")]).sum() > 0
+
+def test_contributions_add_up_to_predicted_probability(stroke_predictor):
+    explainer = stroke_predictor.explainer
+    rows = pd.read_csv(SOURCES["processed"])[stroke_predictor.expected_columns].head(500).astype(np.float64)
+
+    contributions, bias = explainer.explain(rows)
+    probabilities = stroke_predictor.model.predict_proba(rows)[:, 1]
+
+    assert explainer.units == "probability"
+    np.testing.assert_allclose(contributions.sum(axis=1) + bias, probabilities, rtol=0, atol=1e-12)
@@ -0,0 +1,33 @@
+"""
+Batch preprocessing: feature columns coerced, everything else passed through
+"""
+import numpy as np
+import pandas as pd
+
+from ml.utils.preprocessing import create_features_batch, validate_input_batch
+
+ROWS = pd.DataFrame({
+    "id": ["a-1", "b-2", "c-3"],
+    "email": ["a@example.com", "b@example.com", "c@example.com"],
+    "age": [45, "67", "n/a"],
+    "bmi": [28.4, 31.0, 22.1],
+    "avg_glucose_level": [210.0, 95.5, 120.0],
+    "hypertension": [1, 0, 0],
+    "heart_disease": [0, 1, 0],
+})
+
+def test_passthrough_columns_unchanged():
+    result = create_features_batch(ROWS)
+
+    pd.testing.assert_series_equal(result["id"], ROWS["id"])
+    pd.testing.assert_series_equal(result["email"], ROWS["email"])
+    # The input frame itself is not modified
+    assert ROWS["age"].tolist() == [45, "67", "n/a"]
+
+def test_feature_columns_coerced():
+    result = create_features_batch(ROWS)
+
+    np.testing.assert_array_equal(result["age"].to_numpy()[:2], [45.0, 67.0])
+    assert np.isnan(result["age"].iloc[2])
+    assert result["risk_factors"].tolist() == [3.0, 2.0, 0.0]
+    assert validate_input_batch(ROWS).tolist() == [True, True, False]
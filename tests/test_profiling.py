@@ -0,0 +1,35 @@
+"""
+Request profiler: work done in threadpool workers shows up in the profile
+"""
+import time
+
+import anyio.to_thread
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import profiling
+
+def busy_in_worker():
+    deadline = time.perf_counter() + 0.2
+    while time.perf_counter() < deadline:
+        pass
+
+def test_sync_endpoint_is_sampled(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", tmp_path)
+    monkeypatch.setattr(profiling, "PROFILE_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(anyio.to_thread, "run_sync", anyio.to_thread.run_sync)
+    monkeypatch.setattr(profiling, "_run_sync", None)
+    profiling.track_threadpool()
+
+    app = FastAPI()
+    app.middleware("http")(profiling.profile_requests)
+
+    @app.get("/busy")
+    def busy():
+        busy_in_worker()
+        return {}
+
+    response = TestClient(app).get("/busy")
+
+    profile = (tmp_path / response.headers["X-Profile-Id"]).read_text()
+    assert "test_profiling:busy_in_worker" in profile
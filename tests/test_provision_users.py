@@ -0,0 +1,47 @@
+"""
+Bulk provisioning: duplicate emails, per-batch commits with row-level retry
+"""
+import sys
+from contextlib import nullcontext
+from pathlib import Path
+
+import psycopg2
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "database"))
+
+import provision_users
+
+CSV = """email,full_name,date_of_birth,gender,phone_number,password
+ana@example.com,Ana,1980-01-01,Female,,
+budi@example.com,Budi,1975-05-05,Male,,
+ANA@example.com,Ana Again,1981-01-01,Female,,
+"""
+
+def test_duplicate_emails_are_reported_once(tmp_path):
+    path = tmp_path / "users.csv"
+    path.write_text(CSV)
+
+    users, errors = provision_users.read_users(path)
+
+    assert [(line_no, u.email) for line_no, u, _ in users] == [(2, "ana@example.com"), (3, "budi@example.com")]
+    assert len(errors) == 1
+    assert errors[0][0] == 4 and "duplicate email" in errors[0][2]
+
+def test_constraint_violation_fails_only_its_row(monkeypatch):
+    def insert_batch(cursor, batch):
+        if any(row[5] == "bad" for row in batch):
+            raise psycopg2.IntegrityError("phone_format")
+        return {row[0] for row in batch}
+
+    monkeypatch.setattr(provision_users, "get_db_cursor", lambda: nullcontext(None))
+    monkeypatch.setattr(provision_users, "insert_batch", insert_batch)
+    batch = [
+        (2, ("a@example.com", "h", "A", None, "Male", None)),
+        (3, ("b@example.com", "h", "B", None, "Male", "bad")),
+        (4, ("c@example.com", "h", "C", None, "Male", None)),
+    ]
+
+    created, failed = provision_users.insert_rows(batch)
+
+    assert created == {"a@example.com", "c@example.com"}
+    assert [(line_no, email) for line_no, email, _ in failed] == [(3, "b@example.com")]
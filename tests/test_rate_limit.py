@@ -0,0 +1,81 @@
+"""
+Rate limiting: client identity behind proxies, export concurrency slot
+"""
+import pytest
+from starlette.requests import Request
+
+from app import export
+from app.rate_limit import client_ip, client_key
+from app.routers import admin
+
+def request(peer="10.0.0.1", forwarded=()):
+    headers = [(b"x-forwarded-for", value.encode()) for value in forwarded]
+    return Request({"type": "http", "headers": headers, "client": (peer, 1234)})
+
+def test_direct_connection_ignores_forwarded_header():
+    assert client_ip(request(forwarded=["1.2.3.4"]), proxy_hops=0) == "10.0.0.1"
+
+@pytest.mark.parametrize("forwarded, hops, expected", [
+    (["203.0.113.7"], 1, "203.0.113.7"),
+    # Client-supplied entries on the left are not trusted
+    (["6.6.6.6, 203.0.113.7"], 1, "203.0.113.7"),
+    (["6.6.6.6", "203.0.113.7, 10.1.1.1"], 2, "203.0.113.7"),
+    # Fewer entries than trusted hops: fall back to the peer
+    (["203.0.113.7"], 2, "10.0.0.1"),
+    ([], 1, "10.0.0.1"),
+])
+def test_forwarded_client_ip(forwarded, hops, expected):
+    assert client_ip(request(forwarded=forwarded), proxy_hops=hops) == expected
+
+def test_client_key_prefers_token_subject(admin_headers):
+    scope_request = Request({
+        "type": "http", "client": ("10.0.0.1", 1234),
+        "headers": [(b"authorization", admin_headers["Authorization"].encode())],
+    })
+
+    assert client_key(scope_request) == "user:admin@bench.local"
+
+def test_export_holds_slot_while_streaming(client, admin_headers, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_ID_SALT", "test-salt")
+    monkeypatch.setattr(admin.export_limit, "in_flight", 0)
+    seen = []
+    stream_ndjson = export.stream_ndjson
+
+    def observed(row_batches):
+        for chunk in stream_ndjson(row_batches):
+            seen.append(admin.export_limit.in_flight)
+            yield chunk
+    monkeypatch.setattr(export, "stream_ndjson", observed)
+
+    response = client.get("/admin/export/screenings", params={"format": "ndjson"}, headers=admin_headers)
+
+    assert response.status_code == 200
+    assert seen and set(seen) == {1}
+    assert admin.export_limit.in_flight == 0
+
+def test_export_releases_slot_on_error(client, admin_headers, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_ID_SALT", "")
+    monkeypatch.setattr(admin.export_limit, "in_flight", 0)
+
+    assert client.get("/admin/export/screenings", headers=admin_headers).status_code == 503
+    assert admin.export_limit.in_flight == 0
+
+def test_export_concurrency_cap(client, admin_headers, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_ID_SALT", "test-salt")
+    monkeypatch.setattr(admin.export_limit, "in_flight", admin.export_limit.max_concurrent)
+
+    response = client.get("/admin/export/screenings", params={"format": "ndjson"}, headers=admin_headers)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+def test_export_authenticates_before_limiting(client, patient_headers, monkeypatch):
+    monkeypatch.setattr(admin.export_limit, "in_flight", 0)
+    acquired = []
+    monkeypatch.setattr(admin.export_limit, "_check_rate", acquired.append)
+
+    for headers in (patient_headers, {}):
+        assert client.get("/admin/export/screenings", headers=headers).status_code in (401, 403)
+
+    assert acquired == []
+    assert admin.export_limit.in_flight == 0
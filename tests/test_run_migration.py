@@ -0,0 +1,122 @@
+"""
+Migration runner: step planning, baseline guard, resumable steps
+(on a recording fake connection, no Postgres needed)
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "database"))
+
+import run_migration
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rowcount = -1
+        self.result = []
+
+    def execute(self, sql, params=None):
+        self.conn.executed.append(" ".join(sql.split()))
+        self.rowcount = self.conn.rowcounts.pop(0) if "UPDATE users u" in sql else 1
+        text = f"{sql} {params}"
+        self.result = next((rows for key, rows in self.conn.results.items() if key in text), [(False,)])
+
+    def fetchall(self):
+        return self.result
+
+    def fetchone(self):
+        return self.result[0]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+class FakeConnection:
+    def __init__(self, results=None, rowcounts=()):
+        self.results = results or {}
+        self.rowcounts = list(rowcounts)
+        self.executed = []
+        self.transactions = [[]]
+        self.autocommit = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.transactions[-1] = self.executed
+        self.executed = []
+        self.transactions.append([])
+
+    def rollback(self):
+        self.executed = []
+
+@pytest.fixture(scope="module")
+def migrations():
+    return {migration.version: migration for migration in run_migration.load_migrations()}
+
+def test_write_blocking_ddl_gets_its_own_step(migrations):
+    steps = migrations["005"].steps
+
+    assert [step["kind"] for step in steps] == [
+        "ddl", "ddl", "ddl", "transaction", "ddl", "ddl", "backfill", "transaction"
+    ]
+    assert all(len(step["statements"]) == 1 for step in steps if step["kind"] in ("ddl", "backfill"))
+    assert steps[0]["locks"] == [("users", "ACCESS EXCLUSIVE")]
+    assert steps[6]["locks"] == [("users", "ROW EXCLUSIVE")]
+    assert steps[6]["statements"][0]["batched"]
+
+def test_foreign_key_locks_referenced_table(migrations):
+    create = next(step for step in migrations["002"].steps if "CREATE TABLE stroke_screenings" in step["statements"][0]["sql"])
+
+    assert create["kind"] == "ddl"
+    assert create["locks"] == [("users", "SHARE ROW EXCLUSIVE")]
+
+def test_existing_schema_without_history_requires_baseline():
+    conn = FakeConnection({"('users',)": [(True,)], "FROM schema_migration": []})
+
+    assert run_migration.ensure_migrations_table(conn) is None
+    assert run_migration.ensure_migrations_table(conn, baseline=True) == ({}, {})
+
+def test_dry_run_creates_nothing():
+    conn = FakeConnection({
+        "('users',)": [(True,)], "('schema_migrations',)": [(True,)],
+        "FROM schema_migrations": [("001", "x")],
+    })
+
+    applied, progress = run_migration.ensure_migrations_table(conn, dry_run=True)
+
+    assert (applied, progress) == ({"001": "x"}, {})
+    assert not any("CREATE" in sql for t in conn.transactions for sql in t)
+    assert not any("schema_migration_progress" in sql for t in conn.transactions for sql in t)
+
+def test_baseline_compares_versions_as_numbers(migrations):
+    conn = FakeConnection()
+
+    # --baseline 6 and --baseline 006 both parse to 6
+    run_migration.baseline_migrations(conn, list(migrations.values()), 6)
+
+    recorded = [sql for t in conn.transactions for sql in t if sql.startswith("INSERT INTO schema_migrations")]
+    assert len(recorded) == 6
+
+def test_resume_runs_remaining_steps_and_records_version_last(migrations):
+    migration = migrations["005"]
+    conn = FakeConnection(rowcounts=[5000, 12, 0])
+
+    run_migration.apply_migration(conn, migration, steps_done=6)
+
+    transactions = [t for t in conn.transactions if t]
+    backfills = [t for t in transactions if any("UPDATE users u" in sql for sql in t)]
+    assert len(backfills) == 3
+    assert not any("ALTER TABLE" in sql or "TRIGGER" in sql for t in backfills for sql in t)
+    assert "schema_migration_progress" in transactions[3][-1]
+    last = transactions[-1]
+    assert any(sql.startswith("COMMENT ON COLUMN users.screening_version") for sql in last)
+    assert any(sql.startswith("INSERT INTO schema_migrations") for sql in last)
+    assert not any("INSERT INTO schema_migrations" in sql for t in transactions[:-1] for sql in t)
@@ -0,0 +1,145 @@
+"""
+Screening router: predict (fixture-trained model), history ETag / since, detail
+"""
+from contextlib import contextmanager
+
+import pytest
+
+from app.database import DatabaseUnavailable
+from app.degraded import pending_writes
+
+SCREENING = {
+    "height_cm": 170,
+    "weight_kg": 82,
+    "hypertension": True,
+    "heart_disease": False,
+    "ever_married": True,
+    "work_type": "Private",
+    "residence_type": "Urban",
+    "avg_glucose_level": 210,
+    "smoking_status": "formerly smoked",
+}
+
+@pytest.fixture
+def history(client, patient_headers):
+    return client.get("/screening/history", headers=patient_headers)
+
+def test_predict_saves_screening(client, memory_database, patient_headers, predictor):
+    before = len(memory_database.screenings_of(memory_database.patient["id"]))
+
+    response = client.post("/screening/predict", json=SCREENING, headers=patient_headers)
+
+    assert response.status_code == 201
+    body = response.json()
+    assert 0.0 <= body["stroke_probability"] <= 1.0
+    assert body["risk_level"] in ("Low", "Medium", "High")
+    assert body["bmi"] == pytest.approx(28.4)
+    assert len(memory_database.screenings_of(memory_database.patient["id"])) == before + 1
+
+def test_predict_without_risk_level_uses_bands(client, patient_headers, predictor, monkeypatch):
+    from app.routers import screening
+
+    result = {"probability": 0.61, "prediction": 1, "risk_factors": [], "confidence": "Low", "threshold": 0.45}
+    monkeypatch.setattr(screening, "predictor", type("Legacy", (), {"make_prediction": lambda self, data: result})())
+
+    response = client.post("/screening/predict", json=SCREENING, headers=patient_headers)
+
+    assert response.status_code == 201
+    assert response.json()["risk_level"] == screening.risk_bands.level(0.61)
+
+def test_write_queued_on_transient_failure_is_persisted(client, memory_database, patient_headers, predictor, monkeypatch):
+    from app.routers import screening
+
+    real_cursor = screening.get_db_cursor
+    failures = [DatabaseUnavailable(1)]
+
+    @contextmanager
+    def flaky_cursor(*args, **kwargs):
+        # One connection error: below DB_BREAKER_FAILURES, the breaker stays closed
+        if failures:
+            raise failures.pop()
+        with real_cursor(*args, **kwargs) as cursor:
+            yield cursor
+
+    monkeypatch.setattr(screening, "get_db_cursor", flaky_cursor)
+
+    response = client.post("/screening/predict", json=SCREENING, headers=patient_headers)
+    assert response.status_code == 202
+    assert response.headers["X-Degraded"] == "write-queued"
+
+    # The next successful connection replays the queue
+    client.get("/screening/history", headers=patient_headers)
+    pending_writes.flusher.join(timeout=5)
+
+    assert len(pending_writes) == 0
+    assert response.json()["id"] in memory_database.screenings
+
+def test_predict_requires_patient(client, admin_headers, predictor):
+    response = client.post("/screening/predict", json=SCREENING, headers=admin_headers)
+
+    assert response.status_code == 403
+
+def test_predict_validates_input(client, patient_headers, predictor):
+    response = client.post("/screening/predict", json=dict(SCREENING, avg_glucose_level=1000), headers=patient_headers)
+
+    assert response.status_code == 422
+
+def test_history_newest_first(history, memory_database):
+    assert history.status_code == 200
+    ids = [row["id"] for row in history.json()]
+    assert ids == [s["id"] for s in memory_database.screenings_of(memory_database.patient["id"])]
+    assert history.headers["ETag"]
+    assert history.headers["X-Next-Cursor"]
+
+def test_history_not_modified(client, patient_headers, history):
+    response = client.get("/screening/history", headers=dict(patient_headers, **{"If-None-Match": history.headers["ETag"]}))
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == history.headers["ETag"]
+
+def test_history_etag_changes_after_screening(client, patient_headers, history, predictor):
+    client.post("/screening/predict", json=SCREENING, headers=patient_headers)
+
+    response = client.get("/screening/history", headers=dict(patient_headers, **{"If-None-Match": history.headers["ETag"]}))
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != history.headers["ETag"]
+
+def test_history_since_returns_only_newer(client, patient_headers, history, predictor):
+    cursor = history.headers["X-Next-Cursor"]
+    assert client.get("/screening/history", params={"since": cursor}, headers=patient_headers).json() == []
+
+    created = client.post("/screening/predict", json=SCREENING, headers=patient_headers).json()
+    response = client.get("/screening/history", params={"since": cursor}, headers=patient_headers)
+
+    assert [row["id"] for row in response.json()] == [created["id"]]
+    assert response.headers["X-Next-Cursor"] != cursor
+
+def test_history_since_sees_late_commit_with_older_created_at(client, patient_headers, memory_database, history):
+    from datetime import datetime, timedelta, timezone
+    from app.database import get_db_cursor
+    from app.routers import screening
+
+    cursor = history.headers["X-Next-Cursor"]
+    # A deferred write replayed after the client synced: created_at is older
+    # than every row the client has, but it committed later
+    screening_id = "00000000-0000-4000-8000-000000000001"
+    values = tuple(memory_database.screenings_of(memory_database.patient["id"])[0][c] for c in screening.SCREENING_VALUE_COLUMNS)
+    with get_db_cursor() as db:
+        db.execute(screening.DEFERRED_SCREENING_INSERT, (screening_id, datetime.now(timezone.utc) - timedelta(days=365), *values))
+
+    response = client.get("/screening/history", params={"since": cursor}, headers=patient_headers)
+
+    assert [row["id"] for row in response.json()] == [screening_id]
+
+def test_history_rejects_bad_cursor(client, patient_headers):
+    response = client.get("/screening/history", params={"since": "not-a-cursor"}, headers=patient_headers)
+
+    assert response.status_code == 400
+
+def test_detail_only_for_owner(client, memory_database, patient_headers):
+    own = memory_database.screenings_of(memory_database.patient["id"])[0]
+    other = memory_database.screenings_of(memory_database.patients[1]["id"])[0]
+
+    assert client.get(f"/screening/{own['id']}", headers=patient_headers).status_code == 200
+    assert client.get(f"/screening/{other['id']}", headers=patient_headers).status_code == 404